@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 from .tools import SELECTED_SEARCH_ENGINE, SearchEngine
-from .loader import load_yaml_config
+from .loader import load_yaml_config, get_int_env, get_float_env, get_bool_env
 
 
 from dotenv import load_dotenv
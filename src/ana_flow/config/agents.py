@@ -11,12 +11,28 @@ AGENT_LLM_MAP: dict[str, LLMType] = {
     "coordinator": "basic",
     "planner": "basic",
     "loader": "basic_low_temp",
-    "init_forcast": "basic",
     "researcher": "basic",
     "coder": "basic",
     "reporter": "reasoning",
     "conclusion": "basic",
+    "summarizer": "basic",
     "podcast_script_writer": "basic",
     "ppt_composer": "basic",
     "prose_writer": "basic",
 }
+
+# Agents whose LLM responses are served from the response cache on identical
+# prompts, only agents that should answer the same prompt the same way opt in
+AGENT_LLM_CACHE: dict[str, bool] = {
+    "coordinator": True,
+    "planner": True,
+    "loader": True,
+    "researcher": False,
+    "coder": False,
+    "reporter": False,
+    "conclusion": False,
+    "summarizer": True,
+    "podcast_script_writer": False,
+    "ppt_composer": False,
+    "prose_writer": False,
+}
@@ -0,0 +1,20 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import enum
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class CheckpointerBackend(enum.Enum):
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+    POSTGRES = "postgres"
+
+
+# Checkpointer configuration
+SELECTED_CHECKPOINTER = os.getenv("CHECKPOINTER", CheckpointerBackend.SQLITE.value)
+CHECKPOINTER_SQLITE_PATH = os.getenv("CHECKPOINTER_SQLITE_PATH", "checkpoints.sqlite")
+CHECKPOINTER_POSTGRES_URL = os.getenv("CHECKPOINTER_POSTGRES_URL")
@@ -7,6 +7,8 @@ from typing import Any, Optional
 
 from langchain_core.runnables import RunnableConfig
 
+from ana_flow.config.loader import get_bool_env
+
 
 @dataclass(kw_only=True)
 class Configuration:
@@ -16,6 +18,11 @@ class Configuration:
     max_step_num: int = 3  # Maximum number of steps in a plan
     max_search_results: int = 1  # Maximum number of search results
     mcp_settings: dict = None  # MCP settings, including dynamic loaded tools
+    forecast_horizon: int = 6  # Number of periods forecast when the task names no months
+    max_parallel_steps: int = 3  # Maximum number of independent plan steps run at once
+    max_findings_tokens: int = 8000  # Token budget of the earlier findings given to an agent
+    recent_findings: int = 2  # Number of latest findings always given verbatim
+    bypass_step_cache: bool = False  # Run every step again instead of reusing memoized results
 
     @classmethod
     def from_runnable_config(
@@ -25,9 +32,16 @@ class Configuration:
         configurable = (
             config["configurable"] if config and "configurable" in config else {}
         )
-        values: dict[str, Any] = {
-            f.name: os.environ.get(f.name.upper(), configurable.get(f.name))
-            for f in fields(cls)
-            if f.init
-        }
-        return cls(**{k: v for k, v in values.items() if v})
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            if not f.init:
+                continue
+            if f.type is bool:
+                # a flag set by the request wins, the environment only changes its default
+                value = configurable.get(f.name)
+                values[f.name] = (
+                    get_bool_env(f.name.upper(), f.default) if value is None else bool(value)
+                )
+            else:
+                values[f.name] = os.environ.get(f.name.upper(), configurable.get(f.name))
+        return cls(**{k: v for k, v in values.items() if v or isinstance(v, bool)})
@@ -0,0 +1,17 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def get_pg_database_url() -> str:
+    """Build the connection URL of the sales PostgreSQL database from env variables."""
+    user = os.getenv("PG_USER_NAME")
+    password = os.getenv("PG_PASSWORD")
+    host = os.getenv("PG_HOST", "10.36.21.200")
+    port = os.getenv("PG_PORT", "5432")
+    database = os.getenv("PG_DATABASE", "dqdb")
+    return f"postgresql://{user}:{password}@{host}:{port}/{database}?sslmode=disable"
@@ -1,10 +1,13 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import logging
 import os
 import yaml
 from typing import Dict, Any
 
+logger = logging.getLogger(__name__)
+
 
 def replace_env_vars(value: str) -> str:
     """Replace environment variables in string values."""
@@ -50,3 +53,43 @@ def load_yaml_config(file_path: str) -> Dict[str, Any]:
     # 将处理后的配置存入缓存
     _config_cache[file_path] = processed_config
     return processed_config
+
+
+def get_int_env(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to default."""
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError:
+        logger.warning(f"Invalid {name} value: '{raw_value}'. Using default value {default}.")
+        return default
+    if value <= 0:
+        logger.warning(f"{name} value '{raw_value}' is not positive. Using default value {default}.")
+        return default
+    return value
+
+
+def get_float_env(name: str, default: float) -> float:
+    """Read a positive float from the environment, falling back to default."""
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    try:
+        value = float(raw_value)
+    except ValueError:
+        logger.warning(f"Invalid {name} value: '{raw_value}'. Using default value {default}.")
+        return default
+    if value <= 0:
+        logger.warning(f"{name} value '{raw_value}' is not positive. Using default value {default}.")
+        return default
+    return value
+
+
+def get_bool_env(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment, falling back to default."""
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
+    return raw_value.strip().lower() in ("1", "true", "yes", "on")
@@ -0,0 +1,45 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Keys of a server setting that describe how to connect to the MCP server
+MCP_CONNECTION_KEYS = ("transport", "command", "args", "url", "env")
+
+
+def get_mcp_server_settings() -> dict[str, dict]:
+    """Get the MCP servers used by the agents, keyed by server name."""
+    return {
+        "tavily-mcp": {
+            "transport": "stdio",
+            "command": "npx",
+            "args": ["-y", "tavily-mcp@0.1.3"],
+            "env": {
+                "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY"),
+            },
+            "enabled_tools": ["tavily_search_results_json"],
+            "add_to_agents": ["researcher"],
+        },
+    }
+
+
+def get_mcp_connections(agent_type: str) -> dict[str, dict]:
+    """
+    Get the MCP connection configs of the servers that should be added to an agent.
+
+    Args:
+        agent_type: The agent that will use the MCP tools
+
+    Returns:
+        Mapping of server name to the connection config accepted by the MCP client
+    """
+    connections = {}
+    for server_name, server_config in get_mcp_server_settings().items():
+        if agent_type in server_config.get("add_to_agents", []):
+            connections[server_name] = {
+                k: v for k, v in server_config.items() if k in MCP_CONNECTION_KEYS
+            }
+    return connections
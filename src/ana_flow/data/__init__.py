@@ -0,0 +1,27 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from .sales import (
+    PERIOD_FREQS,
+    SALES_TABLE,
+    SalesRepository,
+    aggregate_sales,
+    get_sales_repository,
+    close_sales_repository,
+)
+from .cache import SalesCache, get_sales_cache, get_sales_source
+from .resolver import ModelSpecIndex, ModelSpecMatch
+
+__all__ = [
+    "PERIOD_FREQS",
+    "SALES_TABLE",
+    "SalesRepository",
+    "aggregate_sales",
+    "get_sales_repository",
+    "close_sales_repository",
+    "SalesCache",
+    "get_sales_cache",
+    "get_sales_source",
+    "ModelSpecIndex",
+    "ModelSpecMatch",
+]
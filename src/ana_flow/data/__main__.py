@@ -0,0 +1,52 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Command line entry of the local sales cache.
+
+Usage:
+    python -m ana_flow.data sync [--full]
+    python -m ana_flow.data status
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import datetime
+
+from ana_flow.data.cache import get_sales_cache
+from ana_flow.data.sales import close_sales_repository, get_sales_repository
+
+
+async def _sync(full: bool) -> int:
+    try:
+        return await get_sales_cache().sync(get_sales_repository(), full=full)
+    finally:
+        await close_sales_repository()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local sales data cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser(
+        "sync", help="Pull the rows inserted since the last sync from the database"
+    )
+    sync_parser.add_argument(
+        "--full", action="store_true", help="Drop the cache and download the whole table"
+    )
+    subparsers.add_parser("status", help="Show the sync state of the cache")
+
+    args = parser.parse_args()
+    cache = get_sales_cache()
+    if args.command == "sync":
+        fetched = asyncio.run(_sync(args.full))
+        print(f"Fetched {fetched} row(s) into {cache.root}")
+    state = cache.state()
+    if state.get("synced_at"):
+        state["synced_at"] = datetime.fromtimestamp(state["synced_at"]).isoformat()
+    state["stale"] = cache.is_stale()
+    print(json.dumps(state, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
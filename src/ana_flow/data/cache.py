@@ -0,0 +1,261 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ana_flow.config import get_float_env
+from ana_flow.data.resolver import ModelSpecIndex
+from ana_flow.data.sales import (
+    SALES_COLUMNS,
+    SalesRepository,
+    aggregate_sales,
+    get_sales_repository,
+    match_model_specification,
+)
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+# Columns that identify a row, a re-inserted row replaces the cached one with the same key
+_KEY_COLUMNS = [c for c in SALES_COLUMNS if c not in ("quantity", "insert_time")]
+
+_SCHEMA = pa.schema(
+    [
+        (column, pa.int64() if column in ("overall_length", "wheelbase", "quantity") else pa.string())
+        for column in SALES_COLUMNS
+        if column != "insert_time"
+    ]
+    + [("insert_time", pa.timestamp("us"))]
+)
+
+_STATE_FILE = "_sync_state.json"
+_PARTITION_FILE = "part-0.parquet"
+
+
+class SalesCache:
+    """
+    Local Parquet mirror of the weekly sales table, partitioned by year_code.
+
+    ``sync`` pulls the rows inserted after the last seen ``insert_time`` and rewrites
+    the affected year partitions. Reads are memory-mapped and filtered on
+    model_specification, so tools can load a series without touching the database.
+    """
+
+    def __init__(self, root: str | None = None, max_age_seconds: float | None = None):
+        self.root = Path(root or os.getenv("SALES_CACHE_DIR", "sales_cache"))
+        self.max_age_seconds = max_age_seconds or get_float_env(
+            "SALES_CACHE_MAX_AGE", 12 * 3600.0
+        )
+        self._lock = threading.Lock()
+        self._specifications: list[str] | None = None
+        self._model_spec_index: ModelSpecIndex | None = None
+        # the sync the memoized catalog was read at
+        self._memo_sync: tuple | None = None
+
+    def _partition_path(self, year_code: str) -> Path:
+        return self.root / f"year_code={year_code}" / _PARTITION_FILE
+
+    def _partition_paths(self) -> list[Path]:
+        return sorted(self.root.glob(f"year_code=*/{_PARTITION_FILE}"))
+
+    def state(self) -> dict:
+        """Get the sync state: watermark, synced_at and number of rows."""
+        state_path = self.root / _STATE_FILE
+        if not state_path.exists():
+            return {}
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, state: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{_STATE_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.root / _STATE_FILE)
+
+    @property
+    def watermark(self) -> datetime | None:
+        watermark = self.state().get("watermark")
+        return datetime.fromisoformat(watermark) if watermark else None
+
+    def is_stale(self, max_age_seconds: float | None = None) -> bool:
+        """Check whether the cache was never synced or was synced too long ago."""
+        synced_at = self.state().get("synced_at")
+        if not synced_at or not self._partition_paths():
+            return True
+        return time.time() - synced_at > (max_age_seconds or self.max_age_seconds)
+
+    def _merge_partition(self, year_code: str, rows: pd.DataFrame) -> int:
+        path = self._partition_path(year_code)
+        if path.exists():
+            existing = pq.read_table(path, memory_map=True).to_pandas()
+            rows = pd.concat([existing, rows], ignore_index=True)
+        # keep the latest version of re-inserted rows
+        rows = rows.sort_values("insert_time", kind="stable").drop_duplicates(
+            subset=_KEY_COLUMNS, keep="last"
+        )
+        # sorting by model_specification keeps row group statistics selective for reads
+        rows = rows.sort_values(["model_specification", "week_code"], kind="stable")
+        table = pa.Table.from_pandas(rows[SALES_COLUMNS], schema=_SCHEMA, preserve_index=False)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(table, tmp_path, row_group_size=64 * 1024)
+        os.replace(tmp_path, path)
+        return len(rows)
+
+    def apply_rows(self, rows: pd.DataFrame) -> int:
+        """Merge newly inserted table rows into the cache and advance the watermark."""
+        if rows.empty:
+            return 0
+        rows = rows.copy()
+        rows["year_code"] = rows["year_code"].astype(str)
+        rows["insert_time"] = pd.to_datetime(rows["insert_time"])
+        with self._lock:
+            for year_code, year_rows in rows.groupby("year_code"):
+                self._merge_partition(year_code, year_rows)
+            state = self.state()
+            new_watermark = rows["insert_time"].max()
+            if pd.notna(new_watermark):
+                old_watermark = self.watermark
+                if old_watermark is None or new_watermark.to_pydatetime() > old_watermark:
+                    state["watermark"] = new_watermark.isoformat()
+            self._save_state(state)
+            self._specifications = None
+            self._model_spec_index = None
+        return len(rows)
+
+    def mark_synced(self) -> None:
+        with self._lock:
+            state = self.state()
+            state["synced_at"] = time.time()
+            state["rows"] = sum(
+                pq.ParquetFile(path).metadata.num_rows for path in self._partition_paths()
+            )
+            self._save_state(state)
+
+    async def sync(self, repository: SalesRepository, full: bool = False) -> int:
+        """
+        Pull the rows inserted since the watermark from the database.
+
+        Args:
+            repository: Repository used to query the sales table
+            full: Drop the cache and download the whole table again
+
+        Returns:
+            Number of rows fetched from the database
+        """
+        if full and self.root.exists():
+            shutil.rmtree(self.root)
+        watermark = self.watermark
+        logger.info(f"Syncing sales cache at {self.root} since watermark {watermark}")
+        fetched = 0
+        async for batch in repository.iter_rows_since(watermark):
+            fetched += await asyncio.to_thread(self.apply_rows, batch)
+        await asyncio.to_thread(self.mark_synced)
+        logger.info(f"Sales cache sync fetched {fetched} row(s)")
+        return fetched
+
+    def _read(self, columns: list[str], filters=None) -> pd.DataFrame:
+        paths = self._partition_paths()
+        if not paths:
+            return pd.DataFrame(columns=columns)
+        frames = [
+            pq.read_table(path, columns=columns, filters=filters, memory_map=True).to_pandas()
+            for path in paths
+        ]
+        return pd.concat(frames, ignore_index=True)
+
+    def read_weekly_sales(self, model_specification: str) -> pd.DataFrame:
+        """Read the weekly (year_code, week, quantity) sales of one model_specification."""
+        rows = self._read(
+            ["year_code", "week", "quantity"],
+            filters=[("model_specification", "=", model_specification)],
+        )
+        if rows.empty:
+            return pd.DataFrame(columns=["year_code", "week", "quantity"])
+        return rows.groupby(["year_code", "week"], as_index=False)["quantity"].sum()
+
+    def _refresh_memo(self) -> None:
+        # the cache may be synced by another process, e.g. the sync command
+        state = self.state()
+        sync = (state.get("watermark"), state.get("synced_at"))
+        if sync != self._memo_sync:
+            self._specifications = None
+            self._model_spec_index = None
+            self._memo_sync = sync
+
+    def read_model_specifications(self) -> list[str]:
+        self._refresh_memo()
+        if self._specifications is None:
+            values = self._read(["model_specification"])["model_specification"].dropna()
+            self._specifications = sorted(values.unique().tolist())
+        return self._specifications
+
+    def read_model_spec_index(self) -> ModelSpecIndex:
+        """Build the resolver index over the distinct brand/model/model_specification values."""
+        self._refresh_memo()
+        if self._model_spec_index is None:
+            catalog = self._read(["car_brand", "model", "model_specification"])
+            catalog = catalog.dropna(subset=["model_specification"]).drop_duplicates()
+            catalog = catalog.sort_values("model_specification").fillna("")
+            self._model_spec_index = ModelSpecIndex.from_rows(catalog.to_dict("records"))
+        return self._model_spec_index
+
+    # async interface shared with SalesRepository, so the loader can use either one
+
+    async def list_model_specifications(self) -> list[str]:
+        return await asyncio.to_thread(self.read_model_specifications)
+
+    async def model_spec_index(self) -> ModelSpecIndex:
+        return await asyncio.to_thread(self.read_model_spec_index)
+
+    async def match_model_specification(self, name: str) -> str | None:
+        return match_model_specification(name, await self.list_model_specifications())
+
+    async def sales_watermark(self) -> datetime | None:
+        return await asyncio.to_thread(lambda: self.watermark)
+
+    async def load_sales_series(
+        self, model_specification: str, freq: str = "month"
+    ) -> pd.DataFrame:
+        weekly = await asyncio.to_thread(self.read_weekly_sales, model_specification)
+        logger.info(
+            f"Loaded {len(weekly)} weekly sales rows of '{model_specification}' from the sales cache"
+        )
+        return aggregate_sales(weekly, freq)
+
+
+_cache: SalesCache | None = None
+
+
+def get_sales_cache() -> SalesCache:
+    """Get the process wide sales cache."""
+    global _cache
+    if _cache is None:
+        _cache = SalesCache()
+    return _cache
+
+
+def get_sales_source() -> SalesCache | SalesRepository:
+    """
+    The local sales cache, or the database when the cache is stale.
+
+    Both load the sales series, resolve model specifications and tell the
+    ``sales_watermark`` of the data they read.
+    """
+    sales_cache = get_sales_cache()
+    if sales_cache.is_stale():
+        logger.info("Sales cache is stale, loading the sales data from database.")
+        return get_sales_repository()
+    return sales_cache
@@ -0,0 +1,236 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+from pypinyin import lazy_pinyin
+
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z一-鿿]+")
+
+# candidates re-ranked with edit distance after the n-gram lookup
+_RERANK_SIZE = 8
+
+# separator of joined tokens, keeps "he|ng" from matching "h|eng"
+_SEP = "\x1f"
+
+
+def normalize(text: str) -> str:
+    """Fold width and case, and drop whitespace and punctuation: "银河 E5  440" -> "银河e5440"."""
+    return _NON_WORD_PATTERN.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+@lru_cache(maxsize=None)
+def _char_token(char: str) -> str:
+    if "一" <= char <= "鿿":
+        return lazy_pinyin(char)[0]
+    return char
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """
+    Split a text into match tokens: toneless pinyin per Chinese character, the character itself otherwise.
+
+    Homophones share a token, so "哈佛猛龙" and "哈弗猛龙" tokenize the same.
+    """
+    return tuple(_char_token(char) for char in normalize(text))
+
+
+def _ngrams(tokens: Sequence[str]) -> set[str]:
+    if len(tokens) < 2:
+        return {_SEP.join(tokens)} if tokens else set()
+    grams = set()
+    for n in (2, 3):
+        grams.update(_SEP.join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+
+def partial_edit_distance(pattern: Sequence[str], text: Sequence[str]) -> int:
+    """
+    Smallest edit distance between ``pattern`` and any substring of ``text``.
+
+    Myers' bit-parallel variant of Sellers' algorithm, one pass over ``text``
+    with a bit vector per pattern position.
+    """
+    m = len(pattern)
+    if m == 0:
+        return 0
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    peq: dict[str, int] = defaultdict(int)
+    for i, token in enumerate(pattern):
+        peq[token] |= 1 << i
+    pv, mv, score = mask, 0, m
+    best = m
+    for token in text:
+        eq = peq.get(token, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        # the match may start anywhere in text, so no carry is shifted into row 0
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score < best:
+            best = score
+            if best == 0:
+                break
+    return best
+
+
+@dataclass
+class ModelSpecEntry:
+    model_specification: str
+    car_brand: str = ""
+    model: str = ""
+
+
+@dataclass
+class ModelSpecMatch:
+    model_specification: str
+    car_brand: str
+    model: str
+    score: float
+
+
+class ModelSpecIndex:
+    """
+    In-memory index resolving a user phrase to canonical model_specification values.
+
+    Every entry is indexed by the token bi/tri-grams of its model_specification.
+    A lookup collects the entries sharing grams with the phrase, then re-ranks the
+    best ones by partial edit distance, so a phrase may contain the model name
+    anywhere, e.g. "请预测银河E5 440 9月份的销售量".
+    """
+
+    def __init__(self, entries: Iterable[ModelSpecEntry]):
+        self.entries: list[ModelSpecEntry] = []
+        self._forms: list[tuple[tuple[str, ...], ...]] = []
+        self._normalized: list[str] = []
+        self._gram_counts: list[int] = []
+        self._grams: dict[str, list[int]] = defaultdict(list)
+        seen = set()
+        for entry in entries:
+            if not entry.model_specification or entry.model_specification in seen:
+                continue
+            seen.add(entry.model_specification)
+            entry_id = len(self.entries)
+            self.entries.append(entry)
+            self._normalized.append(normalize(entry.model_specification))
+            forms = self._entry_forms(entry)
+            self._forms.append(forms)
+            grams = _ngrams(forms[0])
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._grams[gram].append(entry_id)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "ModelSpecIndex":
+        """Build the index from rows with model_specification, car_brand and model keys."""
+        return cls(
+            ModelSpecEntry(
+                model_specification=row["model_specification"],
+                car_brand=row.get("car_brand") or "",
+                model=row.get("model") or "",
+            )
+            for row in rows
+        )
+
+    @staticmethod
+    def _entry_forms(entry: ModelSpecEntry) -> tuple[tuple[str, ...], ...]:
+        specification = tokenize(entry.model_specification)
+        forms = [specification]
+        # users often prefix the brand, e.g. "长城高山 140" or "吉利银河E5"
+        brand = tokenize(entry.car_brand)
+        if brand and specification[: len(brand)] != brand:
+            forms.append(brand + specification)
+        return tuple(forms)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def resolve(self, phrase: str, limit: int = 5) -> list[ModelSpecMatch]:
+        """
+        Resolve a phrase to ranked candidates.
+
+        Args:
+            phrase: The user's wording, a model name or a whole question
+            limit: Maximum number of candidates to return
+
+        Returns:
+            Candidates sorted by descending score, 1.0 means the model name appears in the phrase
+        """
+        query = tokenize(phrase)
+        if not query or not self.entries:
+            return []
+        shared: dict[int, int] = defaultdict(int)
+        for gram in _ngrams(query):
+            for entry_id in self._grams.get(gram, ()):
+                shared[entry_id] += 1
+        if not shared:
+            return []
+
+        gram_counts = self._gram_counts
+        coarse = sorted(shared, key=lambda i: shared[i] / gram_counts[i], reverse=True)
+        joined_query = _SEP + _SEP.join(query) + _SEP
+        normalized_query = normalize(phrase)
+        ranked = []
+        for entry_id in coarse[: max(limit, _RERANK_SIZE)]:
+            edit_score = 0.0
+            for form in self._forms[entry_id]:
+                if _SEP + _SEP.join(form) + _SEP in joined_query:
+                    edit_score = 1.0
+                    break
+                distance = partial_edit_distance(form, query)
+                edit_score = max(edit_score, 1 - distance / len(form))
+            gram_score = min(1.0, shared[entry_id] / gram_counts[entry_id])
+            ranked.append(
+                (
+                    round(0.8 * edit_score + 0.2 * gram_score, 4),
+                    # among equal scores prefer the exact spelling, then the more
+                    # specific name: "高山 140" over "高山"
+                    self._normalized[entry_id] in normalized_query,
+                    len(self._forms[entry_id][0]),
+                    entry_id,
+                )
+            )
+        ranked.sort(key=lambda item: (-item[0], not item[1], -item[2], item[3]))
+        return [
+            ModelSpecMatch(
+                model_specification=self.entries[entry_id].model_specification,
+                car_brand=self.entries[entry_id].car_brand,
+                model=self.entries[entry_id].model,
+                score=score,
+            )
+            for score, _, _, entry_id in ranked[:limit]
+        ]
+
+    def resolve_named(self, phrase: str) -> list[str]:
+        """Return every model_specification the phrase names in full, e.g. the models a task compares."""
+        matches = self.resolve(phrase, limit=_RERANK_SIZE)
+        contained = [
+            (match.model_specification, _SEP.join(tokenize(match.model_specification)))
+            for match in matches
+            if match.score >= 1.0
+        ]
+        # "高山 140" also contains "高山", only the longest name counts
+        return [
+            specification
+            for specification, joined in contained
+            if not any(joined != other and joined in other for _, other in contained)
+        ]
+
+    def resolve_unique(self, phrase: str) -> str | None:
+        """Return the model_specification when the phrase names exactly one model, None when it is ambiguous."""
+        named = self.resolve_named(phrase)
+        return named[0] if len(named) == 1 else None
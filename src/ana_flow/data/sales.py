@@ -0,0 +1,316 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import difflib
+import re
+import time
+from datetime import date, datetime
+from typing import AsyncIterator
+
+import pandas as pd
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from ana_flow.config import get_float_env, get_int_env
+from ana_flow.config.database import get_pg_database_url
+from ana_flow.data.resolver import ModelSpecIndex
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+# 国内乘用车周度上险数据, see database_info.md for the schema
+SALES_TABLE = "dws.dws_domestic_vehicle_sales_data_by_week"
+
+_WEEKLY_SALES_SQL = f"""
+    SELECT year_code, week, SUM(quantity) AS quantity
+    FROM {SALES_TABLE}
+    WHERE model_specification = %(model_specification)s
+    GROUP BY year_code, week
+"""
+
+_MODEL_CATALOG_SQL = f"""
+    SELECT DISTINCT car_brand, model, model_specification
+    FROM {SALES_TABLE}
+    WHERE model_specification IS NOT NULL
+    ORDER BY model_specification
+"""
+
+SALES_COLUMNS = [
+    "enterprise_short_name",
+    "use_type",
+    "car_brand",
+    "model",
+    "model_specification",
+    "vehicle_class",
+    "vehicle_class_autohome",
+    "overall_length",
+    "year_code",
+    "week",
+    "week_code",
+    "energy_type",
+    "fuel_type",
+    "vehicle_type",
+    "wheelbase",
+    "quantity",
+    "insert_time",
+]
+
+_LATEST_INSERT_SQL = f"SELECT MAX(insert_time) AS insert_time FROM {SALES_TABLE}"
+
+_ROWS_SINCE_SQL = f"""
+    SELECT {", ".join(SALES_COLUMNS)}
+    FROM {SALES_TABLE}
+    WHERE %(watermark)s::timestamp IS NULL OR insert_time > %(watermark)s::timestamp
+    ORDER BY insert_time
+"""
+
+_WEEK_NUMBER_PATTERN = re.compile(r"(\d+)\D*$")
+
+# pandas offsets of the periods of a sales series, weeks start on Monday like ISO weeks
+PERIOD_FREQS = {"week": "W-MON", "month": "MS"}
+
+
+def week_start(year_code: str, week: str) -> pd.Timestamp:
+    """
+    Get the Monday of an ISO week, e.g. ("2025", "WK7") -> 2025-02-10.
+
+    The week column holds values like "7" or "WK7", the last number is the week number.
+    """
+    match = _WEEK_NUMBER_PATTERN.search(str(week))
+    if not match:
+        raise ValueError(f"Invalid week value: {week}")
+    return pd.Timestamp(date.fromisocalendar(int(year_code), int(match.group(1)), 1))
+
+
+def _week_start_or_nat(year_code: str, week: str) -> pd.Timestamp:
+    try:
+        return week_start(year_code, week)
+    except (TypeError, ValueError):
+        # e.g. week 53 of a year with 52 ISO weeks
+        return pd.NaT
+
+
+def aggregate_sales(
+    weekly: pd.DataFrame, freq: str = "month", complete_only: bool = True
+) -> pd.DataFrame:
+    """
+    Turn weekly (year_code, week, quantity) rows into a sales series.
+
+    Args:
+        weekly: Rows with the year_code, week and quantity columns
+        freq: "week" to keep weekly periods or "month" to sum the weeks of each month,
+            a week belongs to the month of its Thursday like ISO weeks belong to years
+        complete_only: Drop the last month when the data stops before its last week,
+            a month in progress would read as a drop in sales
+
+    Rows whose year_code and week are not an ISO week are skipped with a warning.
+
+    Returns:
+        DataFrame indexed by "period" with a single "quantity" column, one row per
+        period from the first to the last, a period without sales is 0
+    """
+    if freq not in PERIOD_FREQS:
+        raise ValueError(f"Unsupported frequency: {freq}")
+    periods = [
+        _week_start_or_nat(year_code, week)
+        for year_code, week in zip(weekly["year_code"], weekly["week"])
+    ]
+    df = pd.DataFrame(
+        {
+            "period": pd.to_datetime(pd.Series(periods, dtype="object")),
+            "quantity": weekly["quantity"].fillna(0).astype("int64").values,
+        }
+    )
+    invalid = df["period"].isna()
+    if invalid.any():
+        skipped = weekly[invalid.values][["year_code", "week"]].drop_duplicates()
+        logger.warning(
+            f"Skipped {int(invalid.sum())} sales rows with an invalid ISO week: "
+            f"{', '.join(f'{year} {week}' for year, week in skipped.itertuples(index=False))}"
+        )
+        df = df[~invalid]
+    if df.empty:
+        return pd.DataFrame(
+            {"quantity": pd.Series(dtype="int64")},
+            index=pd.DatetimeIndex([], name="period"),
+        )
+    if freq == "month":
+        thursdays = df["period"] + pd.Timedelta(days=3)
+        df["period"] = thursdays.dt.to_period("M").dt.to_timestamp()
+        latest = thursdays.max()
+        if complete_only and (latest + pd.Timedelta(days=7)).month == latest.month:
+            # the week after the latest one still belongs to its month
+            logger.info(f"Dropped the incomplete month {latest:%Y-%m} of the sales series")
+            df = df[df["period"] != df["period"].max()]
+    series = df.groupby("period").sum().sort_index()
+    if series.empty:
+        return series
+    # the forecasting models expect evenly spaced periods
+    index = pd.date_range(
+        series.index[0], series.index[-1], freq=PERIOD_FREQS[freq], name="period"
+    )
+    return series.reindex(index, fill_value=0)
+
+
+def match_model_specification(name: str, specifications: list[str]) -> str | None:
+    """Map a model_specification picked by the LLM onto an existing value of the table."""
+    if name in specifications:
+        return name
+    matches = difflib.get_close_matches(name, specifications, n=1, cutoff=0.6)
+    return matches[0] if matches else None
+
+
+class SalesRepository:
+    """
+    Deterministic access to the weekly sales table over a pooled async connection.
+
+    The loader only asks the LLM which model_specification the user means, the
+    series itself is aggregated in SQL and returned as a DataFrame.
+    """
+
+    def __init__(self, conninfo: str | None = None, max_size: int | None = None):
+        self._pool = AsyncConnectionPool(
+            conninfo or get_pg_database_url(),
+            min_size=1,
+            max_size=max_size or get_int_env("PG_POOL_SIZE", 5),
+            kwargs={"row_factory": dict_row},
+            open=False,
+        )
+        self._opened = False
+        self._open_lock = asyncio.Lock()
+        self._model_spec_index: ModelSpecIndex | None = None
+        self._model_specifications_loaded_at = 0.0
+        self._model_specifications_ttl = get_int_env("MODEL_SPECIFICATIONS_TTL", 3600)
+        self._watermark: datetime | None = None
+        self._watermark_read_at: float | None = None
+        self._watermark_ttl = get_float_env("SALES_WATERMARK_TTL", 60.0)
+        self._watermark_lock = asyncio.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def _ensure_open(self) -> None:
+        if self._opened:
+            return
+        async with self._open_lock:
+            if not self._opened:
+                self._loop = asyncio.get_running_loop()
+                await self._pool.open()
+                self._opened = True
+
+    async def close(self) -> None:
+        if self._opened:
+            await self._pool.close()
+            self._opened = False
+
+    async def fetch_weekly_sales(self, model_specification: str) -> pd.DataFrame:
+        """Fetch the weekly sales rows of one model_specification."""
+        await self._ensure_open()
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(
+                _WEEKLY_SALES_SQL, {"model_specification": model_specification}
+            )
+            rows = await cursor.fetchall()
+        return pd.DataFrame(rows, columns=["year_code", "week", "quantity"])
+
+    async def load_sales_series(
+        self, model_specification: str, freq: str = "month"
+    ) -> pd.DataFrame:
+        """Load the sales series of one model_specification, indexed by period."""
+        weekly = await self.fetch_weekly_sales(model_specification)
+        logger.info(
+            f"Loaded {len(weekly)} weekly sales rows of '{model_specification}' from {SALES_TABLE}"
+        )
+        return aggregate_sales(weekly, freq)
+
+    async def sales_watermark(self) -> datetime | None:
+        """
+        The latest insert_time of the table, it changes whenever new sales are inserted.
+
+        Every step of a run asks for it, so it is queried at most once every
+        SALES_WATERMARK_TTL seconds.
+        """
+        async with self._watermark_lock:
+            if (
+                self._watermark_read_at is not None
+                and time.monotonic() - self._watermark_read_at < self._watermark_ttl
+            ):
+                return self._watermark
+            await self._ensure_open()
+            async with self._pool.connection() as conn:
+                cursor = await conn.execute(_LATEST_INSERT_SQL)
+                row = await cursor.fetchone()
+            self._watermark = row["insert_time"] if row else None
+            self._watermark_read_at = time.monotonic()
+            return self._watermark
+
+    async def model_spec_index(self) -> ModelSpecIndex:
+        """Get the index of the distinct brand/model/model_specification values, rebuilt every MODEL_SPECIFICATIONS_TTL seconds."""
+        if (
+            self._model_spec_index is not None
+            and time.monotonic() - self._model_specifications_loaded_at
+            < self._model_specifications_ttl
+        ):
+            return self._model_spec_index
+        await self._ensure_open()
+        async with self._pool.connection() as conn:
+            cursor = await conn.execute(_MODEL_CATALOG_SQL)
+            rows = await cursor.fetchall()
+        self._model_spec_index = ModelSpecIndex.from_rows(rows)
+        self._model_specifications_loaded_at = time.monotonic()
+        return self._model_spec_index
+
+    async def list_model_specifications(self) -> list[str]:
+        """List the distinct model_specification values."""
+        index = await self.model_spec_index()
+        return [entry.model_specification for entry in index.entries]
+
+    async def match_model_specification(self, name: str) -> str | None:
+        """Map a model_specification picked by the LLM onto an existing value of the table."""
+        return match_model_specification(name, await self.list_model_specifications())
+
+    async def iter_rows_since(
+        self, watermark: datetime | None, batch_size: int = 50000
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Stream the raw table rows inserted after a watermark, in insert_time order.
+
+        Args:
+            watermark: Only rows with a later insert_time are returned, None for all rows
+            batch_size: Number of rows per yielded DataFrame
+
+        Yields:
+            DataFrames with the SALES_COLUMNS columns
+        """
+        await self._ensure_open()
+        async with self._pool.connection() as conn:
+            # a named cursor keeps the result set on the server
+            async with conn.transaction():
+                async with conn.cursor(name="sales_rows_since") as cursor:
+                    await cursor.execute(_ROWS_SINCE_SQL, {"watermark": watermark})
+                    while rows := await cursor.fetchmany(batch_size):
+                        yield pd.DataFrame(rows, columns=SALES_COLUMNS)
+
+
+_repository: SalesRepository | None = None
+
+
+def get_sales_repository() -> SalesRepository:
+    """Get the process wide sales repository, a new one is created per event loop."""
+    global _repository
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if _repository is None or (
+        _repository._loop is not None and _repository._loop is not loop
+    ):
+        _repository = SalesRepository()
+    return _repository
+
+
+async def close_sales_repository() -> None:
+    """Close the connection pool of the process wide sales repository."""
+    global _repository
+    if _repository is not None:
+        await _repository.close()
+        _repository = None
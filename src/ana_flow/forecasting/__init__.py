@@ -0,0 +1,24 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from .models import ForecastModel
+from .engine import (
+    ForecastResult,
+    forecast_series,
+    forecast_batch,
+    get_forecast_executor,
+    close_forecast_executor,
+)
+from .period import months_between, parse_month, resolve_forecast_period
+
+__all__ = [
+    "ForecastModel",
+    "ForecastResult",
+    "forecast_series",
+    "forecast_batch",
+    "get_forecast_executor",
+    "close_forecast_executor",
+    "resolve_forecast_period",
+    "parse_month",
+    "months_between",
+]
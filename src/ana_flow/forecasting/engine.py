@@ -0,0 +1,199 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+from ana_flow.config import get_int_env
+from ana_flow.forecasting.models import MODEL_FITTERS, ForecastModel
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+# models compared on a holdout by the auto model
+AUTO_CANDIDATES = [ForecastModel.ARIMA, ForecastModel.ETS, ForecastModel.SEASONAL_NAIVE]
+
+# series shorter than this are forecast with the seasonal naive model
+MIN_FIT_LENGTH = 8
+
+
+@dataclass
+class ForecastResult:
+    """Point forecasts with a prediction interval, indexed by the future periods."""
+
+    name: str
+    model: ForecastModel
+    level: float
+    forecast: pd.DataFrame  # columns: mean, lower, upper
+    backtest_mae: dict[str, float] = field(default_factory=dict)
+
+    def to_markdown(self) -> str:
+        frame = self.forecast.round(1)
+        if isinstance(frame.index, pd.DatetimeIndex):
+            frame.index = frame.index.strftime("%Y-%m-%d")
+        frame.index.name = "period"
+        lines = [
+            f"## Forecast of {self.name}",
+            "",
+            f"- Model: {self.model.value}",
+            f"- Prediction interval: {self.level:.0%}",
+        ]
+        if self.backtest_mae:
+            lines.append(
+                "- Holdout MAE: "
+                + ", ".join(f"{model} {mae:.1f}" for model, mae in self.backtest_mae.items())
+            )
+        return "\n".join(lines + ["", frame.to_markdown()])
+
+
+def _future_index(index: pd.Index, horizon: int, freq: str | None) -> pd.Index:
+    freq = freq or getattr(index, "freq", None)
+    if isinstance(index, pd.DatetimeIndex) and len(index) and freq:
+        return pd.date_range(index[-1], periods=horizon + 1, freq=freq)[1:]
+    return pd.RangeIndex(len(index), len(index) + horizon)
+
+
+def _select_model(values: np.ndarray, horizon: int, season_length: int, level: float):
+    """Pick the candidate with the lowest MAE on the last periods of the series."""
+    holdout = min(horizon, max(1, len(values) // 4))
+    train, actual = values[:-holdout], values[-holdout:]
+    scores = {}
+    for model in AUTO_CANDIDATES:
+        try:
+            mean, _, _ = MODEL_FITTERS[model](train, holdout, season_length, level)
+        except Exception as e:
+            logger.warning(f"Holdout fit of {model.value} failed: {e}")
+            continue
+        scores[model] = float(np.mean(np.abs(np.asarray(mean) - actual)))
+    best = min(scores, key=scores.get)
+    return best, {model.value: mae for model, mae in scores.items()}
+
+
+def forecast_series(
+    series: pd.Series | pd.DataFrame,
+    horizon: int,
+    model: ForecastModel | str = ForecastModel.AUTO,
+    level: float = 0.95,
+    season_length: int = 12,
+    name: str | None = None,
+    freq: str | None = None,
+) -> ForecastResult:
+    """
+    Forecast one series.
+
+    Args:
+        series: Observations in time order, a DataFrame must have a quantity column
+        horizon: Number of periods to forecast
+        model: Model to fit, auto compares all models on a holdout of the last periods
+        level: Coverage of the prediction interval
+        season_length: Periods per season, 12 for monthly and 52 for weekly series
+        name: Name of the series in the result
+        freq: Pandas offset of the periods, e.g. MS, defaults to the freq of the index
+
+    Returns:
+        The forecast of the periods after the series
+    """
+    if isinstance(series, pd.DataFrame):
+        series = series["quantity"]
+    if horizon < 1:
+        raise ValueError(f"Forecast horizon must be positive, got {horizon}")
+    series = series.dropna()
+    if series.empty:
+        raise ValueError("Cannot forecast an empty series")
+    model = ForecastModel(model)
+    values = series.to_numpy(dtype=float)
+
+    backtest_mae = {}
+    if len(values) < MIN_FIT_LENGTH:
+        model = ForecastModel.SEASONAL_NAIVE
+    elif model == ForecastModel.AUTO:
+        model, backtest_mae = _select_model(values, horizon, season_length, level)
+
+    try:
+        mean, lower, upper = MODEL_FITTERS[model](values, horizon, season_length, level)
+    except Exception as e:
+        if model == ForecastModel.SEASONAL_NAIVE:
+            raise
+        logger.warning(f"Fitting {model.value} failed, falling back to seasonal naive: {e}")
+        model = ForecastModel.SEASONAL_NAIVE
+        mean, lower, upper = MODEL_FITTERS[model](values, horizon, season_length, level)
+
+    # sales cannot be negative
+    forecast = pd.DataFrame(
+        {"mean": mean, "lower": lower, "upper": upper},
+        index=_future_index(series.index, horizon, freq),
+    ).clip(lower=0)
+    return ForecastResult(
+        name=name or str(series.name or "series"),
+        model=model,
+        level=level,
+        forecast=forecast,
+        backtest_mae=backtest_mae,
+    )
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_forecast_executor() -> ProcessPoolExecutor:
+    """Get the process pool of the batch forecasts, workers are kept between batches."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=get_int_env("FORECAST_MAX_WORKERS", min(4, os.cpu_count() or 1)),
+            # forking a process that runs the event loop and http clients is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def close_forecast_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def forecast_batch(
+    series: Mapping[str, pd.Series | pd.DataFrame],
+    horizon: int,
+    model: ForecastModel | str = ForecastModel.AUTO,
+    level: float = 0.95,
+    season_length: int = 12,
+    freq: str | None = None,
+    parallel: bool = True,
+) -> dict[str, ForecastResult]:
+    """
+    Forecast several series, fitted in parallel in the forecast process pool.
+
+    Args:
+        series: Series keyed by name
+        horizon: Number of periods to forecast
+        model: Model to fit for every series
+        level: Coverage of the prediction interval
+        season_length: Periods per season
+        freq: Pandas offset of the periods, e.g. MS, defaults to the freq of each index
+        parallel: Fit in the process pool, otherwise one after another in this process
+
+    Returns:
+        Forecasts keyed by the series name
+    """
+    if not parallel or len(series) < 2:
+        return {
+            name: forecast_series(values, horizon, model, level, season_length, name, freq)
+            for name, values in series.items()
+        }
+    executor = get_forecast_executor()
+    futures = {
+        name: executor.submit(
+            forecast_series, values, horizon, model, level, season_length, name, freq
+        )
+        for name, values in series.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
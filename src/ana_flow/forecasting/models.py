@@ -0,0 +1,91 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import warnings
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+# (p, d, q) orders tried by the ARIMA model, the one with the lowest AIC is kept
+ARIMA_ORDERS = [(0, 1, 1), (1, 1, 0), (1, 1, 1)]
+
+
+class ForecastModel(str, Enum):
+    AUTO = "auto"
+    ARIMA = "arima"
+    ETS = "ets"
+    SEASONAL_NAIVE = "seasonal_naive"
+
+
+def _is_seasonal(values: np.ndarray, season_length: int) -> bool:
+    return season_length > 1 and len(values) >= 2 * season_length
+
+
+def fit_seasonal_naive(
+    values: np.ndarray, horizon: int, season_length: int, level: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Repeat the last season, the interval widens with the number of seasons ahead."""
+    m = season_length if len(values) >= season_length > 1 else 1
+    steps = np.arange(horizon)
+    mean = values[-m:][steps % m].astype(float)
+    residuals = values[m:] - values[:-m]
+    sigma = residuals.std(ddof=1) if len(residuals) > 1 else 0.0
+    width = norm.ppf(0.5 + level / 2) * sigma * np.sqrt(steps // m + 1)
+    return mean, mean - width, mean + width
+
+
+def fit_arima(
+    values: np.ndarray, horizon: int, season_length: int, level: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit the ARIMA orders of ARIMA_ORDERS, with a seasonal MA term when there are two full seasons."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    seasonal_order = (0, 1, 1, season_length) if _is_seasonal(values, season_length) else (0, 0, 0, 0)
+    best = None
+    with warnings.catch_warnings():
+        # convergence warnings of the grid search are expected
+        warnings.simplefilter("ignore")
+        for order in ARIMA_ORDERS:
+            try:
+                result = ARIMA(values, order=order, seasonal_order=seasonal_order).fit()
+            except (ValueError, np.linalg.LinAlgError):
+                continue
+            if np.isfinite(result.aic) and (best is None or result.aic < best.aic):
+                best = result
+    if best is None:
+        raise ValueError("No ARIMA order could be fitted")
+    forecast = best.get_forecast(horizon)
+    interval = forecast.conf_int(alpha=1 - level)
+    return forecast.predicted_mean, interval[:, 0], interval[:, 1]
+
+
+def fit_ets(
+    values: np.ndarray, horizon: int, season_length: int, level: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Fit an additive ETS model with damped trend, seasonal when there are two full seasons."""
+    from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+
+    seasonal = _is_seasonal(values, season_length)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = ETSModel(
+            pd.Series(values, dtype=float),
+            error="add",
+            trend="add",
+            damped_trend=True,
+            seasonal="add" if seasonal else None,
+            seasonal_periods=season_length if seasonal else None,
+        ).fit(disp=False)
+    frame = result.get_prediction(
+        start=len(values), end=len(values) + horizon - 1
+    ).summary_frame(alpha=1 - level)
+    return frame["mean"].to_numpy(), frame["pi_lower"].to_numpy(), frame["pi_upper"].to_numpy()
+
+
+MODEL_FITTERS = {
+    ForecastModel.ARIMA: fit_arima,
+    ForecastModel.ETS: fit_ets,
+    ForecastModel.SEASONAL_NAIVE: fit_seasonal_naive,
+}
@@ -0,0 +1,66 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import re
+
+import pandas as pd
+
+# 2025年9月, 9月 or 2025-09, the year may be left out of the Chinese form
+_MONTH_PATTERN = re.compile(
+    r"(?:(?P<year>\d{4})\s*年\s*)?(?P<month>\d{1,2})\s*(?:月|(?=\s*(?:-|~|到|至)\s*\d{1,2}\s*月))"
+    r"|(?P<iso_year>\d{4})[-/.](?P<iso_month>\d{1,2})(?!\d)"
+)
+
+
+def _month_mentions(text: str) -> list[tuple[int | None, int]]:
+    mentions = []
+    for match in _MONTH_PATTERN.finditer(text):
+        if match.group("iso_year"):
+            year, month = int(match.group("iso_year")), int(match.group("iso_month"))
+        else:
+            year = int(match.group("year")) if match.group("year") else None
+            month = int(match.group("month"))
+        if 1 <= month <= 12:
+            mentions.append((year, month))
+    return mentions
+
+
+def resolve_forecast_period(
+    text: str, last_period: pd.Timestamp
+) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """
+    Find the months a task asks to forecast, e.g. "从2025年9月到12月" -> 2025-09 to 2025-12.
+
+    A month without a year is the next such month after ``last_period``, the last
+    month of the loaded data, or after the month mentioned before it.
+
+    Returns:
+        The first and last month of the period, None when the text names no month
+    """
+    mentions = _month_mentions(text)
+    if not mentions:
+        return None
+    months = []
+    previous = pd.Timestamp(last_period).to_period("M") + 1
+    for year, month in mentions:
+        if year is None:
+            year = previous.year if month >= previous.month else previous.year + 1
+        previous = pd.Period(year=year, month=month, freq="M")
+        months.append(previous)
+    return min(months).to_timestamp(), max(months).to_timestamp()
+
+
+def parse_month(value: str | None) -> pd.Timestamp | None:
+    """A month given as YYYY-MM, None when it is missing or malformed."""
+    if not value:
+        return None
+    mentions = _month_mentions(value)
+    if len(mentions) != 1 or mentions[0][0] is None:
+        return None
+    year, month = mentions[0]
+    return pd.Timestamp(year=year, month=month, day=1)
+
+
+def months_between(start: pd.Timestamp, end: pd.Timestamp) -> int:
+    """Number of months from ``start`` to ``end``, e.g. 2025-08 to 2025-12 is 4."""
+    return (end.year - start.year) * 12 + end.month - start.month
@@ -2,8 +2,20 @@
 # SPDX-License-Identifier: MIT
 
 from .builder import build_graph_with_memory, build_graph
+from .checkpointer import build_checkpointer, ThreadRetention
+from .artifacts import ArtifactStore, get_artifact_store
+from .speculative import SpeculativeTasks, get_speculative_tasks
+from .step_memo import StepMemo, get_step_memo
 
 __all__ = [
     "build_graph_with_memory",
     "build_graph",
+    "build_checkpointer",
+    "ThreadRetention",
+    "ArtifactStore",
+    "get_artifact_store",
+    "SpeculativeTasks",
+    "get_speculative_tasks",
+    "StepMemo",
+    "get_step_memo",
 ]
@@ -0,0 +1,194 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+
+from ana_flow.config import get_float_env, get_int_env
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+_UNSAFE_PATH_CHARS = re.compile(r"[^\w.-]")
+
+
+@dataclass
+class _Artifact:
+    value: Any = None
+    path: Path | None = None
+    nbytes: int = 0
+
+
+@dataclass
+class _Run:
+    artifacts: dict[str, _Artifact] = field(default_factory=dict)
+    last_used: float = field(default_factory=time.time)
+
+
+class ArtifactStore:
+    """
+    Run-scoped store of the DataFrames, forecasts and files produced by a thread.
+
+    Values are handed between nodes in memory. When the DataFrames held in memory
+    exceed ``memory_limit_bytes`` the least recently used ones are spilled to the
+    run directory as Arrow IPC files and read back memory-mapped. A run is dropped
+    by ``release`` or after ``ttl_seconds`` without activity.
+    """
+
+    def __init__(
+        self,
+        root: str | None = None,
+        memory_limit_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.root = Path(root or os.getenv("ARTIFACTS_DIR", "artifacts"))
+        self.memory_limit_bytes = memory_limit_bytes or get_int_env(
+            "ARTIFACTS_MEMORY_LIMIT", 256 * 1024 * 1024
+        )
+        self.ttl_seconds = ttl_seconds or get_float_env("ARTIFACTS_TTL", 3600.0)
+        self._runs: dict[str, _Run] = {}
+        # DataFrames held in memory, least recently used first
+        self._in_memory: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+
+    def run_dir(self, thread_id: str) -> Path:
+        """Get the directory of a run, for spilled DataFrames and intermediate files."""
+        path = self.root / _UNSAFE_PATH_CHARS.sub("_", thread_id)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _run(self, thread_id: str) -> _Run:
+        run = self._runs.get(thread_id)
+        if run is None:
+            run = self._runs[thread_id] = _Run()
+        run.last_used = time.time()
+        return run
+
+    def _forget(self, thread_id: str, name: str) -> None:
+        nbytes = self._in_memory.pop((thread_id, name), None)
+        if nbytes is not None:
+            self._memory_bytes -= nbytes
+
+    def _spill(self, thread_id: str, name: str) -> Path:
+        artifact = self._runs[thread_id].artifacts[name]
+        path = self.run_dir(thread_id) / f"{name}.arrow"
+        table = pa.Table.from_pandas(artifact.value)
+        tmp_path = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        artifact.path = path
+        artifact.value = None
+        self._forget(thread_id, name)
+        return path
+
+    def _spill_over_limit(self) -> None:
+        while self._memory_bytes > self.memory_limit_bytes and len(self._in_memory) > 1:
+            thread_id, name = next(iter(self._in_memory))
+            path = self._spill(thread_id, name)
+            logger.debug(f"Spilled artifact '{name}' of thread {thread_id} to {path}")
+
+    def put(self, thread_id: str, name: str, value: Any) -> None:
+        """Store a value of a run, replacing the previous value with the same name."""
+        with self._lock:
+            run = self._run(thread_id)
+            previous = run.artifacts.pop(name, None)
+            self._forget(thread_id, name)
+            if previous is not None and previous.path is not None:
+                previous.path.unlink(missing_ok=True)
+            artifact = _Artifact(value=value)
+            run.artifacts[name] = artifact
+            if isinstance(value, pd.DataFrame):
+                artifact.nbytes = int(value.memory_usage(deep=True).sum())
+                self._in_memory[(thread_id, name)] = artifact.nbytes
+                self._memory_bytes += artifact.nbytes
+                self._spill_over_limit()
+
+    def get(self, thread_id: str, name: str) -> Any:
+        """Get a value of a run, raises KeyError when it was not stored."""
+        with self._lock:
+            artifact = self._run(thread_id).artifacts[name]
+            if artifact.path is None:
+                if (thread_id, name) in self._in_memory:
+                    self._in_memory.move_to_end((thread_id, name))
+                return artifact.value
+            path = artifact.path
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    def path(self, thread_id: str, name: str) -> Path:
+        """Get the Arrow IPC file of a DataFrame, for tools that read files, spilling it if needed."""
+        with self._lock:
+            artifact = self._run(thread_id).artifacts[name]
+            if artifact.path is None:
+                if not isinstance(artifact.value, pd.DataFrame):
+                    raise TypeError(f"Artifact '{name}' is not a DataFrame")
+                self._spill(thread_id, name)
+            return artifact.path
+
+    def names(self, thread_id: str) -> list[str]:
+        with self._lock:
+            run = self._runs.get(thread_id)
+            return list(run.artifacts) if run else []
+
+    def release(self, thread_id: str) -> None:
+        """Drop all values and files of a run."""
+        with self._lock:
+            run = self._runs.pop(thread_id, None)
+            if run is not None:
+                for name in run.artifacts:
+                    self._forget(thread_id, name)
+        shutil.rmtree(self.root / _UNSAFE_PATH_CHARS.sub("_", thread_id), ignore_errors=True)
+
+    def prune(self) -> int:
+        """Release the runs idle for longer than ttl_seconds, returns how many were released."""
+        deadline = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [t for t, run in self._runs.items() if run.last_used < deadline]
+        for thread_id in expired:
+            self.release(thread_id)
+        if expired:
+            logger.info(f"Released the artifacts of {len(expired)} idle run(s)")
+        return len(expired)
+
+    async def run_forever(self, interval: float | None = None) -> None:
+        """Prune periodically, meant to run as a background task of the server."""
+        interval = interval or get_float_env("ARTIFACTS_PRUNE_INTERVAL", 300.0)
+        while True:
+            try:
+                await asyncio.to_thread(self.prune)
+            except Exception as e:
+                logger.error(f"Error pruning run artifacts: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runs": len(self._runs),
+                "in_memory": len(self._in_memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+_store: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the process wide artifact store."""
+    global _store
+    if _store is None:
+        _store = ArtifactStore()
+    return _store
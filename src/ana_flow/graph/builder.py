@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 
 from .types import State
@@ -17,7 +18,6 @@ from .nodes import (
     loader_node,
     human_feedback_node,
     background_investigation_node,
-    init_forcast_node,
 )
 
 
@@ -33,7 +33,6 @@ def _build_base_graph():
     builder.add_node("researcher", researcher_node)
     builder.add_node("coder", coder_node)
     builder.add_node("loader", loader_node)
-    builder.add_node("init_forcast_node", init_forcast_node)
     builder.add_node("conclusion", conclusion_node)
     builder.add_node("human_feedback", human_feedback_node)
     builder.add_node("human_edit", human_edit_node)
@@ -41,11 +40,16 @@ def _build_base_graph():
     return builder
 
 
-def build_graph_with_memory():
-    """Build and return the agent workflow graph with memory."""
+def build_graph_with_memory(checkpointer: BaseCheckpointSaver | None = None):
+    """
+    Build and return the agent workflow graph with memory.
+
+    Args:
+        checkpointer: Checkpointer opened with ``build_checkpointer``, an in-process
+            MemorySaver is used when it is not given
+    """
     # use persistent memory to save conversation history
-    # TODO: be compatible with SQLite / PostgreSQL
-    memory = MemorySaver()
+    memory = checkpointer or MemorySaver()
 
     # build state graph
     builder = _build_base_graph()
@@ -0,0 +1,235 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from ana_flow.config import get_float_env, get_int_env
+from ana_flow.config.checkpointer import (
+    CHECKPOINTER_POSTGRES_URL,
+    CHECKPOINTER_SQLITE_PATH,
+    SELECTED_CHECKPOINTER,
+    CheckpointerBackend,
+)
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+
+@asynccontextmanager
+async def build_checkpointer(
+    backend: str | None = None,
+) -> AsyncIterator[BaseCheckpointSaver]:
+    """
+    Open the checkpointer of the selected backend for the lifetime of the context.
+
+    Args:
+        backend: One of the CheckpointerBackend values, defaults to the CHECKPOINTER env variable
+
+    Yields:
+        A checkpointer ready to be passed to ``build_graph_with_memory``
+    """
+    backend = backend or SELECTED_CHECKPOINTER
+    if backend == CheckpointerBackend.MEMORY.value:
+        yield MemorySaver()
+    elif backend == CheckpointerBackend.SQLITE.value:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        # a single shared connection, SQLite serializes writers anyway and WAL mode
+        # lets other worker processes read and write the same file
+        async with aiosqlite.connect(CHECKPOINTER_SQLITE_PATH) as conn:
+            await conn.execute("PRAGMA busy_timeout = 5000")
+            saver = AsyncSqliteSaver(conn)
+            await saver.setup()
+            logger.info(f"Using SQLite checkpointer at {CHECKPOINTER_SQLITE_PATH}")
+            yield saver
+    elif backend == CheckpointerBackend.POSTGRES.value:
+        try:
+            from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+            from psycopg.rows import dict_row
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise ValueError(
+                "Postgres checkpointer requires the 'postgres' extra: pip install ana-flow[postgres]"
+            ) from e
+        if not CHECKPOINTER_POSTGRES_URL:
+            raise ValueError("CHECKPOINTER_POSTGRES_URL is not set")
+
+        pool = AsyncConnectionPool(
+            CHECKPOINTER_POSTGRES_URL,
+            min_size=1,
+            max_size=get_int_env("CHECKPOINTER_POSTGRES_POOL_SIZE", 10),
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=False,
+        )
+        await pool.open()
+        try:
+            saver = AsyncPostgresSaver(pool)
+            await saver.setup()
+            logger.info("Using Postgres checkpointer")
+            yield saver
+        finally:
+            await pool.close()
+    else:
+        raise ValueError(f"Unsupported checkpointer backend: {backend}")
+
+
+class ThreadRetention:
+    """
+    TTL/LRU retention policy of the threads kept by a checkpointer.
+
+    The last activity of each thread is recorded next to the checkpoints, threads
+    that were not touched for ``ttl_seconds`` or that fall out of the
+    ``max_threads`` most recently used ones are deleted with all their checkpoints.
+    """
+
+    def __init__(
+        self,
+        saver: BaseCheckpointSaver,
+        ttl_seconds: float | None = None,
+        max_threads: int | None = None,
+    ):
+        self.saver = saver
+        self.ttl_seconds = ttl_seconds or get_float_env(
+            "CHECKPOINTER_THREAD_TTL", 7 * 24 * 3600.0
+        )
+        self.max_threads = max_threads or get_int_env("CHECKPOINTER_MAX_THREADS", 1000)
+        self._memory_activity: dict[str, float] = {}
+        self._is_setup = False
+
+    @property
+    def _backend(self) -> CheckpointerBackend:
+        if isinstance(self.saver, MemorySaver):
+            return CheckpointerBackend.MEMORY
+        if type(self.saver).__name__ == "AsyncSqliteSaver":
+            return CheckpointerBackend.SQLITE
+        return CheckpointerBackend.POSTGRES
+
+    async def setup(self) -> None:
+        """Create the activity table, adopting threads that were checkpointed before."""
+        if self._is_setup:
+            return
+        now = time.time()
+        if self._backend == CheckpointerBackend.SQLITE:
+            async with self.saver.lock:
+                await self.saver.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS thread_activity "
+                    "(thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+                )
+                await self.saver.conn.execute(
+                    "INSERT OR IGNORE INTO thread_activity (thread_id, last_seen) "
+                    "SELECT DISTINCT thread_id, ? FROM checkpoints",
+                    (now,),
+                )
+                await self.saver.conn.commit()
+        elif self._backend == CheckpointerBackend.POSTGRES:
+            async with self.saver.conn.connection() as conn:
+                await conn.execute(
+                    "CREATE TABLE IF NOT EXISTS thread_activity "
+                    "(thread_id TEXT PRIMARY KEY, last_seen DOUBLE PRECISION NOT NULL)"
+                )
+                await conn.execute(
+                    "INSERT INTO thread_activity (thread_id, last_seen) "
+                    "SELECT DISTINCT thread_id, %s FROM checkpoints "
+                    "ON CONFLICT (thread_id) DO NOTHING",
+                    (now,),
+                )
+        self._is_setup = True
+
+    async def touch(self, thread_id: str) -> None:
+        """Mark a thread as used right now."""
+        await self.setup()
+        now = time.time()
+        if self._backend == CheckpointerBackend.MEMORY:
+            self._memory_activity[thread_id] = now
+        elif self._backend == CheckpointerBackend.SQLITE:
+            async with self.saver.lock:
+                await self.saver.conn.execute(
+                    "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+                    "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+                    (thread_id, now),
+                )
+                await self.saver.conn.commit()
+        else:
+            async with self.saver.conn.connection() as conn:
+                await conn.execute(
+                    "INSERT INTO thread_activity (thread_id, last_seen) VALUES (%s, %s) "
+                    "ON CONFLICT (thread_id) DO UPDATE SET last_seen = EXCLUDED.last_seen",
+                    (thread_id, now),
+                )
+
+    async def _expired_threads(self) -> list[str]:
+        cutoff = time.time() - self.ttl_seconds
+        if self._backend == CheckpointerBackend.MEMORY:
+            # also adopt threads that were never touched
+            for thread_id in list(self.saver.storage.keys()):
+                self._memory_activity.setdefault(thread_id, time.time())
+            by_recency = sorted(
+                self._memory_activity.items(), key=lambda item: item[1], reverse=True
+            )
+            return [
+                thread_id
+                for i, (thread_id, last_seen) in enumerate(by_recency)
+                if last_seen < cutoff or i >= self.max_threads
+            ]
+        if self._backend == CheckpointerBackend.SQLITE:
+            async with self.saver.lock:
+                async with self.saver.conn.execute(
+                    "SELECT thread_id FROM thread_activity WHERE last_seen < ? "
+                    "UNION SELECT thread_id FROM "
+                    "(SELECT thread_id FROM thread_activity ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                    (cutoff, self.max_threads),
+                ) as cursor:
+                    return [row[0] async for row in cursor]
+        async with self.saver.conn.connection() as conn:
+            cursor = await conn.execute(
+                "SELECT thread_id FROM thread_activity WHERE last_seen < %s "
+                "UNION SELECT thread_id FROM "
+                "(SELECT thread_id FROM thread_activity ORDER BY last_seen DESC OFFSET %s) AS lru",
+                (cutoff, self.max_threads),
+            )
+            return [row["thread_id"] for row in await cursor.fetchall()]
+
+    async def _forget(self, thread_id: str) -> None:
+        if self._backend == CheckpointerBackend.MEMORY:
+            self.saver.delete_thread(thread_id)
+            self._memory_activity.pop(thread_id, None)
+            return
+        await self.saver.adelete_thread(thread_id)
+        if self._backend == CheckpointerBackend.SQLITE:
+            async with self.saver.lock:
+                await self.saver.conn.execute(
+                    "DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,)
+                )
+                await self.saver.conn.commit()
+        else:
+            async with self.saver.conn.connection() as conn:
+                await conn.execute(
+                    "DELETE FROM thread_activity WHERE thread_id = %s", (thread_id,)
+                )
+
+    async def prune(self) -> int:
+        """Delete expired and least recently used threads, returns the number deleted."""
+        await self.setup()
+        expired = await self._expired_threads()
+        for thread_id in expired:
+            await self._forget(thread_id)
+        if expired:
+            logger.info(f"Pruned {len(expired)} checkpointed thread(s)")
+        return len(expired)
+
+    async def run_forever(self, interval: float | None = None) -> None:
+        """Prune periodically, meant to run as a background task of the server."""
+        interval = interval or get_float_env("CHECKPOINTER_PRUNE_INTERVAL", 600.0)
+        while True:
+            try:
+                await self.prune()
+            except Exception as e:
+                logger.error(f"Error pruning checkpointed threads: {e}")
+            await asyncio.sleep(interval)
@@ -0,0 +1,122 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import re
+
+from langchain_core.messages import HumanMessage
+
+from ana_flow.config.agents import AGENT_LLM_CACHE, AGENT_LLM_MAP
+from ana_flow.llms.llm import get_llm_by_type
+from ana_flow.prompts.planner_model import Step
+from ana_flow.prompts.template import apply_prompt_template
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+_CJK_PATTERN = re.compile(r"[　-ヿ㐀-鿿가-힯＀-￯]")
+
+# findings shorter than this are never summarized, a summary would not be shorter
+SUMMARY_MIN_TOKENS = 400
+# the length the summarizer is asked to stay within
+SUMMARY_TARGET_WORDS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, one per CJK character and one per four other characters."""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + "\n...(truncated)"
+
+
+def _older_steps(steps: list[Step], keep_recent: int) -> list[Step]:
+    return steps[: max(0, len(steps) - keep_recent)]
+
+
+def compact_findings(steps: list[Step], max_tokens: int, keep_recent: int) -> list[str]:
+    """
+    Fit the findings of executed steps into a token budget, oldest first.
+
+    The ``keep_recent`` last findings stay verbatim. When the findings exceed
+    ``max_tokens`` the older ones are replaced by their cached summary, and
+    truncated when even the summaries do not fit.
+
+    Returns:
+        The text given to the agent for each step
+    """
+    texts = [step.execution_res for step in steps]
+    if sum(estimate_tokens(text) for text in texts) <= max_tokens:
+        return texts
+    older = len(_older_steps(steps, keep_recent))
+    for i in range(older):
+        if steps[i].summary:
+            texts[i] = steps[i].summary
+    total = sum(estimate_tokens(text) for text in texts)
+    if total <= max_tokens or older == 0:
+        return texts
+    # the recent findings keep their room, the older ones share the rest
+    remaining = max(0, max_tokens - sum(estimate_tokens(text) for text in texts[older:]))
+    share = remaining // older
+    return [_truncate(text, share) for text in texts[:older]] + texts[older:]
+
+
+def steps_to_summarize(steps: list[Step], max_tokens: int, keep_recent: int) -> list[Step]:
+    """Older steps without a summary, when the findings do not fit the budget verbatim."""
+    if sum(estimate_tokens(step.execution_res) for step in steps) <= max_tokens:
+        return []
+    return [
+        step
+        for step in _older_steps(steps, keep_recent)
+        if not step.summary and estimate_tokens(step.execution_res) > SUMMARY_MIN_TOKENS
+    ]
+
+
+async def _summarize(step: Step, locale: str) -> None:
+    agent_input = {
+        "messages": [
+            HumanMessage(
+                content=f"# Step\n\n{step.title}\n\n# Finding\n\n{step.execution_res}"
+            )
+        ],
+        "locale": locale,
+        "max_words": SUMMARY_TARGET_WORDS,
+    }
+    try:
+        response = await get_llm_by_type(
+            AGENT_LLM_MAP["summarizer"], AGENT_LLM_CACHE["summarizer"]
+        ).ainvoke(
+            apply_prompt_template("summarizer", agent_input)
+        )
+        step.summary = response.content
+    except Exception as e:
+        logger.error(f"Error summarizing step '{step.title}': {e}")
+
+
+async def summarize_steps(steps: list[Step], locale: str) -> None:
+    """Summarize the steps concurrently, the summaries are cached on the steps."""
+    if steps:
+        logger.info(f"Summarizing {len(steps)} finding(s) to fit the context budget")
+        await asyncio.gather(*(_summarize(step, locale) for step in steps))
+
+
+def format_findings(steps: list[Step], max_tokens: int, keep_recent: int) -> str:
+    """Render the compacted findings of executed steps as the Existing Research Findings section."""
+    if not steps:
+        return ""
+    findings = "# Existing Research Findings\n\n"
+    for i, (step, text) in enumerate(zip(steps, compact_findings(steps, max_tokens, keep_recent))):
+        findings += f"## Existing Finding {i+1}: {step.title}\n\n"
+        findings += f"<finding>\n{text}\n</finding>\n\n"
+    return findings
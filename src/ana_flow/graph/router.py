@@ -0,0 +1,99 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+
+from ana_flow.data.resolver import ModelSpecIndex, normalize
+
+# the resolver score above which a phrase is taken to name a car model
+MIN_MODEL_SCORE = 0.8
+
+# shorter requests are left to the coordinator, e.g. "分析一下"
+MIN_REQUEST_LENGTH = 4
+
+_HAN_PATTERN = re.compile(r"[一-鿿]")
+_LATIN_PATTERN = re.compile(r"[A-Za-z]")
+
+_GREETING_PATTERN = re.compile(
+    r"^\W*(hi|hello|hey|good (morning|afternoon|evening)|thanks|thank you|how are you|who are you"
+    r"|你好|您好|嗨|哈喽|早上好|下午好|晚上好|谢谢|在吗|你是谁)\W*$",
+    re.IGNORECASE,
+)
+# prompt leaking and jailbreak attempts are rejected by the coordinator llm
+_UNSAFE_PATTERN = re.compile(
+    r"system prompt|ignore (all |the |your )?(previous|above)|jailbreak|developer mode"
+    r"|提示词|系统指令|忽略(之前|以上|上面)",
+    re.IGNORECASE,
+)
+_INTENT_PATTERN = re.compile(
+    r"预测|预估|预计|预判|分析|趋势|走势|对比|比较|评估"
+    r"|forecast|predict|projection|analy[sz]|trend|compar|outlook|estimate",
+    re.IGNORECASE,
+)
+_SUBJECT_PATTERN = re.compile(
+    r"销量|销售|市场|份额|需求|车型|品牌|汽车|新能源|乘用车"
+    r"|sales|market|share|demand|vehicle|brand|\bcars?\b|\bev\b",
+    re.IGNORECASE,
+)
+
+
+class Route(str, Enum):
+    PLANNER = "planner"
+    COORDINATOR = "coordinator"
+
+
+@dataclass
+class RouteDecision:
+    route: Route
+    locale: str
+    reason: str
+    model_specification: str | None = None
+
+
+def detect_locale(text: str) -> str:
+    """zh-CN when Chinese characters make up at least a third of the letters, en-US otherwise."""
+    han = len(_HAN_PATTERN.findall(text))
+    latin = len(_LATIN_PATTERN.findall(text))
+    # a latin letter weighs a quarter, as model names like "E5" are mixed into Chinese text
+    return "zh-CN" if han and han * 4 >= latin else "en-US"
+
+
+def route_request(text: str, model_spec_index: ModelSpecIndex | None = None) -> RouteDecision:
+    """
+    Decide locally whether a request can skip the coordinator llm.
+
+    Clear forecasting and analysis requests, an intent such as "预测" or "forecast"
+    about a car model or a sales subject, go straight to the planner. Greetings,
+    unsafe and ambiguous requests are left to the coordinator.
+
+    Args:
+        text: The latest user message
+        model_spec_index: Index of the car models, used to recognize the subject
+
+    Returns:
+        The route with the locale detected from the text
+    """
+    locale = detect_locale(text)
+    if len(normalize(text)) < MIN_REQUEST_LENGTH:
+        return RouteDecision(Route.COORDINATOR, locale, "too short")
+    if _GREETING_PATTERN.match(text):
+        return RouteDecision(Route.COORDINATOR, locale, "greeting")
+    if _UNSAFE_PATTERN.search(text):
+        return RouteDecision(Route.COORDINATOR, locale, "unsafe")
+    if not _INTENT_PATTERN.search(text):
+        return RouteDecision(Route.COORDINATOR, locale, "no forecasting or analysis intent")
+
+    if model_spec_index is not None:
+        matches = model_spec_index.resolve(text, limit=1)
+        if matches and matches[0].score >= MIN_MODEL_SCORE:
+            return RouteDecision(
+                Route.PLANNER,
+                locale,
+                "car model",
+                model_specification=matches[0].model_specification,
+            )
+    if _SUBJECT_PATTERN.search(text):
+        return RouteDecision(Route.PLANNER, locale, "sales subject")
+    return RouteDecision(Route.COORDINATOR, locale, "no subject")
@@ -0,0 +1,61 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import Any, Awaitable
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+
+class SpeculativeTasks:
+    """
+    Work started ahead of the node that needs it, one task per thread.
+
+    The background investigation is started when the coordinator starts and runs
+    alongside it, the planner then collects the result. The task is discarded
+    when the run ends before the planner.
+    """
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def start(self, thread_id: str, work: Awaitable[Any]) -> None:
+        """Start the work of a thread, replacing the work started before."""
+        self.discard(thread_id)
+        self._tasks[thread_id] = asyncio.ensure_future(work)
+
+    def running(self, thread_id: str) -> bool:
+        return thread_id in self._tasks
+
+    async def result(self, thread_id: str) -> Any | None:
+        """Wait for the work of a thread and forget it, None when none was started or it failed."""
+        task = self._tasks.pop(thread_id, None)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            logger.error(f"Speculative work of thread {thread_id} failed: {e}")
+            return None
+
+    def discard(self, thread_id: str) -> None:
+        """Cancel the work of a thread, when the run ends without using it."""
+        task = self._tasks.pop(thread_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            logger.info(f"Discarded the speculative work of thread {thread_id}")
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+_speculative_tasks: SpeculativeTasks | None = None
+
+
+def get_speculative_tasks() -> SpeculativeTasks:
+    """Get the process wide speculative tasks."""
+    global _speculative_tasks
+    if _speculative_tasks is None:
+        _speculative_tasks = SpeculativeTasks()
+    return _speculative_tasks
@@ -0,0 +1,164 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from ana_flow.config import get_bool_env, get_float_env, get_int_env
+from ana_flow.data.resolver import normalize
+from ana_flow.prompts.planner_model import Step, StepType
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+# seconds a step result is reused, web research goes stale sooner than the analysis of sales data,
+# loading steps are not memoized as they hand their series to later steps as artifacts
+DEFAULT_STEP_TTLS = {
+    StepType.RESEARCH: 6 * 3600.0,
+    StepType.PROCESSING: 24 * 3600.0,
+    StepType.PREDICTION: 24 * 3600.0,
+}
+
+# expired and excess entries are evicted after this many writes
+_EVICT_EVERY = 100
+
+
+def step_ttl(step_type: StepType) -> float:
+    """Seconds a result of the step type is reused, STEP_MEMO_TTL_<TYPE> overrides the default."""
+    return get_float_env(
+        f"STEP_MEMO_TTL_{step_type.value.upper()}", DEFAULT_STEP_TTLS[step_type]
+    )
+
+
+def step_memo_key(
+    step: Step,
+    agent_type: str,
+    locale: str,
+    dependencies: list[Step],
+    watermark: datetime | None,
+) -> str:
+    """
+    Key of a step result, the same for near-identical steps of different threads.
+
+    The title and description are normalized, so case, width, whitespace and
+    punctuation do not matter. The results of the steps it depends on and the
+    watermark of the sales data are part of the key, a step over other findings
+    or newer data is run again.
+    """
+    signature = json.dumps(
+        [
+            agent_type,
+            locale,
+            step.step_type.value,
+            step.need_web_search,
+            normalize(step.title),
+            normalize(step.description),
+            [dependency.execution_res for dependency in dependencies],
+            watermark.isoformat() if watermark else None,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()
+
+
+class StepMemo:
+    """
+    Results of plan steps shared across threads, in a local SQLite file.
+
+    Every entry expires after the TTL of its step type, only the ``max_entries``
+    most recently used entries are kept.
+    """
+
+    def __init__(self, path: str | None = None, max_entries: int | None = None):
+        self.path = Path(path or os.getenv("STEP_MEMO_PATH", "step_memo.sqlite"))
+        self.max_entries = max_entries or get_int_env("STEP_MEMO_MAX_ENTRIES", 5000)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS step_results ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """
+        The result of the step, None when it was not memoized or has expired.
+
+        Blocks on SQLite, call it through ``asyncio.to_thread`` from the event loop.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, expires_at FROM step_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE step_results SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, result: str, ttl_seconds: float) -> None:
+        """Memoize the result of a step, blocks on SQLite like ``get``."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO step_results (key, result, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, result, now + ttl_seconds, now),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM step_results WHERE expires_at < ? OR key IN "
+            "(SELECT key FROM step_results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (now, self.max_entries),
+        )
+        if cursor.rowcount:
+            logger.info(f"Evicted {cursor.rowcount} memoized step results")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM step_results")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM step_results").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_step_memo: StepMemo | None = None
+
+
+def get_step_memo() -> StepMemo | None:
+    """Get the process wide step memo, None when STEP_MEMO_ENABLED is false."""
+    global _step_memo
+    if not get_bool_env("STEP_MEMO_ENABLED", True):
+        return None
+    if _step_memo is None:
+        _step_memo = StepMemo()
+    return _step_memo
@@ -9,6 +9,15 @@ from langgraph.graph import MessagesState
 from ana_flow.prompts.planner_model import Plan
 
 
+def merge_step_results(
+    left: dict[int, str] | None, right: dict[int, str] | None
+) -> dict[int, str]:
+    """Collect the results of steps run in parallel, None clears the collected results."""
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
 class State(MessagesState):
     """State for the agent system, extends MessagesState with next field."""
 
@@ -21,3 +30,7 @@ class State(MessagesState):
     auto_accepted_plan: bool = False
     enable_background_investigation: bool = True
     background_investigation_results: str = None
+    # results of the dispatched plan steps keyed by step index, merged into the plan by research_team
+    step_results: Annotated[dict[int, str], merge_step_results] = {}
+    # index of the plan step a worker node runs, set in the Send payload of research_team
+    current_step_index: int = None
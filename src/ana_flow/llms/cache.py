@@ -0,0 +1,167 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from ana_flow.config import get_bool_env, get_float_env, get_int_env
+
+logger = logging.getLogger(__name__)
+
+# the CURRENT_TIME of the prompt templates, e.g. "Sat Oct 18 2026 09:30:12 +0800"
+_CURRENT_TIME_PATTERN = re.compile(
+    r"\b((?:Mon|Tue|Wed|Thu|Fri|Sat|Sun) [A-Z][a-z]{2} \d{2} \d{4}) \d{2}:\d{2}:\d{2}(?: [+-]\d{4})?"
+)
+
+# expired and excess entries are evicted after this many writes
+_EVICT_EVERY = 100
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Drop the time of day from rendered prompts, so the same question hits the cache all day."""
+    return _CURRENT_TIME_PATTERN.sub(r"\1", prompt)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Hash of the model configuration and the normalized messages."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Exact-match cache of LLM responses in a local SQLite file.
+
+    Entries are keyed by the model configuration (LangChain's ``llm_string``,
+    which also covers bound tools and the response format) and the normalized
+    messages. Entries older than ``ttl_seconds`` are misses, and only the
+    ``max_entries`` most recently used entries are kept.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+    ):
+        self.path = Path(path or os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite"))
+        self.max_entries = max_entries or get_int_env("LLM_CACHE_MAX_ENTRIES", 10000)
+        self.ttl_seconds = ttl_seconds or get_float_env("LLM_CACHE_TTL", 24 * 3600.0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now - self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", LangChainBetaWarning)
+                return loads(row[0])
+        except Exception as e:
+            logger.warning(f"Dropping unreadable LLM cache entry: {e}")
+            return None
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Generation]
+    ) -> None:
+        key = cache_key(prompt, llm_string)
+        now = time.time()
+        response = dumps(list(return_val))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM llm_responses WHERE created_at < ? OR key IN "
+            "(SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (now - self.ttl_seconds, self.max_entries),
+        )
+        if cursor.rowcount:
+            self.evictions += cursor.rowcount
+            logger.info(f"Evicted {cursor.rowcount} LLM cache entries")
+
+    def evict(self) -> None:
+        """Delete the expired entries and the least recently used ones beyond max_entries."""
+        with self._lock:
+            self._evict(time.time())
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+
+_cache: LLMResponseCache | None = None
+
+
+def get_llm_response_cache() -> LLMResponseCache | None:
+    """Get the process wide response cache, None when LLM_CACHE_ENABLED is false."""
+    global _cache
+    if not get_bool_env("LLM_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
@@ -0,0 +1,102 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import importlib.util
+import logging
+import threading
+
+import httpx
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+from ana_flow.config import get_bool_env, get_float_env, get_int_env
+from ana_flow.llms.limiter import RateLimitedAsyncTransport, RateLimitedTransport
+
+logger = logging.getLogger(__name__)
+
+# base URLs of the providers when the model config does not set one
+DEFAULT_BASE_URLS = {
+    "openai": "https://api.openai.com/v1",
+    "deepseek": "https://api.deepseek.com",
+}
+
+_lock = threading.Lock()
+_clients: dict[str, httpx.Client] = {}
+# async clients hold connections bound to the event loop they were first used on
+_async_clients: dict[tuple[str, asyncio.AbstractEventLoop | None], httpx.AsyncClient] = {}
+
+
+def current_event_loop() -> asyncio.AbstractEventLoop | None:
+    """Get the running event loop, None when called outside of one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 is used when LLM_HTTP2 is on and the h2 package is installed."""
+    return get_bool_env("LLM_HTTP2", True) and importlib.util.find_spec("h2") is not None
+
+
+def _transport_options() -> dict:
+    return {
+        "http2": http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=get_int_env("LLM_HTTP_MAX_CONNECTIONS", 100),
+            max_keepalive_connections=get_int_env("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+            keepalive_expiry=get_float_env("LLM_HTTP_KEEPALIVE_EXPIRY", 60.0),
+        ),
+    }
+
+
+def _pool_key(base_url: str) -> str:
+    return base_url.rstrip("/").lower()
+
+
+def get_http_client(base_url: str) -> httpx.Client:
+    """Get the keep-alive client shared by the sync calls to a provider base URL."""
+    key = _pool_key(base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            # the transport applies the rate limits and retries of the provider
+            client = _clients[key] = DefaultHttpxClient(
+                transport=RateLimitedTransport(key, httpx.HTTPTransport(**_transport_options()))
+            )
+            logger.info(f"Opened a shared HTTP client for {key}")
+        return client
+
+
+def get_async_http_client(base_url: str) -> httpx.AsyncClient:
+    """Get the keep-alive client shared by the async calls to a provider base URL on this event loop."""
+    key = (_pool_key(base_url), current_event_loop())
+    with _lock:
+        # the connections of a closed loop cannot be reused nor closed
+        for stale in [k for k in _async_clients if k[1] is not None and k[1].is_closed()]:
+            del _async_clients[stale]
+        client = _async_clients.get(key)
+        if client is None or client.is_closed:
+            client = _async_clients[key] = DefaultAsyncHttpxClient(
+                transport=RateLimitedAsyncTransport(
+                    key[0], httpx.AsyncHTTPTransport(**_transport_options())
+                )
+            )
+        return client
+
+
+async def close_http_clients() -> None:
+    """Close the sync clients and the async clients of the running event loop."""
+    loop = current_event_loop()
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        async_clients = [
+            client for (_, client_loop), client in _async_clients.items() if client_loop in (loop, None)
+        ]
+        for key in [k for k in _async_clients if k[1] in (loop, None)]:
+            del _async_clients[key]
+    for client in clients:
+        client.close()
+    for client in async_clients:
+        await client.aclose()
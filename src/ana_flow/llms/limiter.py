@@ -0,0 +1,393 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import email.utils
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from ana_flow.config import get_float_env, get_int_env
+
+logger = logging.getLogger(__name__)
+
+# responses retried with backoff, 429 and the transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# rough request size in tokens, bytes of the request body per token
+_BYTES_PER_TOKEN = 4
+
+
+@dataclass
+class RateLimitSettings:
+    """Client-side quota of a provider model, the env defaults can be overridden per model."""
+
+    requests_per_minute: int
+    tokens_per_minute: int
+    max_concurrency: int
+    max_retries: int
+    backoff_base: float
+    backoff_max: float
+
+    @classmethod
+    def from_env(cls, **overrides) -> "RateLimitSettings":
+        settings = cls(
+            requests_per_minute=get_int_env("LLM_REQUESTS_PER_MINUTE", 500),
+            tokens_per_minute=get_int_env("LLM_TOKENS_PER_MINUTE", 1_000_000),
+            max_concurrency=get_int_env("LLM_MAX_CONCURRENCY", 16),
+            max_retries=get_int_env("LLM_MAX_RETRIES", 5),
+            backoff_base=get_float_env("LLM_BACKOFF_BASE", 0.5),
+            backoff_max=get_float_env("LLM_BACKOFF_MAX", 30.0),
+        )
+        for key, value in overrides.items():
+            if value is not None:
+                setattr(settings, key, type(getattr(settings, key))(value))
+        return settings
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``capacity`` per minute.
+
+    Callers reserve an amount and sleep for the returned delay, so the same bucket
+    serves threads and event loops. The reserved amount may exceed the capacity,
+    the bucket then goes negative and later callers wait for the refill.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` from the bucket, returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+
+class ProviderLimiter:
+    """
+    Request and token buckets, a concurrency limit and retry policy of one provider model.
+
+    Shared by every client calling the same base URL and model, across event loops.
+    """
+
+    def __init__(self, name: str, settings: RateLimitSettings):
+        self.name = name
+        self.settings = settings
+        self.requests = TokenBucket(settings.requests_per_minute)
+        self.tokens = TokenBucket(settings.tokens_per_minute)
+        self._thread_slots = threading.BoundedSemaphore(settings.max_concurrency)
+        # asyncio semaphores are bound to the loop they are used on
+        self._loop_slots: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def _loop_slot(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for closed in [other for other in self._loop_slots if other.is_closed()]:
+                del self._loop_slots[closed]
+            slot = self._loop_slots.get(loop)
+            if slot is None:
+                slot = self._loop_slots[loop] = asyncio.Semaphore(self.settings.max_concurrency)
+            return slot
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def _count(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def retry_delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Full jitter exponential backoff, or the Retry-After of the response when it asks for one."""
+        backoff = random.uniform(
+            0, min(self.settings.backoff_max, self.settings.backoff_base * 2**attempt)
+        )
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is None:
+            return backoff
+        # a little jitter keeps the waiting callers from retrying in lockstep
+        return min(retry_after, self.settings.backoff_max * 4) + backoff / 4
+
+    async def acquire_async(self, tokens: int) -> float:
+        """Wait for the buckets and a concurrency slot, returns the time spent waiting."""
+        started = time.monotonic()
+        self._count("queued")
+        try:
+            delay = self._reserve(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._loop_slot().acquire()
+        finally:
+            self._count("queued", -1)
+        self._count("in_flight")
+        waited = time.monotonic() - started
+        self._record_wait(waited)
+        return waited
+
+    def release_async(self) -> None:
+        self._count("in_flight", -1)
+        self._loop_slot().release()
+
+    def acquire(self, tokens: int) -> float:
+        started = time.monotonic()
+        self._count("queued")
+        try:
+            delay = self._reserve(tokens)
+            if delay > 0:
+                time.sleep(delay)
+            self._thread_slots.acquire()
+        finally:
+            self._count("queued", -1)
+        self._count("in_flight")
+        waited = time.monotonic() - started
+        self._record_wait(waited)
+        return waited
+
+    def release(self) -> None:
+        self._count("in_flight", -1)
+        self._thread_slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "queue_wait_seconds_total": round(self.wait_seconds, 3),
+                "queue_wait_seconds_avg": round(self.wait_seconds / self.calls, 3)
+                if self.calls
+                else 0.0,
+                "queue_wait_seconds_max": round(self.max_wait_seconds, 3),
+            }
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """Seconds asked for by the Retry-After (or retry-after-ms) header of a response."""
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _request_model_and_tokens(request: httpx.Request) -> tuple[str, int]:
+    """Model and estimated tokens of a request, the prompt size plus the completion limit."""
+    content = request.content
+    try:
+        body = json.loads(content) if content else {}
+    except (ValueError, UnicodeDecodeError):
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    completion = body.get("max_completion_tokens") or body.get("max_tokens") or 0
+    return str(body.get("model", "")), len(content) // _BYTES_PER_TOKEN + int(completion)
+
+
+_limiters: dict[tuple[str, str], ProviderLimiter] = {}
+_model_overrides: dict[tuple[str, str], dict] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(base_url: str, model: str, **overrides) -> None:
+    """Override the env rate limit settings of a model, e.g. from its rate_limit config."""
+    key = (base_url.rstrip("/").lower(), model)
+    with _limiters_lock:
+        if _model_overrides.get(key) != overrides:
+            _model_overrides[key] = overrides
+            _limiters.pop(key, None)
+
+
+def get_rate_limiter(base_url: str, model: str) -> ProviderLimiter:
+    """Get the limiter shared by the calls to a model of a provider base URL."""
+    key = (base_url.rstrip("/").lower(), model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            settings = RateLimitSettings.from_env(**_model_overrides.get(key, {}))
+            limiter = _limiters[key] = ProviderLimiter(f"{key[0]}|{model}", settings)
+        return limiter
+
+
+def rate_limiter_stats() -> dict:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+class _ReleasingAsyncStream(httpx.AsyncByteStream):
+    """Response body that frees the concurrency slot when it is closed, streamed calls hold it until done."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+def _retry_or_return(
+    limiter: ProviderLimiter, attempt: int, response: httpx.Response | None
+) -> bool:
+    """Whether the outcome of an attempt is retried, counting rate limits and failures."""
+    if response is not None and response.status_code not in RETRY_STATUS_CODES:
+        return False
+    if response is not None and response.status_code == 429:
+        limiter._count("rate_limited")
+    if attempt >= limiter.settings.max_retries:
+        limiter._count("failures")
+        return False
+    limiter._count("retries")
+    return True
+
+
+def _log_retry(limiter: ProviderLimiter, outcome, delay: float) -> None:
+    logger.warning(f"LLM call to {limiter.name} failed ({outcome}), retrying in {delay:.1f}s")
+
+
+class RateLimitedAsyncTransport(httpx.AsyncBaseTransport):
+    """Transport applying the provider limiter and retries to every request of an async client."""
+
+    def __init__(self, base_url: str, transport: httpx.AsyncBaseTransport):
+        self.base_url = base_url
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = _request_model_and_tokens(request)
+        limiter = get_rate_limiter(self.base_url, model)
+        for attempt in range(limiter.settings.max_retries + 1):
+            await limiter.acquire_async(tokens)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except asyncio.CancelledError:
+                # the run was cancelled, e.g. its client disconnected, while the request was in flight
+                limiter.release_async()
+                raise
+            except httpx.TransportError as e:
+                limiter.release_async()
+                if not _retry_or_return(limiter, attempt, None):
+                    raise
+                outcome, response = e, None
+            else:
+                if not _retry_or_return(limiter, attempt, response):
+                    if response.is_closed:
+                        limiter.release_async()
+                    else:
+                        response.stream = _ReleasingAsyncStream(
+                            response.stream, limiter.release_async
+                        )
+                    return response
+                await response.aclose()
+                limiter.release_async()
+                outcome = response.status_code
+            delay = limiter.retry_delay(attempt, response)
+            _log_retry(limiter, outcome, delay)
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Transport applying the provider limiter and retries to every request of a sync client."""
+
+    def __init__(self, base_url: str, transport: httpx.BaseTransport):
+        self.base_url = base_url
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        model, tokens = _request_model_and_tokens(request)
+        limiter = get_rate_limiter(self.base_url, model)
+        for attempt in range(limiter.settings.max_retries + 1):
+            limiter.acquire(tokens)
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as e:
+                limiter.release()
+                if not _retry_or_return(limiter, attempt, None):
+                    raise
+                outcome, response = e, None
+            else:
+                if not _retry_or_return(limiter, attempt, response):
+                    if response.is_closed:
+                        limiter.release()
+                    else:
+                        response.stream = _ReleasingStream(response.stream, limiter.release)
+                    return response
+                response.close()
+                limiter.release()
+                outcome = response.status_code
+            delay = limiter.retry_delay(attempt, response)
+            _log_retry(limiter, outcome, delay)
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self._transport.close()
@@ -1,10 +1,14 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import hashlib
+import json
 from pathlib import Path
 from typing import Any, Dict
 import os
 
+from langchain_core.caches import BaseCache
 from langchain_openai import ChatOpenAI
 from langchain_ollama.llms import OllamaLLM
 from langchain_deepseek import ChatDeepSeek
@@ -12,9 +16,17 @@ from typing import get_args
 
 from ana_flow.config import load_yaml_config
 from ana_flow.config.agents import LLMType
-
-# Cache for LLM instances
-_llm_cache: dict[LLMType, ChatOpenAI] = {}
+from ana_flow.llms.cache import get_llm_response_cache
+from ana_flow.llms.http import (
+    DEFAULT_BASE_URLS,
+    current_event_loop,
+    get_async_http_client,
+    get_http_client,
+)
+from ana_flow.llms.limiter import configure_rate_limit
+
+# Cache for LLM instances, keyed by config fingerprint, response caching and event loop
+_llm_cache: dict[tuple[str, bool, asyncio.AbstractEventLoop | None], ChatOpenAI] = {}
 
 def _get_config_file_path() -> str:
     """Get the path to the configuration file."""
@@ -45,7 +57,8 @@ def _get_env_llm_conf(llm_type: str) -> Dict[str, Any]:
     return conf
 
 
-def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatOpenAI:
+def _resolve_llm_conf(llm_type: LLMType, conf: Dict[str, Any]) -> tuple[str, Dict[str, Any]]:
+    """Get the provider and the model settings of an LLM type."""
     llm_type_map = {
         "reasoning": conf.get("REASONING_MODEL"),
         "basic": conf.get("BASIC_MODEL"),
@@ -59,29 +72,82 @@ def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatOpenAI:
         raise ValueError(f"Invalid LLM Conf: {llm_type}")
 
     llm_provider = conf.get("MODEL_PROVIDER")
-    
-    if llm_provider["provider"] == "ollama":
-        return OllamaLLM(**llm_conf)
-    elif llm_provider["provider"] == "openai":
-        return ChatOpenAI(**llm_conf)
-    elif llm_provider["provider"] == "deepseek":
-        return ChatDeepSeek(**llm_conf)
+    return llm_provider["provider"], llm_conf
+
+
+def _with_shared_http_clients(provider: str, llm_conf: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Inject the keep-alive clients shared by all models of the same base URL.
+
+    The clients rate limit and retry the calls per model, the optional ``rate_limit``
+    section of the model config overrides the LLM_* rate limit settings, e.g.
+    ``rate_limit: {requests_per_minute: 60, tokens_per_minute: 100000, max_concurrency: 4}``.
+    """
+    base_url = (
+        llm_conf.get("base_url")
+        or llm_conf.get("openai_api_base")
+        or llm_conf.get("api_base")
+        or DEFAULT_BASE_URLS[provider]
+    )
+    model = llm_conf.get("model") or llm_conf.get("model_name") or ""
+    configure_rate_limit(base_url, model, **(llm_conf.get("rate_limit") or {}))
+    return {
+        "http_client": get_http_client(base_url),
+        "http_async_client": get_async_http_client(base_url),
+        # retries are done by the transport, which honours Retry-After across callers
+        "max_retries": 0,
+        **{key: value for key, value in llm_conf.items() if key != "rate_limit"},
+    }
+
+
+def _create_llm_use_conf(
+    llm_type: LLMType, conf: Dict[str, Any], response_cache: BaseCache | None = None
+) -> ChatOpenAI:
+    provider, llm_conf = _resolve_llm_conf(llm_type, conf)
+
+    if provider == "ollama":
+        llm_conf = {key: value for key, value in llm_conf.items() if key != "rate_limit"}
+        return OllamaLLM(cache=response_cache, **llm_conf)
+    elif provider == "openai":
+        return ChatOpenAI(cache=response_cache, **_with_shared_http_clients(provider, llm_conf))
+    elif provider == "deepseek":
+        return ChatDeepSeek(cache=response_cache, **_with_shared_http_clients(provider, llm_conf))
+
+
+def _conf_fingerprint(llm_type: LLMType, conf: Dict[str, Any]) -> str:
+    provider, llm_conf = _resolve_llm_conf(llm_type, conf)
+    resolved = json.dumps([provider, llm_conf], sort_keys=True, default=str)
+    return hashlib.sha256(resolved.encode("utf-8")).hexdigest()
 
 
 def get_llm_by_type(
     llm_type: LLMType,
+    cache_responses: bool = False,
 ) -> ChatOpenAI:
     """
     Get LLM instance by type. Returns cached instance if available.
-    """
-    if llm_type in _llm_cache:
-        return _llm_cache[llm_type]
 
+    Instances are cached per resolved model config and event loop, as their async
+    HTTP client is bound to the loop. With ``cache_responses`` identical prompts are
+    answered from the LLM response cache, see AGENT_LLM_CACHE for the agents that opt in.
+    """
     conf = load_yaml_config(
         str((Path(__file__).parent.parent.parent.parent / "config.yaml").resolve())
     )
-    llm = _create_llm_use_conf(llm_type, conf)
-    _llm_cache[llm_type] = llm
+    response_cache = get_llm_response_cache() if cache_responses else None
+    key = (
+        _conf_fingerprint(llm_type, conf),
+        response_cache is not None,
+        current_event_loop(),
+    )
+    if key in _llm_cache:
+        return _llm_cache[key]
+
+    # models of closed event loops cannot be used anymore
+    for stale in [k for k in _llm_cache if k[2] is not None and k[2].is_closed()]:
+        del _llm_cache[stale]
+    llm = _create_llm_use_conf(llm_type, conf, response_cache)
+    _llm_cache[key] = llm
     return llm
 
 
@@ -0,0 +1,188 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+import os
+from typing import Any, Literal, Sequence, TypeVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import LanguageModelLike
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_openai import ChatOpenAI
+from langchain_openai.chat_models.base import BaseChatOpenAI
+from pydantic import BaseModel, ValidationError
+
+from ana_flow.config import get_int_env
+from ana_flow.utils.json_utils import repair_json_output
+
+logger = logging.getLogger(__name__)
+
+StructuredOutputMethod = Literal["json_schema", "function_calling", "json_mode", "prompt"]
+
+T = TypeVar("T", bound=BaseModel)
+
+# validation errors quoted back to the model in a repair request
+MAX_REPORTED_ERRORS = 10
+
+
+class StructuredOutputError(ValueError):
+    """The model did not answer with a valid instance of the schema within the repair budget."""
+
+    def __init__(self, message: str, text: str = ""):
+        super().__init__(message)
+        self.text = text
+
+
+def structured_output_method(llm: LanguageModelLike) -> StructuredOutputMethod:
+    """
+    The way the model is constrained to the schema, LLM_STRUCTURED_OUTPUT_METHOD overrides it.
+
+    OpenAI models use the native JSON schema response format, other OpenAI compatible
+    providers such as DeepSeek tool calling, any other model the JSON object mode.
+    """
+    method = os.getenv("LLM_STRUCTURED_OUTPUT_METHOD", "auto").strip().lower()
+    if method in ("json_schema", "function_calling", "json_mode", "prompt"):
+        return method
+    if isinstance(llm, BaseChatOpenAI):
+        base_url = str(llm.openai_api_base or "")
+        if isinstance(llm, ChatOpenAI) and (not base_url or "api.openai.com" in base_url):
+            return "json_schema"
+        return "function_calling"
+    return "json_mode"
+
+
+def bind_schema(
+    llm: LanguageModelLike, schema: type[BaseModel], method: StructuredOutputMethod
+) -> LanguageModelLike:
+    """Constrain the model to answer with the schema, the answer is parsed by parse_structured."""
+    if method == "json_schema":
+        return llm.bind(
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": schema.__name__,
+                    "schema": schema.model_json_schema(),
+                    # strict mode rejects the optional fields of the models
+                    "strict": False,
+                },
+            }
+        )
+    if method == "function_calling":
+        return llm.bind_tools([schema], tool_choice=schema.__name__)
+    if method == "json_mode":
+        return llm.bind(response_format={"type": "json_object"})
+    return llm
+
+
+def response_text(response: Any) -> str:
+    """The JSON text of a response, the arguments of the schema tool call when it was called."""
+    if isinstance(response, str):
+        return response
+    if not isinstance(response, BaseMessage):
+        raise TypeError(f"Unexpected model response: {type(response).__name__}")
+    if isinstance(response, AIMessage):
+        if response.tool_calls:
+            return json.dumps(response.tool_calls[0]["args"], ensure_ascii=False)
+        if response.invalid_tool_calls:
+            return response.invalid_tool_calls[0].get("args") or ""
+    if isinstance(response.content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in response.content
+        )
+    return response.content
+
+
+def parse_structured(text: str, schema: type[T]) -> T:
+    """
+    Validate the JSON text of a response against the schema.
+
+    The text is parsed with json.loads first, it is only repaired with json_repair
+    when that fails, e.g. a code fence or a trailing comma.
+
+    Raises:
+        StructuredOutputError: The text is not an object of the schema, even once repaired
+    """
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data = json.loads(repair_json_output(text))
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"The response is not JSON: {e}", text) from e
+    if not isinstance(data, dict):
+        raise StructuredOutputError(
+            f"The response is a JSON {type(data).__name__}, not an object", text
+        )
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or '<root>'}: {error['msg']}"
+            for error in e.errors()[:MAX_REPORTED_ERRORS]
+        )
+        raise StructuredOutputError(
+            f"The response does not match {schema.__name__}: {errors}", text
+        ) from e
+
+
+def _repair_request(schema: type[BaseModel], error: StructuredOutputError) -> list[BaseMessage]:
+    return [
+        AIMessage(content=error.text),
+        HumanMessage(
+            content=(
+                f"{error} Respond again with the complete corrected {schema.__name__} "
+                "as a JSON object only."
+            )
+        ),
+    ]
+
+
+async def ainvoke_structured(
+    llm: LanguageModelLike,
+    schema: type[T],
+    messages: Sequence[Any],
+    *,
+    native: bool = True,
+    callbacks: list[BaseCallbackHandler] | None = None,
+    max_repairs: int | None = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Ask the model for an instance of the schema.
+
+    An invalid answer is not thrown away with the run, the model is shown its answer
+    and the validation errors and asked to correct it, up to ``max_repairs`` times
+    (LLM_STRUCTURED_MAX_REPAIRS, 2 by default).
+
+    Args:
+        llm: The model to ask
+        schema: The pydantic model of the answer
+        messages: The prompt
+        native: Constrain the model with its native structured output, False for the
+            models that only follow the prompt, e.g. reasoning models
+        callbacks: Callbacks of the model calls, e.g. to follow the streamed answer
+        kwargs: Passed to the model call, e.g. ``stream=True``
+
+    Raises:
+        StructuredOutputError: No valid answer within the repair budget
+    """
+    if max_repairs is None:
+        max_repairs = get_int_env("LLM_STRUCTURED_MAX_REPAIRS", 2)
+    method = structured_output_method(llm) if native else "prompt"
+    bound = bind_schema(llm, schema, method)
+    if callbacks:
+        bound = bound.with_config(callbacks=callbacks)
+
+    messages = list(messages)
+    for attempt in range(max_repairs + 1):
+        response = await bound.ainvoke(messages, **kwargs)
+        text = response_text(response)
+        try:
+            return parse_structured(text, schema)
+        except StructuredOutputError as e:
+            if attempt == max_repairs:
+                raise
+            logger.warning(f"Asking the model to repair its {schema.__name__}: {e}")
+            messages += _repair_request(schema, e)
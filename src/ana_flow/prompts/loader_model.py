@@ -1,10 +1,18 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 class LoaderOutput(BaseModel):
-    sale_data: list[dict] = Field(..., description="The sales data of the cars")
     model_specification: str = Field(..., description="The specification of the car model")
+    forecast_start: Optional[str] = Field(
+        default=None, description="First month to forecast as YYYY-MM, when the task names one"
+    )
+    forecast_end: Optional[str] = Field(
+        default=None, description="Last month to forecast as YYYY-MM, when the task names one"
+    )
     class Config:
         json_schema_extra = {
             "model_specification": "银河E5 550",
-            "sale_data": [{"2025WK1": 100}, {"2025WK2": 200}, {"2025WK3": 300}]
-        }
\ No newline at end of file
+            "forecast_start": "2025-09",
+            "forecast_end": "2025-12",
+        }
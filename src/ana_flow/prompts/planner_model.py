@@ -21,9 +21,16 @@ class Step(BaseModel):
     title: str
     description: str = Field(..., description="Specify exactly what data to collect")
     step_type: StepType = Field(..., description="Indicates the nature of the step")
+    depends_on: Optional[List[int]] = Field(
+        default=None,
+        description="Indices of the earlier steps this step needs, all earlier steps when omitted",
+    )
     execution_res: Optional[str] = Field(
         default=None, description="The Step execution result"
     )
+    summary: Optional[str] = Field(
+        default=None, description="Summary of the execution result, used when the context is compacted"
+    )
 
 
 class Plan(BaseModel):
@@ -55,6 +62,7 @@ class Plan(BaseModel):
                                 "Load and analyze local CSV files containing market data to understand the available data structure and key metrics."
                             ),
                             "step_type": "loading",
+                            "depends_on": [],
                         },
                         {
                             "need_web_search": True,
@@ -63,6 +71,7 @@ class Plan(BaseModel):
                                 "Collect data on market size, growth rates, major players, and investment trends in AI sector."
                             ),
                             "step_type": "research",
+                            "depends_on": [],
                         },
                         {
                             "need_web_search": False,
@@ -71,6 +80,7 @@ class Plan(BaseModel):
                                 "Process the collected data to derive key insights about market trends and patterns."
                             ),
                             "step_type": "processing",
+                            "depends_on": [0, 1],
                         },
                         {
                             "need_web_search": False,
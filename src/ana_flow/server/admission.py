@@ -0,0 +1,200 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+from typing import AsyncIterator
+
+from ana_flow.config import get_float_env, get_int_env
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+# weight of the latest run in the average run duration
+_DURATION_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    """The queue is full, the client should retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueTimeout(AdmissionRejected):
+    """The run waited in the queue longer than the queue timeout."""
+
+
+class Ticket:
+    """The place of a run in the admission queue."""
+
+    __slots__ = ("id", "client", "enqueued_at", "admitted_at", "released", "moved")
+
+    def __init__(self, id: int, client: str):
+        self.id = id
+        self.client = client
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: float | None = None
+        self.released = False
+        # set whenever the queue moves, so a waiting run can report its position
+        self.moved = asyncio.Event()
+
+    @property
+    def admitted(self) -> bool:
+        return self.admitted_at is not None
+
+
+class AdmissionController:
+    """
+    Global and per-client limits of the graph runs, with a FIFO queue in front of them.
+
+    A run is admitted when fewer than ``max_runs`` runs are running and its client
+    runs fewer than ``max_runs_per_client``. Otherwise it waits in the queue, in
+    order, up to ``queue_timeout`` seconds. A run is rejected right away when the
+    queue holds ``max_queue`` runs or its client already has ``max_runs_per_client``
+    runs waiting.
+    """
+
+    def __init__(
+        self,
+        max_runs: int | None = None,
+        max_runs_per_client: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+    ):
+        self.max_runs = max_runs or get_int_env("CHAT_MAX_RUNS", 8)
+        self.max_runs_per_client = max_runs_per_client or get_int_env(
+            "CHAT_MAX_RUNS_PER_CLIENT", 2
+        )
+        self.max_queue = max_queue or get_int_env("CHAT_MAX_QUEUE", 32)
+        self.queue_timeout = queue_timeout or get_float_env("CHAT_QUEUE_TIMEOUT", 60.0)
+        self._ids = itertools.count(1)
+        self._queue: list[Ticket] = []
+        self._running: Counter[str] = Counter()
+        # average run duration, used to tell rejected clients when to retry
+        self._run_seconds = 30.0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def retry_after(self) -> float:
+        """Seconds until the queue ahead of a new run is expected to drain."""
+        return max(1.0, self._run_seconds * (len(self._queue) + 1) / self.max_runs)
+
+    def check(self, client: str) -> None:
+        """
+        Reject a run of the client when it could not take a place in the queue.
+
+        Raises:
+            AdmissionRejected: The queue or the client's share of it is full
+        """
+        queued = sum(1 for ticket in self._queue if ticket.client == client)
+        if len(self._queue) >= self.max_queue or queued >= self.max_runs_per_client:
+            self.rejected += 1
+            raise AdmissionRejected("Too many chat requests are waiting", self.retry_after())
+
+    def reserve(self, client: str) -> Ticket:
+        """
+        Take a place in the queue, admitted at once when there is room.
+
+        Raises:
+            AdmissionRejected: The queue or the client's share of it is full
+        """
+        self.check(client)
+        ticket = Ticket(next(self._ids), client)
+        self._queue.append(ticket)
+        self._dispatch()
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based position of a waiting run in the queue, 0 once it is admitted."""
+        return 0 if ticket.admitted else self._queue.index(ticket) + 1
+
+    def _dispatch(self) -> None:
+        """Admit the waiting runs in order, skipping the runs of clients at their limit."""
+        admitted = False
+        for ticket in list(self._queue):
+            if self.running >= self.max_runs:
+                break
+            if self._running[ticket.client] >= self.max_runs_per_client:
+                continue
+            self._queue.remove(ticket)
+            self._running[ticket.client] += 1
+            ticket.admitted_at = time.monotonic()
+            ticket.moved.set()
+            self.admitted += 1
+            admitted = True
+        if admitted:
+            for ticket in self._queue:
+                ticket.moved.set()
+
+    async def wait(self, ticket: Ticket) -> AsyncIterator[int]:
+        """
+        Wait until the run is admitted, yielding its position whenever it changes.
+
+        Raises:
+            QueueTimeout: The run was not admitted within the queue timeout
+        """
+        deadline = ticket.enqueued_at + self.queue_timeout
+        position = None
+        while not ticket.admitted:
+            if self.position(ticket) != position:
+                position = self.position(ticket)
+                yield position
+                continue
+            ticket.moved.clear()
+            try:
+                await asyncio.wait_for(ticket.moved.wait(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                if ticket.admitted:
+                    break
+                self.timed_out += 1
+                self.release(ticket)
+                raise QueueTimeout(
+                    f"Chat request waited {self.queue_timeout:g}s in the queue", self.retry_after()
+                )
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the place of a finished, failed or abandoned run, the next waiting runs are admitted."""
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.admitted:
+            self._running[ticket.client] -= 1
+            if not self._running[ticket.client]:
+                del self._running[ticket.client]
+            duration = time.monotonic() - ticket.admitted_at
+            self._run_seconds += _DURATION_SMOOTHING * (duration - self._run_seconds)
+        else:
+            self._queue.remove(ticket)
+            for waiting in self._queue:
+                waiting.moved.set()
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": len(self._queue),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "average_run_seconds": round(self._run_seconds, 3),
+        }
+
+
+_admission_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process wide admission controller of the chat runs."""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
@@ -1,24 +1,50 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
-import json
 import logging
+import math
 import os
-from typing import Annotated, List, cast
+from contextlib import aclosing, asynccontextmanager
+from functools import partial
+from typing import Annotated, Any, AsyncIterator, List, cast
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException, Query
+import orjson
+from fastapi import (
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response, StreamingResponse
 from langchain_core.messages import AIMessageChunk, ToolMessage, BaseMessage
 from langgraph.types import Command
+from pydantic import ValidationError
+from starlette.requests import HTTPConnection
 
+from ana_flow.config import get_float_env
 from ana_flow.config.report_style import ReportStyle
 from ana_flow.config.tools import SELECTED_RAG_PROVIDER
 from ana_flow.graph.builder import build_graph_with_memory   
+from ana_flow.graph.checkpointer import ThreadRetention, build_checkpointer
+from ana_flow.graph.artifacts import get_artifact_store
+from ana_flow.graph.nodes import is_step_failure
+from ana_flow.graph.speculative import get_speculative_tasks
+from ana_flow.prompts.planner_model import Plan
 from ana_flow.rag.builder import build_retriever
 from ana_flow.rag.retriever import Resource
+from ana_flow.server.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    QueueTimeout,
+    get_admission_controller,
+)
 from ana_flow.server.chat_request import (
     ChatRequest,
     EnhancePromptRequest,
@@ -27,6 +53,7 @@ from ana_flow.server.chat_request import (
     GenerateProseRequest,
     TTSRequest,
 )
+from ana_flow.server.coalesce import Event, MessageChunkCoalescer
 from ana_flow.server.mcp_request import MCPServerMetadataRequest, MCPServerMetadataResponse
 from ana_flow.server.mcp_utils import load_mcp_tools
 from ana_flow.server.rag_request import (
@@ -35,8 +62,23 @@ from ana_flow.server.rag_request import (
     RAGResourcesResponse,
 )
 from ana_flow.server.config_request import ConfigResponse
+from ana_flow.server.jobs import Job, get_job_manager
+from ana_flow.server.run_cache import (
+    RecordedEvent,
+    RunCache,
+    get_run_cache,
+    record_run,
+    replay_run,
+    run_cache_key,
+)
+from ana_flow.server.socket_runs import FrameError, SocketRuns, unpack_frame
+from ana_flow.llms.cache import get_llm_response_cache
+from ana_flow.llms.http import close_http_clients
+from ana_flow.llms.limiter import rate_limiter_stats
 from ana_flow.llms.llm import get_configured_llm_models
-from ana_flow.tools import VolcengineTTS
+from ana_flow.tools import VolcengineTTS, get_mcp_session_pool, close_mcp_session_pool
+from ana_flow.data import close_sales_repository, get_sales_source
+from ana_flow.forecasting import close_forecast_executor
 
 import os
 from ana_flow.utils.daily_logger import DailyLogger
@@ -44,10 +86,50 @@ logger = DailyLogger(name=str(__name__), save_name="ana_flow")
 
 INTERNAL_SERVER_ERROR_DETAIL = "Internal Server Error"
 
+# marks the end of the events of a run streamed to a client
+_END_OF_RUN = object()
+
+# the options of the interrupt event of each review, the value is sent back as interrupt_feedback
+_REVIEW_OPTIONS = {
+    "plan_review": [
+        {"text": "Edit plan", "value": "edit_plan"},
+        {"text": "Start research", "value": "accepted"},
+    ],
+    "observations_review": [
+        {"text": "Edit observations", "value": "edit"},
+        {"text": "Continue research", "value": "accepted"},
+    ],
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the checkpointer and keep warm MCP server sessions for the lifetime of the server."""
+    global graph, thread_retention
+    await get_mcp_session_pool().start()
+    async with build_checkpointer() as checkpointer:
+        graph = build_graph_with_memory(checkpointer)
+        thread_retention = ThreadRetention(checkpointer)
+        retention_task = asyncio.create_task(thread_retention.run_forever())
+        artifacts_task = asyncio.create_task(get_artifact_store().run_forever())
+        try:
+            yield
+        finally:
+            retention_task.cancel()
+            artifacts_task.cancel()
+            await get_job_manager().close()
+            thread_retention = None
+            await close_mcp_session_pool()
+            await close_sales_repository()
+            await close_http_clients()
+            close_forecast_executor()
+
+
 app = FastAPI(
     title="AnaFlow API",
     description="API for AnaFlow",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -59,31 +141,341 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# replaced by the graph with the configured checkpointer when the server starts
 graph = build_graph_with_memory()
+thread_retention: ThreadRetention | None = None
 
 
 @app.post("/api/chat/stream")
-async def chat_stream(request: ChatRequest):
+async def chat_stream(request: ChatRequest, http_request: Request):
+    _, events = await _chat_events(request, http_request)
+    return StreamingResponse(
+        _until_disconnected(http_request, _sse_events(events)), media_type="text/event-stream"
+    )
+
+
+@app.post("/api/research/jobs")
+async def create_research_job(request: ChatRequest, http_request: Request):
+    """Start a run in the background, its events are streamed from /api/research/jobs/{job_id}/events."""
+    thread_id, events = await _chat_events(request, http_request)
+    job = get_job_manager().start(thread_id, _sse_events(events))
+    return {"job_id": job.id, "thread_id": thread_id}
+
+
+@app.get("/api/research/jobs/{job_id}")
+async def get_research_job(job_id: str):
+    """Get the status of a job, with the final report once it has completed."""
+    job = _get_job(job_id)
+    summary = job.summary()
+    if job.finished:
+        state = await graph.aget_state({"configurable": {"thread_id": job.thread_id}})
+        summary["final_report"] = state.values.get("final_report")
+    return summary
+
+
+@app.get("/api/research/jobs/{job_id}/events")
+async def stream_research_job_events(
+    job_id: str,
+    last_event_id: Annotated[str | None, Header(alias="Last-Event-ID")] = None,
+):
+    """Stream the events of a job, a reconnecting client continues after its Last-Event-ID."""
+    job = _get_job(job_id)
+    try:
+        after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    return StreamingResponse(job.stream(after), media_type="text/event-stream")
+
+
+@app.delete("/api/research/jobs/{job_id}")
+async def cancel_research_job(job_id: str):
+    """Cancel a running job."""
+    job = _get_job(job_id)
+    return {"job_id": job.id, "cancelled": get_job_manager().cancel(job_id)}
+
+
+def _get_job(job_id: str) -> Job:
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.websocket("/api/chat/ws")
+async def chat_socket(websocket: WebSocket):
+    """
+    Stream the runs of several threads over one socket, in msgpack frames both ways.
+
+    The client sends maps with a ``type``:
+    - ``chat`` starts a run of the ``request``, a ChatRequest, its ``id`` is echoed
+      in the ``started`` event with the thread of the run
+    - ``feedback`` resumes an interrupted thread with an ``action``, an optional
+      ``feedback`` text and the edited ``payload``
+    - ``cancel`` cancels the run of a thread
+
+    The server sends maps of the ``event`` type and ``data`` of the events of
+    /api/chat/stream, an ``end`` event once a run of a thread has ended and an
+    ``error`` event for a frame it cannot serve. The runs still going are
+    cancelled when the client disconnects.
+    """
+    await websocket.accept()
+    runs = SocketRuns(websocket.send_bytes)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                await _serve_frame(websocket, runs, unpack_frame(message.get("bytes")))
+            except (FrameError, ValidationError) as e:
+                await runs.send("error", {"content": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await runs.close()
+
+
+async def _serve_frame(websocket: WebSocket, runs: SocketRuns, frame: dict[str, Any]) -> None:
+    frame_type = frame.get("type")
+    if frame_type == "cancel":
+        thread_id = frame.get("thread_id")
+        if not await runs.cancel(thread_id):
+            await runs.send("error", {"thread_id": thread_id, "content": "The thread has no run"})
+        return
+    if frame_type == "chat":
+        request = ChatRequest.model_validate(frame.get("request") or {})
+    elif frame_type == "feedback":
+        request = runs.feedback_request(frame)
+    else:
+        raise FrameError(f"Unknown frame type: {frame_type!r}")
+
+    if runs.busy(request.thread_id):
+        await runs.send(
+            "error", {"thread_id": request.thread_id, "content": "The thread has a run going"}
+        )
+        return
+    try:
+        thread_id, events = await _chat_events(request, websocket)
+    except HTTPException as e:
+        error = {"thread_id": request.thread_id, "content": e.detail}
+        if e.headers and "Retry-After" in e.headers:
+            error["retry_after"] = int(e.headers["Retry-After"])
+        await runs.send("error", error)
+        return
+    try:
+        await runs.send("started", {"thread_id": thread_id, "id": frame.get("id")})
+    except BaseException:
+        # the socket has closed before the run started
+        await events.aclose()
+        raise
+    runs.start(request, thread_id, events)
+
+
+async def _chat_events(
+    request: ChatRequest, http_request: HTTPConnection
+) -> tuple[str, AsyncIterator[Event]]:
+    """The thread and the events of the run a chat request asks for, replayed from the run cache when possible."""
     thread_id = request.thread_id
     if thread_id == "__default__":
         thread_id = str(uuid4())
-    return StreamingResponse(
-        _astream_workflow_generator(
-            request.model_dump()["messages"],
-            thread_id,
-            request.resources,
-            request.max_plan_iterations,
-            request.max_step_num,
-            request.max_search_results,
-            request.auto_accepted_plan,
-            request.interrupt_feedback,
-            request.mcp_settings,
-            request.enable_background_investigation,
-            request.report_style,
-            request.enable_deep_thinking,
-        ),
-        media_type="text/event-stream",
+    if thread_retention is not None:
+        await thread_retention.touch(thread_id)
+
+    run_cache = await _cacheable_run(request, thread_id)
+    if run_cache is not None:
+        try:
+            watermark = await _sales_watermark()
+        except Exception as e:
+            logger.warning(
+                f"Not caching the run of thread {thread_id}, the sales watermark is unknown: {e}"
+            )
+            run_cache = None
+    if run_cache is not None:
+        key = run_cache_key(request)
+        # the run is recorded again when the request asks for fresh step results
+        recorded = (
+            None
+            if request.bypass_step_cache
+            else await asyncio.to_thread(run_cache.get, key, watermark)
+        )
+        if recorded is not None:
+            logger.info(f"Replaying a cached run on thread {thread_id}")
+            # the thread gets the final state of the run, for follow-up messages and job results
+            await graph.aupdate_state(
+                {"configurable": {"thread_id": thread_id}}, recorded.state, as_node="reporter"
+            )
+            return thread_id, _replay_events(recorded.events, thread_id, request.coalesce_tokens)
+
+    # runs beyond the limits wait in the admission queue, a full queue is rejected at once
+    admission = get_admission_controller()
+    client = _client_id(http_request)
+    try:
+        admission.check(client)
+    except AdmissionRejected as e:
+        logger.warning(f"Rejected chat request of thread {thread_id}: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
+    events = _astream_workflow_generator(
+        request.model_dump()["messages"],
+        thread_id,
+        request.resources,
+        request.max_plan_iterations,
+        request.max_step_num,
+        request.max_search_results,
+        request.auto_accepted_plan,
+        request.interrupt_feedback,
+        request.mcp_settings,
+        request.enable_background_investigation,
+        request.report_style,
+        request.enable_deep_thinking,
+        request.bypass_step_cache,
+        request.interrupt_payload,
+        request.coalesce_tokens,
     )
+    if run_cache is not None:
+        events = record_run(events, run_cache, key, watermark, partial(_completed_state, thread_id))
+    return thread_id, _admitted_events(admission, client, thread_id, events)
+
+
+def _client_id(http_request: HTTPConnection) -> str:
+    """The client a run is counted against, the X-Client-ID header or the client address."""
+    client_id = http_request.headers.get("X-Client-ID")
+    if client_id:
+        return client_id
+    return http_request.client.host if http_request.client else "unknown"
+
+
+async def _admitted_events(
+    admission: AdmissionController, client: str, thread_id: str, events: AsyncIterator[Event]
+):
+    """
+    Report the queue position of the run until it is admitted, then stream its events.
+
+    The place in the queue is taken when the events are first read, so a stream
+    that is dropped or cancelled before it starts holds no place.
+    """
+    ticket = None
+    try:
+        try:
+            ticket = admission.reserve(client)
+            async for position in admission.wait(ticket):
+                yield "queued", {"thread_id": thread_id, "position": position}
+        except QueueTimeout as e:
+            logger.warning(f"Chat request of thread {thread_id} timed out in the queue")
+            yield "queue_timeout", {
+                "thread_id": thread_id,
+                "content": str(e),
+                "retry_after": math.ceil(e.retry_after),
+            }
+            return
+        except AdmissionRejected as e:
+            # the queue filled up between the request and the start of its stream
+            logger.warning(f"Rejected chat request of thread {thread_id}: {e}")
+            yield "queue_rejected", {
+                "thread_id": thread_id,
+                "content": str(e),
+                "retry_after": math.ceil(e.retry_after),
+            }
+            return
+        async for event in events:
+            yield event
+    finally:
+        if ticket is not None:
+            admission.release(ticket)
+        await events.aclose()
+
+
+async def _sse_events(events: AsyncIterator[Event]):
+    """The events of a run as server-sent events, for the HTTP streams."""
+    try:
+        async for event_type, data in events:
+            yield _make_event(event_type, data)
+    finally:
+        await events.aclose()
+
+
+async def _until_disconnected(http_request: Request, events: AsyncIterator[str]):
+    """
+    Stream the events of a run while its client is connected.
+
+    The run is driven by its own task and the client is polled every
+    CHAT_DISCONNECT_POLL_INTERVAL seconds. Once the client has gone the task is
+    cancelled, the cancellation reaches the LLM and MCP calls in flight and the run
+    gives its place in the admission queue back.
+    """
+    interval = get_float_env("CHAT_DISCONNECT_POLL_INTERVAL", 0.5)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run():
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        except Exception as e:
+            queue.put_nowait(e)
+        finally:
+            await events.aclose()
+            queue.put_nowait(_END_OF_RUN)
+
+    async def watch():
+        while not await http_request.is_disconnected():
+            await asyncio.sleep(interval)
+        if not running.done():
+            logger.info("Client disconnected, cancelling its run")
+            running.cancel()
+
+    running = asyncio.create_task(run())
+    watcher = asyncio.create_task(watch())
+    try:
+        while (event := await queue.get()) is not _END_OF_RUN:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+    finally:
+        watcher.cancel()
+        running.cancel()
+
+
+async def _cacheable_run(request: ChatRequest, thread_id: str) -> RunCache | None:
+    """The run cache when the request starts a run on a new thread, None otherwise."""
+    run_cache = get_run_cache()
+    if run_cache is None or request.interrupt_feedback:
+        return None
+    # the answer on a thread with history depends on that history
+    state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    return None if state.values else run_cache
+
+
+async def _completed_state(thread_id: str) -> dict | None:
+    """The final state of a run that wrote its report without failed steps, None otherwise."""
+    state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    if not state.values.get("final_report"):
+        return None
+    plan = state.values.get("current_plan")
+    if isinstance(plan, Plan) and any(is_step_failure(step.execution_res) for step in plan.steps):
+        return None
+    return state.values
+
+
+async def _sales_watermark() -> str | None:
+    """The version of the sales data a run reads, from the sales cache or the database."""
+    watermark = await get_sales_source().sales_watermark()
+    return watermark.isoformat() if watermark else None
+
+
+async def _replay_events(
+    recorded: list[RecordedEvent], thread_id: str, coalesce_tokens: bool = False
+):
+    coalescer = MessageChunkCoalescer() if coalesce_tokens else None
+    async for event in replay_run(recorded, thread_id):
+        for ready in coalescer.add(*event) if coalescer else [event]:
+            yield ready
+    if coalescer is not None:
+        for ready in coalescer.flush():
+            yield ready
 
 
 async def _astream_workflow_generator(
@@ -99,6 +491,9 @@ async def _astream_workflow_generator(
     enable_background_investigation: bool,
     report_style: ReportStyle,
     enable_deep_thinking: bool,
+    bypass_step_cache: bool = False,
+    interrupt_payload: Any = None,
+    coalesce_tokens: bool = False,
 ):
     input_ = {
         "messages": messages,
@@ -111,89 +506,181 @@ async def _astream_workflow_generator(
         "research_topic": messages[-1]["content"] if messages else "",
     }
     if not auto_accepted_plan and interrupt_feedback:
-        resume_msg = f"[{interrupt_feedback}]"
-        # add the last message to the resume message
-        if messages:
-            resume_msg += f" {messages[-1]['content']}"
-        input_ = Command(resume=resume_msg)
-    async for agent, _, event_data in graph.astream(
-        input_,
-        config={
-            "thread_id": thread_id,
-            "resources": resources,
-            "max_plan_iterations": max_plan_iterations,
-            "max_step_num": max_step_num,
-            "max_search_results": max_search_results,
-            "mcp_settings": mcp_settings,
-            "report_style": report_style.value,
-            "enable_deep_thinking": enable_deep_thinking,
-        },
-        stream_mode=["messages", "updates"],
-        subgraphs=True,
-    ):
-        if isinstance(event_data, dict):
-            if "__interrupt__" in event_data:
-                yield _make_event(
-                    "interrupt",
-                    {
-                        "thread_id": thread_id,
-                        "id": event_data["__interrupt__"][0].ns[0],
-                        "role": "assistant",
-                        "content": event_data["__interrupt__"][0].value,
-                        "finish_reason": "interrupt",
-                        "options": [
-                            {"text": "Edit plan", "value": "edit_plan"},
-                            {"text": "Start research", "value": "accepted"},
-                        ],
-                    },
-                )
-            continue
-        message_chunk, message_metadata = cast(
-            tuple[BaseMessage, dict[str, any]], event_data
+        # the last message is the feedback, the payload the edited plan or observations
+        input_ = Command(
+            resume={
+                "action": interrupt_feedback,
+                "feedback": messages[-1]["content"] if messages else None,
+                "payload": interrupt_payload,
+            }
         )
-        event_stream_message: dict[str, any] = {
-            "thread_id": thread_id,
-            "agent": agent[0].split(":")[0],
-            "id": message_chunk.id,
-            "role": "assistant",
-            "content": message_chunk.content,
-        }
-        if message_chunk.additional_kwargs.get("reasoning_content"):
-            event_stream_message["reasoning_content"] = message_chunk.additional_kwargs[
-                "reasoning_content"
-            ]
-        if message_chunk.response_metadata.get("finish_reason"):
-            event_stream_message["finish_reason"] = message_chunk.response_metadata.get(
-                "finish_reason"
+    # the clients that opt in get the tokens of a message in fewer, larger events
+    coalescer = MessageChunkCoalescer() if coalesce_tokens else None
+    interrupted = False
+    try:
+        async with aclosing(
+            graph.astream(
+                input_,
+                config={
+                    "thread_id": thread_id,
+                    "resources": resources,
+                    "max_plan_iterations": max_plan_iterations,
+                    "max_step_num": max_step_num,
+                    "max_search_results": max_search_results,
+                    "mcp_settings": mcp_settings,
+                    "report_style": report_style.value,
+                    "enable_deep_thinking": enable_deep_thinking,
+                    "bypass_step_cache": bypass_step_cache,
+                },
+                stream_mode=["messages", "updates", "custom"],
+                subgraphs=True,
             )
-        if isinstance(message_chunk, ToolMessage):
-            # Tool Message - Return the result of the tool call
-            event_stream_message["tool_call_id"] = message_chunk.tool_call_id
-            yield _make_event("tool_call_result", event_stream_message)
-        elif isinstance(message_chunk, AIMessageChunk):
-            # AI Message - Raw message tokens
-            if message_chunk.tool_calls:
-                # AI Message - Tool Call
-                event_stream_message["tool_calls"] = message_chunk.tool_calls
-                event_stream_message["tool_call_chunks"] = (
-                    message_chunk.tool_call_chunks
-                )
-                yield _make_event("tool_calls", event_stream_message)
-            elif message_chunk.tool_call_chunks:
-                # AI Message - Tool Call Chunks
-                event_stream_message["tool_call_chunks"] = (
-                    message_chunk.tool_call_chunks
-                )
-                yield _make_event("tool_call_chunks", event_stream_message)
-            else:
-                # AI Message - Raw message tokens
-                yield _make_event("message_chunk", event_stream_message)
+        ) as stream, aclosing(_stream_items(stream, coalescer)) as items:
+            async for item in items:
+                if item is None:
+                    # the window of the held chunks has closed before the next event
+                    for ready in coalescer.expire():
+                        yield ready
+                    continue
+                agent, stream_mode, event_data = item
+                event = _stream_event(thread_id, agent, stream_mode, event_data)
+                if event is None:
+                    continue
+                if event[0] == "interrupt":
+                    interrupted = True
+                if event[1].get("content") == "":
+                    event[1].pop("content")
+                for ready in coalescer.add(*event) if coalescer else [event]:
+                    yield ready
+        if coalescer is not None:
+            for ready in coalescer.flush():
+                yield ready
+    finally:
+        # a speculative search the run did not get to use is not needed anymore,
+        # also when the run was cancelled
+        get_speculative_tasks().discard(thread_id)
+    # an interrupted run resumes with the next request, the store releases it after ARTIFACTS_TTL otherwise
+    if not interrupted:
+        get_artifact_store().release(thread_id)
+
+
+def _stream_event(
+    thread_id: str, agent: tuple[str, ...], stream_mode: str, event_data: Any
+) -> Event | None:
+    """The event type and data of an item of the graph stream, None when it is not sent to the client."""
+    if stream_mode == "custom":
+        if isinstance(event_data, dict) and "plan_step" in event_data:
+            # a step of the plan, sent before the planner has finished
+            return (
+                "plan_step",
+                {
+                    "thread_id": thread_id,
+                    "agent": "planner",
+                    "role": "assistant",
+                    **event_data["plan_step"],
+                },
+            )
+        if isinstance(event_data, dict) and "plan_reset" in event_data:
+            # the plan was rejected and is generated again, the steps sent so far are dropped
+            return "plan_reset", {"thread_id": thread_id, "agent": "planner", "role": "assistant"}
+        return None
+    if isinstance(event_data, dict):
+        if "__interrupt__" in event_data:
+            review = event_data["__interrupt__"][0].value
+            return (
+                "interrupt",
+                {
+                    "thread_id": thread_id,
+                    "id": event_data["__interrupt__"][0].ns[0],
+                    "role": "assistant",
+                    "content": review["message"],
+                    "finish_reason": "interrupt",
+                    "review": review["type"],
+                    # edited by the client and sent back as the interrupt_payload
+                    "payload": review["payload"],
+                    "options": _REVIEW_OPTIONS[review["type"]],
+                },
+            )
+        return None
+    message_chunk, message_metadata = cast(
+        tuple[BaseMessage, dict[str, any]], event_data
+    )
+    event_stream_message: dict[str, any] = {
+        "thread_id": thread_id,
+        "agent": agent[0].split(":")[0],
+        "id": message_chunk.id,
+        "role": "assistant",
+        "content": message_chunk.content,
+    }
+    if message_chunk.additional_kwargs.get("reasoning_content"):
+        event_stream_message["reasoning_content"] = message_chunk.additional_kwargs[
+            "reasoning_content"
+        ]
+    if message_chunk.response_metadata.get("finish_reason"):
+        event_stream_message["finish_reason"] = message_chunk.response_metadata.get(
+            "finish_reason"
+        )
+    if isinstance(message_chunk, ToolMessage):
+        # Tool Message - Return the result of the tool call
+        event_stream_message["tool_call_id"] = message_chunk.tool_call_id
+        return "tool_call_result", event_stream_message
+    if isinstance(message_chunk, AIMessageChunk):
+        # AI Message - Raw message tokens
+        if message_chunk.tool_calls:
+            # AI Message - Tool Call
+            event_stream_message["tool_calls"] = message_chunk.tool_calls
+            event_stream_message["tool_call_chunks"] = message_chunk.tool_call_chunks
+            return "tool_calls", event_stream_message
+        if message_chunk.tool_call_chunks:
+            # AI Message - Tool Call Chunks
+            event_stream_message["tool_call_chunks"] = message_chunk.tool_call_chunks
+            return "tool_call_chunks", event_stream_message
+        # AI Message - Raw message tokens
+        return "message_chunk", event_stream_message
+    return None
+
+
+async def _stream_items(stream: AsyncIterator, coalescer: MessageChunkCoalescer | None):
+    """
+    The items of a graph stream, and None whenever the chunks held by the coalescer are due.
+
+    The next item is awaited no longer than the window of the held chunks, so they
+    are sent on time while a node is quiet, e.g. waiting for a tool.
+    """
+    next_item = None
+    try:
+        while True:
+            timeout = coalescer.timeout() if coalescer else None
+            if timeout is None and next_item is None:
+                try:
+                    item = await anext(stream)
+                except StopAsyncIteration:
+                    return
+                yield item
+                continue
+            if next_item is None:
+                next_item = asyncio.ensure_future(anext(stream))
+            done, _ = await asyncio.wait({next_item}, timeout=timeout)
+            if not done:
+                yield None
+                continue
+            finished, next_item = next_item, None
+            try:
+                item = finished.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        if next_item is not None:
+            # the stream is closed next, once its pending item has stopped
+            next_item.cancel()
+            await asyncio.gather(next_item, return_exceptions=True)
 
 
 def _make_event(event_type: str, data: dict[str, any]):
-    if data.get("content") == "":
-        data.pop("content")
-    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    # orjson writes UTF-8 like json.dumps with ensure_ascii=False, several times faster
+    payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return f"event: {event_type}\ndata: {payload}\n\n"
 
 
 @app.post("/api/tts")
@@ -311,3 +798,21 @@ async def config():
         rag=RAGConfigResponse(provider=SELECTED_RAG_PROVIDER),
         models=get_configured_llm_models(),
     )
+
+
+@app.get("/api/chat/stats")
+async def chat_stats():
+    """Get the running and queued chat runs and the admission counters."""
+    return get_admission_controller().stats()
+
+
+@app.get("/api/llm/stats")
+async def llm_stats():
+    """Get the rate limiter counters and queue wait times per provider model, and the response cache counters."""
+    response_cache = get_llm_response_cache()
+    return {
+        "rate_limits": rate_limiter_stats(),
+        "response_cache": await asyncio.to_thread(response_cache.stats)
+        if response_cache
+        else None,
+    }
@@ -1,7 +1,7 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-from typing import List, Optional, Union
+from typing import Any, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -53,6 +53,10 @@ class ChatRequest(BaseModel):
     interrupt_feedback: Optional[str] = Field(
         None, description="Interrupt feedback from the user on the plan"
     )
+    interrupt_payload: Optional[Any] = Field(
+        None,
+        description="The payload of the interrupt edited by the user, e.g. the reviewed plan",
+    )
     mcp_settings: Optional[dict] = Field(
         None, description="MCP settings for the chat request"
     )
@@ -65,6 +69,14 @@ class ChatRequest(BaseModel):
     enable_deep_thinking: Optional[bool] = Field(
         False, description="Whether to enable deep thinking"
     )
+    bypass_step_cache: Optional[bool] = Field(
+        False,
+        description="Whether to run every step again instead of reusing the results of near-identical steps",
+    )
+    coalesce_tokens: Optional[bool] = Field(
+        False,
+        description="Whether to merge consecutive message chunks of a message into fewer events",
+    )
 
 
 class TTSRequest(BaseModel):
@@ -0,0 +1,92 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import time
+from typing import Any
+
+from ana_flow.config import get_float_env, get_int_env
+
+# an event of a run: event type and data
+Event = tuple[str, dict[str, Any]]
+
+# the fields of a message chunk that are concatenated when chunks are merged
+_TEXT_FIELDS = ("content", "reasoning_content")
+
+
+class _PendingChunk:
+    __slots__ = ("data", "started_at", "size")
+
+    def __init__(self, data: dict[str, Any], started_at: float):
+        self.data = data
+        self.started_at = started_at
+        self.size = 0
+
+
+class MessageChunkCoalescer:
+    """
+    Merges consecutive message_chunk events of the same message into fewer, larger events.
+
+    The chunks of a message are held for up to ``window`` seconds
+    (SSE_COALESCE_WINDOW) or ``max_bytes`` bytes of text (SSE_COALESCE_MAX_BYTES).
+    The stream waits for the next event no longer than ``timeout``, so the held
+    chunks are sent by ``expire`` when their window closes even while the run is
+    quiet, a message is also sent once it has finished. Any other event, e.g. a tool call or an interrupt, first sends the
+    held chunks, so the events keep their order. Chunks of messages that are
+    streamed at the same time by parallel steps are held apart.
+    """
+
+    def __init__(self, window: float | None = None, max_bytes: int | None = None):
+        self.window = window or get_float_env("SSE_COALESCE_WINDOW", 0.05)
+        self.max_bytes = max_bytes or get_int_env("SSE_COALESCE_MAX_BYTES", 2048)
+        self._pending: dict[Any, _PendingChunk] = {}
+
+    def add(self, event_type: str, data: dict[str, Any]) -> list[Event]:
+        """The events to send now that ``event_type`` has arrived."""
+        now = time.monotonic()
+        if event_type != "message_chunk":
+            return self.flush() + [(event_type, data)]
+        if not all(isinstance(data.get(field, ""), str) for field in _TEXT_FIELDS):
+            # content blocks are sent as they are
+            return self.flush() + [(event_type, data)]
+
+        ready = self._expired(now)
+        pending = self._pending.get(data.get("id"))
+        if pending is None:
+            pending = _PendingChunk(dict(data), now)
+            self._pending[data.get("id")] = pending
+        else:
+            for field in _TEXT_FIELDS:
+                if field in data:
+                    pending.data[field] = pending.data.get(field, "") + data[field]
+            if "finish_reason" in data:
+                pending.data["finish_reason"] = data["finish_reason"]
+        pending.size += sum(len(data.get(field, "").encode("utf-8")) for field in _TEXT_FIELDS)
+
+        if "finish_reason" in data or pending.size >= self.max_bytes:
+            ready.append(self._pop(data.get("id")))
+        return ready
+
+    def timeout(self) -> float | None:
+        """Seconds until the window of the oldest held chunk closes, None when no chunk is held."""
+        if not self._pending:
+            return None
+        started_at = min(pending.started_at for pending in self._pending.values())
+        return max(0.0, started_at + self.window - time.monotonic())
+
+    def expire(self) -> list[Event]:
+        """The held chunks whose window has closed, when no event arrived in time."""
+        return self._expired(time.monotonic())
+
+    def _expired(self, now: float) -> list[Event]:
+        return [
+            self._pop(message_id)
+            for message_id, pending in list(self._pending.items())
+            if now - pending.started_at >= self.window
+        ]
+
+    def _pop(self, message_id: Any) -> Event:
+        return "message_chunk", self._pending.pop(message_id).data
+
+    def flush(self) -> list[Event]:
+        """The held chunks, when another event arrives or the run ends."""
+        return [self._pop(message_id) for message_id in list(self._pending)]
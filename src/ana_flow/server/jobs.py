@@ -0,0 +1,168 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import AsyncIterator
+from uuid import uuid4
+
+from ana_flow.config import get_float_env, get_int_env
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+
+class JobStatus(str, Enum):
+    RUNNING = "running"
+    INTERRUPTED = "interrupted"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job:
+    """A run detached from the request that started it, its latest events are kept in a ring buffer."""
+
+    def __init__(self, thread_id: str, buffer_size: int):
+        self.id = str(uuid4())
+        self.thread_id = thread_id
+        self.status = JobStatus.RUNNING
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        # (event id, server-sent event) of the latest events
+        self.events: deque[tuple[int, str]] = deque(maxlen=buffer_size)
+        self.last_event_id = 0
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    async def _append(self, event: str) -> None:
+        self.last_event_id += 1
+        # the id lets a client resume the stream with the Last-Event-ID header
+        self.events.append((self.last_event_id, f"id: {self.last_event_id}\n{event}"))
+        if event.startswith("event: interrupt\n"):
+            self.status = JobStatus.INTERRUPTED
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _finish(self, status: JobStatus, error: str | None = None) -> None:
+        if self.status == JobStatus.RUNNING or status != JobStatus.COMPLETED:
+            self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def stream(self, last_event_id: int = 0) -> AsyncIterator[str]:
+        """
+        The events after ``last_event_id``, then the new events until the job finishes.
+
+        Events that have already left the ring buffer are skipped.
+        """
+        while True:
+            async with self._changed:
+                pending = [
+                    (event_id, event)
+                    for event_id, event in self.events
+                    if event_id > last_event_id
+                ]
+                if not pending:
+                    if self.finished:
+                        return
+                    await self._changed.wait()
+                    continue
+            for event_id, event in pending:
+                yield event
+                last_event_id = event_id
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "thread_id": self.thread_id,
+            "status": self.status.value,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "last_event_id": self.last_event_id,
+        }
+
+
+class JobManager:
+    """
+    Runs started in background tasks, so they survive the client disconnecting.
+
+    Each job keeps its latest JOBS_EVENT_BUFFER events for clients to stream and
+    resume, finished jobs are forgotten after JOBS_TTL seconds.
+    """
+
+    def __init__(self, buffer_size: int | None = None, ttl_seconds: float | None = None):
+        self.buffer_size = buffer_size or get_int_env("JOBS_EVENT_BUFFER", 2000)
+        self.ttl_seconds = ttl_seconds or get_float_env("JOBS_TTL", 3600.0)
+        self._jobs: dict[str, Job] = {}
+
+    def start(self, thread_id: str, events: AsyncIterator[str]) -> Job:
+        """Run the events of a job in a background task."""
+        self._purge()
+        job = Job(thread_id, self.buffer_size)
+        job.task = asyncio.create_task(self._run(job, events))
+        self._jobs[job.id] = job
+        logger.info(f"Started job {job.id} on thread {thread_id}")
+        return job
+
+    async def _run(self, job: Job, events: AsyncIterator[str]) -> None:
+        try:
+            async for event in events:
+                await job._append(event)
+        except asyncio.CancelledError:
+            await job._finish(JobStatus.CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e!r}")
+            await job._finish(JobStatus.FAILED, str(e))
+        else:
+            await job._finish(JobStatus.COMPLETED)
+        finally:
+            await events.aclose()
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.task.cancel()
+        return True
+
+    def _purge(self) -> None:
+        expired = time.time() - self.ttl_seconds
+        for job_id in [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < expired
+        ]:
+            del self._jobs[job_id]
+
+    async def close(self) -> None:
+        """Cancel the running jobs, when the server shuts down."""
+        tasks = [job.task for job in self._jobs.values() if not job.finished]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_job_manager: JobManager | None = None
+
+
+def get_job_manager() -> JobManager:
+    """Get the process wide job manager."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager()
+    return _job_manager
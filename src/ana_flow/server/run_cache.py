@@ -0,0 +1,237 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import orjson
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ana_flow.config import get_bool_env, get_float_env, get_int_env
+from ana_flow.server.chat_request import ChatRequest
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+# the fields of a chat request that change the answer
+_KEY_FIELDS = {
+    "messages",
+    "resources",
+    "max_plan_iterations",
+    "max_step_num",
+    "max_search_results",
+    "auto_accepted_plan",
+    "mcp_settings",
+    "enable_background_investigation",
+    "report_style",
+    "enable_deep_thinking",
+}
+
+# expired and excess runs are evicted after this many writes
+_EVICT_EVERY = 50
+
+# a recorded event: seconds since the run started, event type and data
+RecordedEvent = tuple[float, str, dict[str, Any]]
+
+# the final state is stored the way the checkpointer stores it, with its messages and plan
+_serde = JsonPlusSerializer()
+
+
+@dataclass
+class RecordedRun:
+    """The events of a completed run and the final state of its thread."""
+
+    events: list[RecordedEvent]
+    state: dict[str, Any]
+
+
+def run_cache_key(request: ChatRequest) -> str:
+    """Hash of the question and the settings of a chat request, the thread is not part of it."""
+    fields = request.model_dump(mode="json", include=_KEY_FIELDS)
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def parse_event(event: str) -> tuple[str, dict[str, Any]]:
+    """Split a server-sent event into its type and data."""
+    event_line, data_line = event.strip().split("\n", 1)
+    return event_line.removeprefix("event: "), orjson.loads(data_line.removeprefix("data: "))
+
+
+class RunCache:
+    """
+    Events and final states of completed runs in a local SQLite file, replayed for identical requests.
+
+    The final state is written to the thread a run is replayed on, so follow-up
+    messages and the job results see the report. A run is reused for ``ttl_seconds`` and only while the sales data has not
+    changed, a run recorded before the latest weekly sales were synced is dropped.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ):
+        self.path = Path(path or os.getenv("RUN_CACHE_PATH", "run_cache.sqlite"))
+        self.ttl_seconds = ttl_seconds or get_float_env("RUN_CACHE_TTL", 3600.0)
+        self.max_entries = max_entries or get_int_env("RUN_CACHE_MAX_ENTRIES", 500)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "key TEXT PRIMARY KEY, events TEXT NOT NULL, watermark TEXT, "
+            "created_at REAL NOT NULL, state_type TEXT, state BLOB)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        if "state" not in columns:
+            # runs recorded without their final state are never replayed
+            self._conn.execute("ALTER TABLE runs ADD COLUMN state_type TEXT")
+            self._conn.execute("ALTER TABLE runs ADD COLUMN state BLOB")
+        self._conn.commit()
+
+    def get(self, key: str, watermark: str | None) -> RecordedRun | None:
+        """
+        The recorded run, None when it was not recorded, has expired or predates the sales data.
+
+        Blocks on SQLite, call it through ``asyncio.to_thread`` from the event loop.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT events, watermark, created_at, state_type, state FROM runs WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and (
+                row[1] != watermark or row[2] < now - self.ttl_seconds or row[4] is None
+            ):
+                self._conn.execute("DELETE FROM runs WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return RecordedRun(
+            events=[tuple(event) for event in json.loads(row[0])],
+            state=_serde.loads_typed((row[3], row[4])),
+        )
+
+    def put(self, key: str, run: RecordedRun, watermark: str | None) -> None:
+        """Record a run, blocks on SQLite like ``get``."""
+        now = time.time()
+        state_type, state = _serde.dumps_typed(run.state)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (key, events, watermark, created_at, state_type, state) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(run.events, ensure_ascii=False), watermark, now, state_type, state),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM runs WHERE created_at < ? OR key IN "
+            "(SELECT key FROM runs ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (now - self.ttl_seconds, self.max_entries),
+        )
+        if cursor.rowcount:
+            logger.info(f"Evicted {cursor.rowcount} cached runs")
+
+    def invalidate(self, watermark: str | None = None) -> int:
+        """Drop the runs recorded over other sales data than ``watermark``, all runs when None."""
+        with self._lock:
+            if watermark is None:
+                cursor = self._conn.execute("DELETE FROM runs")
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM runs WHERE watermark IS NOT ?", (watermark,)
+                )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+async def record_run(
+    events: AsyncIterator[tuple[str, dict[str, Any]]],
+    run_cache: RunCache,
+    key: str,
+    watermark: str | None,
+    final_state: Callable[[], Awaitable[dict[str, Any] | None]],
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """
+    Pass the events of a run through and record them with ``final_state`` once it completes.
+
+    Runs interrupted for feedback or abandoned by the client are not recorded, nor
+    are runs ``final_state`` finds incomplete (None), e.g. without a report or with
+    failed steps.
+    """
+    started = time.monotonic()
+    recorded: list[RecordedEvent] = []
+    async for event_type, data in events:
+        recorded.append((round(time.monotonic() - started, 3), event_type, data))
+        yield event_type, data
+    if any(event_type == "interrupt" for _, event_type, _ in recorded):
+        return
+    state = await final_state()
+    if state is None:
+        return
+    await asyncio.to_thread(run_cache.put, key, RecordedRun(recorded, state), watermark)
+
+
+async def replay_run(
+    recorded: list[RecordedEvent], thread_id: str, speedup: float | None = None
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """
+    Replay the events of a recorded run on another thread, as event type and data.
+
+    The pauses between events are kept, divided by ``speedup``
+    (RUN_CACHE_REPLAY_SPEEDUP), 0 replays the events at once.
+    """
+    if speedup is None:
+        speedup = get_float_env("RUN_CACHE_REPLAY_SPEEDUP", 0.0)
+    previous = 0.0
+    for offset, event_type, data in recorded:
+        if speedup > 0 and offset > previous:
+            await asyncio.sleep((offset - previous) / speedup)
+        previous = offset
+        if "thread_id" in data:
+            data = {**data, "thread_id": thread_id}
+        yield event_type, data
+
+
+_run_cache: RunCache | None = None
+
+
+def get_run_cache() -> RunCache | None:
+    """Get the process wide run cache, None when RUN_CACHE_ENABLED is false."""
+    global _run_cache
+    if not get_bool_env("RUN_CACHE_ENABLED", True):
+        return None
+    if _run_cache is None:
+        _run_cache = RunCache()
+    return _run_cache
@@ -0,0 +1,122 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import ormsgpack
+
+from ana_flow.server.chat_request import ChatMessage, ChatRequest
+from ana_flow.server.coalesce import Event
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(name=str(__name__), save_name="ana_flow")
+
+
+class FrameError(ValueError):
+    """A frame of the client that is not a msgpack map."""
+
+
+def pack_frame(event_type: str, data: dict[str, Any]) -> bytes:
+    """A server frame, the event type and data of an event of a run in msgpack."""
+    return ormsgpack.packb({"event": event_type, "data": data})
+
+
+def unpack_frame(frame: bytes | None) -> dict[str, Any]:
+    """
+    A client frame, a msgpack map with its ``type``.
+
+    Raises:
+        FrameError: The frame is not binary or not a msgpack map
+    """
+    if frame is None:
+        raise FrameError("Frames must be binary msgpack")
+    try:
+        message = ormsgpack.unpackb(frame)
+    except ormsgpack.MsgpackDecodeError as e:
+        raise FrameError(f"Invalid msgpack frame: {e}") from e
+    if not isinstance(message, dict):
+        raise FrameError("A frame must be a msgpack map")
+    return message
+
+
+class SocketRuns:
+    """
+    The runs of the threads of one WebSocket connection.
+
+    Every thread runs in its own task and sends its events as frames over the
+    shared socket, a thread runs one run at a time. The request that started a
+    thread is kept, so the feedback to its interrupts resumes it with the same
+    settings.
+    """
+
+    def __init__(self, send: Callable[[bytes], Awaitable[None]]):
+        self._send = send
+        # frames of concurrent runs are written one at a time
+        self._send_lock = asyncio.Lock()
+        self._runs: dict[str, asyncio.Task] = {}
+        self.requests: dict[str, ChatRequest] = {}
+
+    async def send(self, event_type: str, data: dict[str, Any]) -> None:
+        frame = pack_frame(event_type, data)
+        async with self._send_lock:
+            await self._send(frame)
+
+    def busy(self, thread_id: str) -> bool:
+        return thread_id in self._runs
+
+    def feedback_request(self, message: dict[str, Any]) -> ChatRequest:
+        """
+        The request that resumes an interrupted thread with the feedback of a client.
+
+        The feedback frame holds the ``thread_id``, the ``action`` picked from the
+        options of the interrupt, an optional ``feedback`` text and the edited ``payload``.
+        """
+        thread_id = message.get("thread_id")
+        if not thread_id or not message.get("action"):
+            raise FrameError("A feedback frame needs a thread_id and an action")
+        request = self.requests.get(thread_id) or ChatRequest(thread_id=thread_id)
+        feedback = message.get("feedback")
+        return request.model_copy(
+            update={
+                "messages": [ChatMessage(role="user", content=feedback)] if feedback else [],
+                "auto_accepted_plan": False,
+                "interrupt_feedback": message["action"],
+                "interrupt_payload": message.get("payload"),
+            }
+        )
+
+    def start(self, request: ChatRequest, thread_id: str, events: AsyncIterator[Event]) -> None:
+        """Send the events of a run of the thread in the background."""
+        self.requests[thread_id] = request.model_copy(update={"thread_id": thread_id})
+        self._runs[thread_id] = asyncio.create_task(self._run(thread_id, events))
+
+    async def _run(self, thread_id: str, events: AsyncIterator[Event]) -> None:
+        try:
+            async for event_type, data in events:
+                await self.send(event_type, data)
+        except Exception as e:
+            logger.error(f"Run of thread {thread_id} over the socket failed: {e!r}")
+            await self.send("error", {"thread_id": thread_id, "content": str(e)})
+        finally:
+            await events.aclose()
+            # the thread is free for the next run before its client learns this one has ended
+            del self._runs[thread_id]
+        await self.send("end", {"thread_id": thread_id})
+
+    async def cancel(self, thread_id: str) -> bool:
+        """Cancel the run of a thread at the request of the client, False when it has none."""
+        task = self._runs.get(thread_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await self.send("end", {"thread_id": thread_id, "cancelled": True})
+        return True
+
+    async def close(self) -> None:
+        """Cancel the runs still going, when the client has disconnected."""
+        tasks = list(self._runs.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -8,6 +8,9 @@ from .python_repl import python_repl_tool
 from .search import get_web_search_tool
 from .tts import VolcengineTTS
 from .csv_loader import csv_loader_tool
+from .sales_series import sales_series_tool
+from .run_artifacts import run_artifacts_tool
+from .mcp_pool import MCPSessionPool, get_mcp_session_pool, close_mcp_session_pool
 
 __all__ = [
     "crawl_tool",
@@ -15,4 +18,9 @@ __all__ = [
     "get_web_search_tool",
     "VolcengineTTS",
     "csv_loader_tool",
+    "sales_series_tool",
+    "run_artifacts_tool",
+    "MCPSessionPool",
+    "get_mcp_session_pool",
+    "close_mcp_session_pool",
 ]
@@ -0,0 +1,328 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import ClientSession
+
+from ana_flow.config import get_float_env, get_int_env
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[dict], Any]
+
+
+@asynccontextmanager
+async def _default_session_factory(connection: dict) -> AsyncIterator[ClientSession]:
+    """Open and initialize an MCP client session for a connection config."""
+    async with create_session(connection) as session:
+        await session.initialize()
+        yield session
+
+
+def _server_key(server_name: str, connection: dict) -> str:
+    """Build a pool key so that a changed server config never reuses an old session."""
+    digest = hashlib.sha1(
+        json.dumps(connection, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()[:12]
+    return f"{server_name}:{digest}"
+
+
+class PooledSession:
+    """
+    A warm MCP session owned by a dedicated task.
+
+    The stdio/SSE transports are built on anyio task groups, which must be entered
+    and exited from the same task. Each session therefore lives in its own owner
+    task that keeps the transport open until the session is closed.
+    """
+
+    def __init__(self, server_name: str, connection: dict, session_factory: SessionFactory):
+        self.server_name = server_name
+        self.connection = connection
+        self.session: ClientSession | None = None
+        self.tools: list[BaseTool] = []
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+        self._session_factory = session_factory
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self.session is not None
+            and not self._closing.is_set()
+        )
+
+    async def open(self, timeout: float) -> None:
+        self._task = asyncio.create_task(
+            self._run(), name=f"mcp-session-{self.server_name}"
+        )
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.aclose()
+            raise TimeoutError(
+                f"Timed out after {timeout}s starting MCP server '{self.server_name}'"
+            )
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self) -> None:
+        try:
+            async with self._session_factory(self.connection) as session:
+                self.session = session
+                self.tools = await load_mcp_tools(session)
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+            if self._ready.is_set():
+                logger.warning(f"MCP session for '{self.server_name}' terminated: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self, timeout: float) -> bool:
+        """Check that the server still answers, used before handing out an idle session."""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+        except Exception as e:
+            logger.warning(f"Health check of MCP server '{self.server_name}' failed: {e}")
+            return False
+        self.last_checked = time.monotonic()
+        return True
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        self._closing.set()
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except Exception:
+            self._task.cancel()
+
+
+class _ServerPool:
+    """Idle sessions and the concurrency cap of a single MCP server config."""
+
+    def __init__(self, server_name: str, connection: dict, max_sessions: int):
+        self.server_name = server_name
+        self.connection = connection
+        self.semaphore = asyncio.Semaphore(max_sessions)
+        self.idle: list[PooledSession] = []
+        self.in_use = 0
+
+
+class MCPSessionPool:
+    """
+    Pool of long-lived MCP sessions keyed by server config.
+
+    Nodes lease a session (and the LangChain tools bound to it) for the duration of
+    an agent step instead of cold-starting the MCP server on every call. Idle
+    sessions are health-checked before reuse and evicted after ``idle_timeout``.
+    """
+
+    def __init__(
+        self,
+        max_sessions_per_server: int | None = None,
+        idle_timeout: float | None = None,
+        health_check_interval: float | None = None,
+        start_timeout: float | None = None,
+        acquire_timeout: float | None = None,
+        session_factory: SessionFactory | None = None,
+    ):
+        self.max_sessions_per_server = max_sessions_per_server or get_int_env(
+            "MCP_POOL_MAX_SESSIONS_PER_SERVER", 4
+        )
+        self.idle_timeout = idle_timeout or get_float_env("MCP_POOL_IDLE_TIMEOUT", 300.0)
+        self.health_check_interval = health_check_interval or get_float_env(
+            "MCP_POOL_HEALTH_CHECK_INTERVAL", 30.0
+        )
+        self.start_timeout = start_timeout or get_float_env("MCP_POOL_START_TIMEOUT", 120.0)
+        self.acquire_timeout = acquire_timeout or get_float_env(
+            "MCP_POOL_ACQUIRE_TIMEOUT", 300.0
+        )
+        self._session_factory = session_factory or _default_session_factory
+        self._servers: dict[str, _ServerPool] = {}
+        self._reaper: asyncio.Task | None = None
+        # sessions of cancelled leases being closed
+        self._closing_sessions: set[asyncio.Task] = set()
+        self._closed = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind_loop(self) -> None:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        """Start the background task that evicts idle sessions."""
+        self._bind_loop()
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever(), name="mcp-pool-reaper")
+
+    async def close(self) -> None:
+        """Close every pooled session, in use sessions are closed when released."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        sessions = [s for server in self._servers.values() for s in server.idle]
+        for server in self._servers.values():
+            server.idle.clear()
+        await asyncio.gather(
+            *(s.aclose() for s in sessions), *self._closing_sessions, return_exceptions=True
+        )
+        logger.info(f"MCP session pool closed {len(sessions)} idle session(s)")
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            key: {"idle": len(server.idle), "in_use": server.in_use}
+            for key, server in self._servers.items()
+        }
+
+    async def _reap_forever(self) -> None:
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def evict_idle(self) -> int:
+        """Close sessions that stayed idle longer than ``idle_timeout``."""
+        now = time.monotonic()
+        expired = []
+        for server in self._servers.values():
+            keep = []
+            for pooled in server.idle:
+                if now - pooled.last_used > self.idle_timeout or not pooled.alive:
+                    expired.append(pooled)
+                else:
+                    keep.append(pooled)
+            server.idle = keep
+        if expired:
+            logger.info(f"Evicting {len(expired)} idle MCP session(s)")
+            await asyncio.gather(*(s.aclose() for s in expired), return_exceptions=True)
+        return len(expired)
+
+    async def _checkout(self, server: _ServerPool) -> PooledSession:
+        while server.idle:
+            pooled = server.idle.pop()
+            if not pooled.alive:
+                await pooled.aclose()
+                continue
+            if time.monotonic() - pooled.last_checked > self.health_check_interval:
+                if not await pooled.ping(timeout=min(self.health_check_interval, 10.0)):
+                    await pooled.aclose()
+                    continue
+            return pooled
+        pooled = PooledSession(server.server_name, server.connection, self._session_factory)
+        logger.info(f"Starting MCP server '{server.server_name}' for the session pool")
+        await pooled.open(self.start_timeout)
+        return pooled
+
+    @asynccontextmanager
+    async def session(self, server_name: str, connection: dict) -> AsyncIterator[PooledSession]:
+        """
+        Lease a warm session of an MCP server.
+
+        Args:
+            server_name: Name of the MCP server
+            connection: Connection config of the server (transport, command, args, url, env)
+
+        Yields:
+            The leased session, with ``session`` and ``tools`` ready to use
+        """
+        if self._closed:
+            raise RuntimeError("MCP session pool is closed")
+        self._bind_loop()
+        if self._reaper is None:
+            await self.start()
+        key = _server_key(server_name, connection)
+        server = self._servers.get(key)
+        if server is None:
+            server = _ServerPool(server_name, connection, self.max_sessions_per_server)
+            self._servers[key] = server
+
+        try:
+            await asyncio.wait_for(server.semaphore.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Timed out after {self.acquire_timeout}s waiting for an MCP session of '{server_name}'"
+            )
+        server.in_use += 1
+        pooled = None
+        cancelled = False
+        try:
+            pooled = await self._checkout(server)
+            yield pooled
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            server.in_use -= 1
+            server.semaphore.release()
+            if pooled is not None:
+                pooled.last_used = time.monotonic()
+                if cancelled:
+                    # a cancelled tool call may still be answered, the session is not reused
+                    # and is closed in the background, so the cancellation is not held up
+                    self._close_in_background(pooled)
+                elif pooled.alive and not self._closed:
+                    server.idle.append(pooled)
+                else:
+                    await pooled.aclose()
+
+    def _close_in_background(self, pooled: PooledSession) -> None:
+        task = asyncio.create_task(pooled.aclose())
+        self._closing_sessions.add(task)
+        task.add_done_callback(self._closing_sessions.discard)
+
+    @asynccontextmanager
+    async def tools(self, connections: dict[str, dict]) -> AsyncIterator[list[BaseTool]]:
+        """Lease one session per server and yield all their tools as a single list."""
+        async with AsyncExitStack() as stack:
+            loaded_tools: list[BaseTool] = []
+            for server_name, connection in connections.items():
+                pooled = await stack.enter_async_context(self.session(server_name, connection))
+                loaded_tools.extend(pooled.tools)
+            yield loaded_tools
+
+
+_pool: MCPSessionPool | None = None
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """Get the process wide MCP session pool, a new one is created per event loop."""
+    global _pool
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if _pool is None or _pool._closed or (_pool._loop is not None and _pool._loop is not loop):
+        _pool = MCPSessionPool()
+    return _pool
+
+
+async def close_mcp_session_pool() -> None:
+    """Close the process wide MCP session pool if it was created."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
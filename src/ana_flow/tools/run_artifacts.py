@@ -0,0 +1,47 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from typing import Annotated, Optional
+
+import pandas as pd
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+
+from ana_flow.forecasting import ForecastResult
+from .decorators import log_io
+
+
+@tool
+@log_io
+def run_artifacts_tool(
+    config: RunnableConfig,
+    name: Annotated[
+        Optional[str],
+        "The artifact to read, e.g. sales_data_0 or forecast_0. Omit it to list the artifacts.",
+    ] = None,
+):
+    """Read the sales series, forecasts and findings the earlier steps of this research stored. Without a name, list them. Sales series are returned with the path of their Arrow file, which python can read with `pd.read_feather(path)`."""
+    # the graph package imports the tools, its store is imported when the tool runs
+    from ana_flow.graph.artifacts import get_artifact_store
+
+    thread_id = config.get("configurable", {}).get("thread_id", "default")
+    store = get_artifact_store()
+    names = store.names(thread_id)
+    if name is None:
+        if not names:
+            return "No artifacts were stored by the earlier steps."
+        return "Artifacts of the earlier steps: " + ", ".join(names)
+    if name not in names:
+        return f"No artifact '{name}', the earlier steps stored: {', '.join(names) or 'none'}."
+    try:
+        value = store.get(thread_id, name)
+        if isinstance(value, ForecastResult):
+            return value.to_markdown()
+        if isinstance(value, pd.DataFrame):
+            return (
+                f"Artifact '{name}', {len(value)} rows, stored at {store.path(thread_id, name)}:\n\n"
+                f"{value.to_markdown()}"
+            )
+        return str(value)
+    except Exception as e:
+        return f"Error reading artifact '{name}': {e}"
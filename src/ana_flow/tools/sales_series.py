@@ -0,0 +1,36 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from typing import Annotated
+
+from langchain_core.tools import tool
+
+from ana_flow.data.cache import get_sales_cache
+from ana_flow.data.sales import aggregate_sales, match_model_specification
+from .decorators import log_io
+
+
+@tool
+@log_io
+def sales_series_tool(
+    model_specification: Annotated[str, "The car model specification, e.g. 银河E5 440."],
+    freq: Annotated[str, "Period of the series, 'month' or 'week'."] = "month",
+):
+    """Load the sales series of a car model specification from the local sales cache. Return the series as a markdown table plus basic statistics."""
+    try:
+        cache = get_sales_cache()
+        if cache.is_stale():
+            return "The local sales cache is not synced, run `python -m ana_flow.data sync` first."
+        matched = match_model_specification(
+            model_specification, cache.read_model_specifications()
+        )
+        if not matched:
+            return f"No sales data found for model specification '{model_specification}'."
+        df = aggregate_sales(cache.read_weekly_sales(matched), freq)
+        summary = f"Sales series of '{matched}' by {freq}, {len(df)} periods:\n\n"
+        summary += df.to_markdown()
+        summary += "\n\n**Basic Statistics:**\n"
+        summary += df.describe().to_markdown()
+        return summary
+    except Exception as e:
+        return f"Error loading sales series: {e}"
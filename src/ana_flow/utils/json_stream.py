@@ -0,0 +1,132 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+from typing import Any, Sequence
+
+import json_repair
+
+from ana_flow.utils.daily_logger import DailyLogger
+logger = DailyLogger(save_name="ana_flow")
+
+
+class _Frame:
+    __slots__ = ("is_object", "key", "index", "expect_key")
+
+    def __init__(self, is_object: bool):
+        self.is_object = is_object
+        self.key: str | None = None
+        self.index = 0
+        self.expect_key = is_object
+
+
+class StreamingJSONParser:
+    """
+    Incremental, tolerant parser of a JSON document streamed in chunks.
+
+    Every item of the array at ``items_path`` is returned by ``feed`` as soon as
+    it closes, e.g. each step of ``{"steps": [...]}`` with ``items_path=("steps",)``.
+    Text before the document, like a code fence, is skipped. Each character is
+    scanned once, the chunks are only joined by ``text``.
+    """
+
+    def __init__(self, items_path: Sequence[str | int] = ()):
+        self.items_path = tuple(items_path)
+        self._chunks: list[str] = []
+        self._stack: list[_Frame] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        # characters of the object key being read
+        self._key_chars: list[str] | None = None
+        # chunks of the item being read, from its opening bracket
+        self._item_chunks: list[str] | None = None
+        self._item_depth = 0
+
+    def _path(self) -> tuple:
+        return tuple(frame.key if frame.is_object else frame.index for frame in self._stack)
+
+    def _at_items(self) -> bool:
+        """Whether the next value is an item of the array at items_path."""
+        return (
+            len(self._stack) == len(self.items_path) + 1
+            and not self._stack[-1].is_object
+            and self._path()[:-1] == self.items_path
+        )
+
+    def _parse_item(self, text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return json_repair.loads(text)
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume a chunk, returns the items that closed in it."""
+        if not chunk:
+            return []
+        self._chunks.append(chunk)
+        items = []
+        # the part of the chunk that belongs to the current item starts here
+        item_from = 0
+        for position, char in enumerate(chunk):
+            if self._done:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_chars is not None:
+                        self._stack[-1].key = "".join(self._key_chars)
+                        self._key_chars = None
+                    continue
+                if self._key_chars is not None:
+                    self._key_chars.append(char)
+                continue
+            if not self._started:
+                if char not in "{[":
+                    continue
+                self._started = True
+            if char == '"':
+                self._in_string = True
+                frame = self._stack[-1] if self._stack else None
+                if frame is not None and frame.is_object and frame.expect_key:
+                    self._key_chars = []
+                    frame.expect_key = False
+            elif char in "{[":
+                if self._item_chunks is None and self._at_items():
+                    self._item_chunks = []
+                    self._item_depth = len(self._stack)
+                    item_from = position
+                self._stack.append(_Frame(char == "{"))
+            elif char in "}]":
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if self._item_chunks is not None and len(self._stack) == self._item_depth:
+                    self._item_chunks.append(chunk[item_from : position + 1])
+                    text = "".join(self._item_chunks)
+                    self._item_chunks = None
+                    try:
+                        items.append(self._parse_item(text))
+                    except Exception as e:
+                        logger.warning(f"Skipping a streamed item that is not JSON: {e}")
+                if not self._stack:
+                    self._done = True
+            elif char == ",":
+                if self._stack:
+                    frame = self._stack[-1]
+                    if frame.is_object:
+                        frame.expect_key = True
+                    else:
+                        frame.index += 1
+        if self._item_chunks is not None:
+            self._item_chunks.append(chunk[item_from:])
+        return items
+
+    def text(self) -> str:
+        """The whole text fed so far."""
+        return "".join(self._chunks)
@@ -1,5 +1,9 @@
 import asyncio
-from ana_flow.graph import build_graph
+from ana_flow.graph import build_graph, get_artifact_store, get_speculative_tasks
+from ana_flow.tools import close_mcp_session_pool
+from ana_flow.data import close_sales_repository
+from ana_flow.forecasting import close_forecast_executor
+from ana_flow.llms.http import close_http_clients
 from langchain.globals import set_debug
 import os
 
@@ -62,25 +66,34 @@ async def run_agent_workflow_async(
         "recursion_limit": 100,
     }
     last_message_cnt = 0
-    async for s in graph.astream(
-        input=initial_state, config=config, stream_mode="values"
-    ):
-        try:
-            if isinstance(s, dict) and "messages" in s:
-                if len(s["messages"]) <= last_message_cnt:
-                    continue
-                last_message_cnt = len(s["messages"])
-                message = s["messages"][-1]
-                if isinstance(message, tuple):
-                    print(message)
+    try:
+        async for s in graph.astream(
+            input=initial_state, config=config, stream_mode="values"
+        ):
+            try:
+                if isinstance(s, dict) and "messages" in s:
+                    if len(s["messages"]) <= last_message_cnt:
+                        continue
+                    last_message_cnt = len(s["messages"])
+                    message = s["messages"][-1]
+                    if isinstance(message, tuple):
+                        print(message)
+                    else:
+                        message.pretty_print()
                 else:
-                    message.pretty_print()
-            else:
-                # For any other output format
-                print(f"Output: {s}")
-        except Exception as e:
-            logger.error(f"Error processing stream output: {e}")
-            print(f"Error processing output: {str(e)}")
+                    # For any other output format
+                    print(f"Output: {s}")
+            except Exception as e:
+                logger.error(f"Error processing stream output: {e}")
+                print(f"Error processing output: {str(e)}")
+    finally:
+        # shut down the MCP servers, database connections and workers opened during this run
+        await close_mcp_session_pool()
+        await close_sales_repository()
+        await close_http_clients()
+        close_forecast_executor()
+        get_artifact_store().release(config["configurable"]["thread_id"])
+        get_speculative_tasks().discard(config["configurable"]["thread_id"])
 
     logger.info("Async workflow completed successfully")
 
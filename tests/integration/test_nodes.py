@@ -1,12 +1,13 @@
+import asyncio
 import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 # 在这里 mock 掉 get_llm_by_type，避免 ValueError
-with patch("src.llms.llm.get_llm_by_type", return_value=MagicMock()):
+with patch("ana_flow.llms.llm.get_llm_by_type", return_value=MagicMock()):
     from langgraph.types import Command
-    from src.graph.nodes import background_investigation_node
-    from src.config import SearchEngine
+    from ana_flow.graph.nodes import background_investigation_node
+    from ana_flow.config import SearchEngine
     from langchain_core.messages import HumanMessage
 
 # Mock data
@@ -40,7 +41,7 @@ def mock_config():
 @pytest.fixture
 def patch_config_from_runnable_config(mock_configurable):
     with patch(
-        "src.graph.nodes.Configuration.from_runnable_config",
+        "ana_flow.graph.nodes.Configuration.from_runnable_config",
         return_value=mock_configurable,
     ):
         yield
@@ -48,9 +49,10 @@ def patch_config_from_runnable_config(mock_configurable):
 
 @pytest.fixture
 def mock_tavily_search():
-    with patch("src.graph.nodes.LoggedTavilySearch") as mock:
+    with patch("ana_flow.graph.nodes.LoggedTavilySearch") as mock:
         instance = mock.return_value
-        instance.invoke.return_value = [
+        instance.ainvoke = AsyncMock()
+        instance.ainvoke.return_value = [
             {"title": "Test Title 1", "content": "Test Content 1"},
             {"title": "Test Title 2", "content": "Test Content 2"},
         ]
@@ -59,9 +61,10 @@ def mock_tavily_search():
 
 @pytest.fixture
 def mock_web_search_tool():
-    with patch("src.graph.nodes.get_web_search_tool") as mock:
+    with patch("ana_flow.graph.nodes.get_web_search_tool") as mock:
         instance = mock.return_value
-        instance.invoke.return_value = [
+        instance.ainvoke = AsyncMock()
+        instance.ainvoke.return_value = [
             {"title": "Test Title 1", "content": "Test Content 1"},
             {"title": "Test Title 2", "content": "Test Content 2"},
         ]
@@ -78,8 +81,8 @@ def test_background_investigation_node_tavily(
     mock_config,
 ):
     """Test background_investigation_node with Tavily search engine"""
-    with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", search_engine):
-        result = background_investigation_node(mock_state, mock_config)
+    with patch("ana_flow.graph.nodes.SELECTED_SEARCH_ENGINE", search_engine):
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
 
         # Verify the result structure
         assert isinstance(result, Command)
@@ -94,14 +97,14 @@ def test_background_investigation_node_tavily(
         assert isinstance(results, list)
 
         if search_engine == SearchEngine.TAVILY:
-            mock_tavily_search.return_value.invoke.assert_called_once_with(
+            mock_tavily_search.return_value.ainvoke.assert_called_once_with(
                 {"query": "test query"}
             )
             assert len(results) == 2
             assert results[0]["title"] == "Test Title 1"
             assert results[0]["content"] == "Test Content 1"
         else:
-            mock_web_search_tool.return_value.invoke.assert_called_once_with(
+            mock_web_search_tool.return_value.ainvoke.assert_called_once_with(
                 "test query"
             )
             assert len(results) == 2
@@ -111,11 +114,11 @@ def test_background_investigation_node_malformed_response(
     mock_state, mock_tavily_search, patch_config_from_runnable_config, mock_config
 ):
     """Test background_investigation_node with malformed Tavily response"""
-    with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY):
+    with patch("ana_flow.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY):
         # Mock a malformed response
-        mock_tavily_search.return_value.invoke.return_value = "invalid response"
+        mock_tavily_search.return_value.ainvoke.return_value = "invalid response"
 
-        result = background_investigation_node(mock_state, mock_config)
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
 
         # Verify the result structure
         assert isinstance(result, Command)
@@ -0,0 +1,119 @@
+import asyncio
+import importlib
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ana_flow.server.admission import AdmissionController, AdmissionRejected, QueueTimeout
+
+# the package exports the FastAPI app under the name of its module
+server = importlib.import_module("ana_flow.server.app")
+
+
+async def _positions(controller, ticket):
+    return [position async for position in controller.wait(ticket)]
+
+
+def test_runs_are_admitted_in_order_within_the_limits():
+    async def main():
+        controller = AdmissionController(max_runs=2, max_runs_per_client=2, max_queue=4)
+        first, second = controller.reserve("a"), controller.reserve("a")
+        third, fourth = controller.reserve("a"), controller.reserve("b")
+        assert (first.admitted, second.admitted) == (True, True)
+        assert (controller.position(third), controller.position(fourth)) == (1, 2)
+
+        waiting = asyncio.ensure_future(_positions(controller, fourth))
+        await asyncio.sleep(0)
+        controller.release(first)
+        # b is not held up by the run of a waiting ahead of it
+        assert third.admitted and not fourth.admitted
+        await asyncio.sleep(0)
+        controller.release(second)
+        assert await asyncio.wait_for(waiting, 1) == [2, 1]
+        assert fourth.admitted
+        assert controller.stats()["running"] == 2
+
+    asyncio.run(main())
+
+
+def test_client_limit_leaves_room_for_other_clients():
+    async def main():
+        controller = AdmissionController(max_runs=3, max_runs_per_client=1, max_queue=4)
+        busy = controller.reserve("a")
+        waiting = controller.reserve("a")
+        other = controller.reserve("b")
+        assert busy.admitted and not waiting.admitted and other.admitted
+        with pytest.raises(AdmissionRejected):
+            controller.reserve("a")
+        controller.release(busy)
+        assert waiting.admitted
+
+    asyncio.run(main())
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def main():
+        controller = AdmissionController(max_runs=1, max_runs_per_client=5, max_queue=1)
+        controller.reserve("a")
+        controller.reserve("b")
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.reserve("c")
+        assert rejected.value.retry_after >= 1
+        assert controller.stats()["rejected"] == 1
+
+    asyncio.run(main())
+
+
+def test_run_gives_up_after_the_queue_timeout():
+    async def main():
+        controller = AdmissionController(max_runs=1, max_runs_per_client=5, queue_timeout=0.05)
+        controller.reserve("a")
+        ticket = controller.reserve("b")
+        with pytest.raises(QueueTimeout):
+            await _positions(controller, ticket)
+        assert controller.stats()["queued"] == 0
+
+    asyncio.run(main())
+
+
+def test_chat_stream_reports_queue_and_rejects_with_429():
+    controller = AdmissionController(max_runs=1, max_runs_per_client=1, max_queue=1)
+    controller.reserve("busy")
+    controller.reserve("other")
+
+    async def workflow(messages, thread_id, *args):
+        yield "message_chunk", {"thread_id": thread_id, "content": "E5"}
+
+    with patch.object(server, "get_admission_controller", return_value=controller), patch.object(
+        server, "get_run_cache", return_value=None
+    ), patch.object(server, "_astream_workflow_generator", workflow):
+        response = TestClient(server.app).post(
+            "/api/chat/stream",
+            json={"messages": [{"role": "user", "content": "E5"}], "thread_id": "t"},
+            headers={"X-Client-ID": "analyst"},
+        )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_chat_stream_sends_queued_events_until_admitted():
+    async def main():
+        controller = AdmissionController(max_runs=1, max_runs_per_client=1, max_queue=2)
+        running = controller.reserve("busy")
+
+        async def workflow():
+            yield "message_chunk", {"thread_id": "t", "content": "E5"}
+
+        events = server._admitted_events(controller, "analyst", "t", workflow())
+        received = [await events.__anext__()]
+        controller.release(running)
+        received += [event async for event in events]
+        return controller, received
+
+    controller, events = asyncio.run(main())
+    assert events == [
+        ("queued", {"thread_id": "t", "position": 1}),
+        ("message_chunk", {"thread_id": "t", "content": "E5"}),
+    ]
+    assert controller.stats()["running"] == 0
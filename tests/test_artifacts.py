@@ -0,0 +1,98 @@
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ana_flow.graph.artifacts import ArtifactStore
+from ana_flow.tools import run_artifacts_tool
+
+
+def _series(offset=0, periods=24):
+    return pd.DataFrame(
+        {"quantity": np.arange(periods, dtype="int64") + offset},
+        index=pd.date_range("2023-01-01", periods=periods, freq="MS", name="period"),
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(root=str(tmp_path / "artifacts"), memory_limit_bytes=10**9)
+
+
+def test_runs_are_isolated(store):
+    store.put("thread-a", "sales_data", _series(0))
+    store.put("thread-b", "sales_data", _series(1000))
+    assert store.get("thread-a", "sales_data")["quantity"].iloc[0] == 0
+    assert store.get("thread-b", "sales_data")["quantity"].iloc[0] == 1000
+    with pytest.raises(KeyError):
+        store.get("thread-c", "sales_data")
+
+
+def test_values_are_handed_over_in_memory(store):
+    df = _series()
+    store.put("thread", "sales_data", df)
+    store.put("thread", "forecast", {"model": "arima"})
+    assert store.get("thread", "sales_data") is df
+    assert store.get("thread", "forecast") == {"model": "arima"}
+    assert not any(store.root.glob("**/*.arrow"))
+
+
+def test_least_recently_used_frames_spill_to_arrow(tmp_path):
+    frame_bytes = int(_series().memory_usage(deep=True).sum())
+    store = ArtifactStore(root=str(tmp_path), memory_limit_bytes=int(frame_bytes * 1.5))
+    store.put("thread-a", "sales_data", _series(0))
+    store.put("thread-b", "sales_data", _series(1000))
+
+    assert (tmp_path / "thread-a" / "sales_data.arrow").exists()
+    assert store.stats()["in_memory"] == 1
+    # read back memory mapped, with the period index
+    pd.testing.assert_frame_equal(
+        store.get("thread-a", "sales_data"), _series(0), check_freq=False
+    )
+
+
+def test_path_spills_frames_for_file_based_tools(store):
+    store.put("thread", "sales_data", _series())
+    path = store.path("thread", "sales_data")
+    assert path.suffix == ".arrow" and path.exists()
+    store.put("thread", "forecast", "not a frame")
+    with pytest.raises(TypeError):
+        store.path("thread", "forecast")
+
+
+def test_release_and_ttl_cleanup(tmp_path):
+    store = ArtifactStore(root=str(tmp_path), ttl_seconds=0.05)
+    store.put("done", "sales_data", _series())
+    store.path("done", "sales_data")
+    store.release("done")
+    assert not (tmp_path / "done").exists()
+    assert store.names("done") == []
+
+    store.put("idle", "sales_data", _series())
+    time.sleep(0.1)
+    store.put("active", "sales_data", _series())
+    assert store.prune() == 1
+    assert store.names("idle") == []
+    assert store.names("active") == ["sales_data"]
+    assert store.stats() == {
+        "runs": 1,
+        "in_memory": 1,
+        "memory_bytes": int(_series().memory_usage(deep=True).sum()),
+    }
+
+
+def test_later_steps_read_the_artifacts_of_their_thread(store):
+    store.put("thread", "sales_data_0", _series())
+    store.put("thread", "finding_1", "Sales rose 12%")
+    config = {"configurable": {"thread_id": "thread"}}
+    with patch("ana_flow.graph.artifacts.get_artifact_store", return_value=store):
+        assert run_artifacts_tool.invoke({}, config) == "Artifacts of the earlier steps: sales_data_0, finding_1"
+        series = run_artifacts_tool.invoke({"name": "sales_data_0"}, config)
+        assert "24 rows" in series
+        path = series.split("stored at ")[1].split(":\n")[0]
+        assert pd.read_feather(path)["quantity"].tolist() == list(range(24))
+        assert run_artifacts_tool.invoke({"name": "finding_1"}, config) == "Sales rose 12%"
+        assert "No artifact 'forecast_0'" in run_artifacts_tool.invoke({"name": "forecast_0"}, config)
+        assert run_artifacts_tool.invoke({}, {"configurable": {"thread_id": "other"}}).startswith("No artifacts")
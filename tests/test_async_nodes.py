@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+
+from ana_flow.graph.builder import build_graph_with_memory
+from ana_flow.prompts.planner_model import Plan
+
+LLM_LATENCY = 0.2
+CONCURRENT_STREAMS = 8
+
+
+class FakeLLM:
+    """Answers every agent of a run that goes coordinator -> planner -> reporter, after LLM_LATENCY."""
+
+    def __init__(self, kind="chat"):
+        self.kind = kind
+
+    def bind_tools(self, tools):
+        return FakeLLM("coordinator")
+
+    def bind(self, **kwargs):
+        return FakeLLM("planner")
+
+    def with_config(self, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(LLM_LATENCY)
+        if self.kind == "coordinator":
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "handoff_to_planner",
+                        "args": {"task_title": "销量预测", "locale": "zh-CN"},
+                        "id": "call_1",
+                    }
+                ],
+            )
+        if self.kind == "planner":
+            plan = Plan(
+                locale="zh-CN",
+                has_enough_context=True,
+                thought="",
+                title="销量预测",
+                steps=[],
+            )
+            return AIMessage(content=plan.model_dump_json())
+        return AIMessage(content="report")
+
+
+async def _run(graph, thread_id):
+    started = time.perf_counter()
+    async for _ in graph.astream(
+        {"messages": [{"role": "user", "content": "预测银河E5 9月销量"}]},
+        config={"thread_id": thread_id},
+        stream_mode=["messages", "updates"],
+        subgraphs=True,
+    ):
+        pass
+    state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    assert state.values["final_report"] == "report"
+    return time.perf_counter() - started
+
+
+def test_concurrent_streams_do_not_block_each_other():
+    graph = build_graph_with_memory()
+
+    async def main():
+        single = await _run(graph, "warmup")
+        latencies = await asyncio.gather(
+            *(_run(graph, f"thread-{i}") for i in range(CONCURRENT_STREAMS))
+        )
+        return single, latencies
+
+    # the coordinator llm is called, not skipped by the fast path router
+    with patch("ana_flow.graph.nodes.get_llm_by_type", return_value=FakeLLM()), patch.dict(
+        os.environ, {"ROUTER_FAST_PATH": "false"}
+    ):
+        single, latencies = asyncio.run(main())
+
+    # blocking llm calls would serialize the streams, each waiting for all the others
+    assert max(latencies) < max(2 * single, 3 * LLM_LATENCY + 0.5)
+    assert max(latencies) < CONCURRENT_STREAMS * 3 * LLM_LATENCY / 2
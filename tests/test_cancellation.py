@@ -0,0 +1,275 @@
+import asyncio
+import importlib
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pandas as pd
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from ana_flow.forecasting import forecast_batch
+from ana_flow.graph import get_artifact_store
+from ana_flow.graph.nodes import _execute_agent_step, loader_node, reporter_node
+from ana_flow.prompts.planner_model import Plan, Step, StepType
+from ana_flow.server.admission import AdmissionController
+
+# the package exports the FastAPI app under the name of its module
+server = importlib.import_module("ana_flow.server.app")
+
+
+class FakeRequest:
+    def __init__(self):
+        self.connected = True
+
+    async def is_disconnected(self):
+        return not self.connected
+
+
+def test_run_is_cancelled_once_the_client_disconnects(monkeypatch):
+    monkeypatch.setenv("CHAT_DISCONNECT_POLL_INTERVAL", "0.05")
+    cancelled = asyncio.Event()
+
+    async def run_events():
+        yield "event: message_chunk\n"
+        try:
+            # an LLM call in flight
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def main():
+        admission = AdmissionController(max_runs=1)
+        request = FakeRequest()
+        events = server._until_disconnected(
+            request, server._admitted_events(admission, "a", "t", run_events())
+        )
+        assert await events.__anext__() == "event: message_chunk\n"
+        request.connected = False
+        started = time.monotonic()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert time.monotonic() - started < 1
+        # the place of the abandoned run is given back
+        assert admission.stats()["running"] == 0
+        await events.aclose()
+
+    asyncio.run(main())
+
+
+def test_a_stream_cancelled_before_it_starts_holds_no_place():
+    async def run_events():
+        yield "event: message_chunk\n"
+
+    async def main():
+        admission = AdmissionController(max_runs=1)
+        with patch.object(server, "get_admission_controller", return_value=admission), patch.object(
+            server, "get_run_cache", return_value=None
+        ), patch.object(server, "_astream_workflow_generator", lambda *args: run_events()):
+            request = server.ChatRequest(messages=[{"role": "user", "content": "E5"}], thread_id="t")
+            _, events = await server._chat_events(request, SimpleNamespace(headers={}, client=None))
+        first = asyncio.ensure_future(events.__anext__())
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        assert admission.stats()["running"] == admission.stats()["queued"] == 0
+
+    asyncio.run(main())
+
+
+def test_events_and_errors_reach_a_connected_client():
+    async def run_events():
+        yield "event: message_chunk\n"
+        raise RuntimeError("graph failed")
+
+    async def main():
+        events = server._until_disconnected(FakeRequest(), run_events())
+        received = []
+        try:
+            async for event in events:
+                received.append(event)
+        except RuntimeError as e:
+            return received, str(e)
+
+    assert asyncio.run(main()) == (["event: message_chunk\n"], "graph failed")
+
+
+class SlowAgent:
+    """Finds something, then never finishes its step."""
+
+    async def astream(self, input, config, stream_mode):
+        yield {"messages": input["messages"]}
+        yield {
+            "messages": input["messages"]
+            + [
+                AIMessage(content="", tool_calls=[{"name": "search", "args": {}, "id": "1"}]),
+                ToolMessage(content="Galaxy E5 sales rose 12% in August", tool_call_id="1"),
+            ]
+        }
+        await asyncio.sleep(60)
+
+
+def test_agent_step_returns_its_findings_at_the_deadline(monkeypatch):
+    monkeypatch.setenv("NODE_DEADLINE_RESEARCHER", "0.05")
+    agent_input = {"messages": [HumanMessage(content="Collect the Galaxy E5 news")]}
+    result = asyncio.run(_execute_agent_step(agent_input, SlowAgent(), "researcher"))
+    # a result that starts like a failure is not memoized
+    assert result.startswith("The researcher failed to execute this step: no answer within 0.05s.")
+    assert "Galaxy E5 sales rose 12% in August" in result
+
+
+def _state(step_type=StepType.PROCESSING):
+    plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="Forecast the sales",
+        title="Galaxy E5 sales forecast",
+        steps=[
+            Step(
+                need_web_search=False,
+                title="Load the Galaxy E5 sales",
+                description="Load and forecast the monthly sales.",
+                step_type=step_type,
+            )
+        ],
+    )
+    return {"current_plan": plan, "locale": "en-US", "current_step_index": 0, "observations": []}
+
+
+class SlowReporterLLM:
+    def with_config(self, callbacks):
+        self.callbacks = callbacks
+        return self
+
+    async def ainvoke(self, messages, **kwargs):
+        for token in ["# Galaxy E5", "\n\nSales rose"]:
+            for callback in self.callbacks:
+                await callback.on_llm_new_token(token)
+        await asyncio.sleep(60)
+
+
+def test_report_is_cut_short_at_the_deadline(monkeypatch):
+    monkeypatch.setenv("NODE_DEADLINE_REPORTER", "0.05")
+    with patch("ana_flow.graph.nodes.get_llm_by_type", return_value=SlowReporterLLM()):
+        update = asyncio.run(reporter_node(_state(), {}))
+    assert update["final_report"].startswith("# Galaxy E5\n\nSales rose")
+    assert "cut short" in update["final_report"]
+
+
+def test_loader_keeps_the_series_when_the_forecast_runs_late(monkeypatch):
+    monkeypatch.setenv("NODE_DEADLINE_LOADER", "0.5")
+    series = pd.DataFrame(
+        {"sales": [100, 120, 130]}, index=pd.date_range("2026-06-01", periods=3, freq="MS")
+    )
+
+    async def model_spec_index():
+        return SimpleNamespace(resolve_named=lambda text: ["Galaxy E5"])
+
+    async def load_sales_series(model_specification):
+        return series
+
+    def slow_forecast(*args, **kwargs):
+        time.sleep(1.5)
+
+    sales_source = SimpleNamespace(
+        model_spec_index=model_spec_index, load_sales_series=load_sales_series
+    )
+    with patch("ana_flow.graph.nodes._sales_source", return_value=sales_source), patch(
+        "ana_flow.graph.nodes.forecast_series", slow_forecast
+    ):
+        command = asyncio.run(
+            loader_node(_state(StepType.LOADING), {"configurable": {"thread_id": "loader-deadline"}})
+        )
+    result = command.update["step_results"][0]
+    assert result.startswith("Failed to forecast the sales data of 'Galaxy E5' within 0.5s")
+    assert "130" in result
+
+
+def test_loader_reports_a_failed_load_as_the_step_result():
+    async def model_spec_index():
+        return SimpleNamespace(resolve_named=lambda text: ["Galaxy E5"])
+
+    async def load_sales_series(model_specification):
+        raise OSError("connection refused")
+
+    sales_source = SimpleNamespace(
+        model_spec_index=model_spec_index, load_sales_series=load_sales_series
+    )
+    with patch("ana_flow.graph.nodes._sales_source", return_value=sales_source):
+        command = asyncio.run(
+            loader_node(_state(StepType.LOADING), {"configurable": {"thread_id": "loader-error"}})
+        )
+    assert command.goto == "research_team"
+    assert command.update["step_results"][0] == (
+        "Failed to load the sales data of the task: connection refused"
+    )
+
+
+def test_loader_forecasts_the_months_the_task_asks_about():
+    series = pd.DataFrame(
+        {"quantity": [100.0] * 12}, index=pd.date_range("2025-01-01", periods=12, freq="MS")
+    )
+    state = _state(StepType.LOADING)
+    state["current_plan"].steps[0].description = "Forecast the sales from 2026年2月 to 2026年4月."
+
+    async def model_spec_index():
+        return SimpleNamespace(resolve_named=lambda text: ["Galaxy E5"])
+
+    async def load_sales_series(model_specification):
+        return series
+
+    sales_source = SimpleNamespace(
+        model_spec_index=model_spec_index, load_sales_series=load_sales_series
+    )
+    with patch("ana_flow.graph.nodes._sales_source", return_value=sales_source):
+        command = asyncio.run(
+            loader_node(state, {"configurable": {"thread_id": "loader-period"}})
+        )
+    result = command.update["step_results"][0]
+    assert "2026-02-01" in result and "2026-04-01" in result
+    assert "2026-01-01" not in result and "2026-05-01" not in result
+
+
+def test_loader_forecasts_every_model_the_task_names_in_one_batch():
+    series = {
+        "Galaxy E5": pd.DataFrame(
+            {"quantity": [100.0] * 12}, index=pd.date_range("2025-01-01", periods=12, freq="MS")
+        ),
+        "Haval H6": pd.DataFrame(
+            {"quantity": [200.0] * 11}, index=pd.date_range("2025-01-01", periods=11, freq="MS")
+        ),
+    }
+    state = _state(StepType.LOADING)
+    state["current_plan"].steps[0].description = "Compare the sales of both models in 2026年1月."
+
+    async def model_spec_index():
+        return SimpleNamespace(resolve_named=lambda text: list(series))
+
+    async def load_sales_series(model_specification):
+        return series[model_specification]
+
+    batches = []
+
+    def recorded_batch(frames, horizon, **kwargs):
+        batches.append((list(frames), horizon))
+        return forecast_batch(frames, horizon, parallel=False, **kwargs)
+
+    sales_source = SimpleNamespace(
+        model_spec_index=model_spec_index, load_sales_series=load_sales_series
+    )
+    with patch("ana_flow.graph.nodes._sales_source", return_value=sales_source), patch(
+        "ana_flow.graph.nodes.forecast_batch", recorded_batch
+    ):
+        command = asyncio.run(
+            loader_node(state, {"configurable": {"thread_id": "loader-batch"}})
+        )
+    # Haval H6 ends in November, two months before the asked January
+    assert batches == [(["Galaxy E5", "Haval H6"], 2)]
+    result = command.update["step_results"][0]
+    assert "Forecast of Galaxy E5" in result and "Forecast of Haval H6" in result
+    assert "2026-01-01" in result and "2025-12-01" not in result
+    assert sorted(get_artifact_store().names("loader-batch")) == [
+        "forecast_0_0",
+        "forecast_0_1",
+        "sales_data_0_0",
+        "sales_data_0_1",
+    ]
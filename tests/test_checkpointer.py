@@ -0,0 +1,96 @@
+import asyncio
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+import ana_flow.graph.checkpointer as checkpointer_module
+from ana_flow.graph.checkpointer import ThreadRetention, build_checkpointer
+
+
+class CounterState(TypedDict):
+    count: int
+
+
+def _build_counter_graph(checkpointer):
+    builder = StateGraph(CounterState)
+    builder.add_node("increment", lambda state: {"count": state["count"] + 1})
+    builder.add_edge(START, "increment")
+    builder.add_edge("increment", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+async def _run_threads(checkpointer, retention, thread_ids):
+    graph = _build_counter_graph(checkpointer)
+    for thread_id in thread_ids:
+        await retention.touch(thread_id)
+        await graph.ainvoke({"count": 0}, config={"configurable": {"thread_id": thread_id}})
+        await asyncio.sleep(0.01)
+    return graph
+
+
+async def _has_checkpoint(graph, thread_id):
+    state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+    return bool(state.values)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_retention_keeps_most_recent_threads(backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        checkpointer_module, "CHECKPOINTER_SQLITE_PATH", str(tmp_path / "checkpoints.sqlite")
+    )
+
+    async def run():
+        async with build_checkpointer(backend) as checkpointer:
+            retention = ThreadRetention(checkpointer, max_threads=2)
+            graph = await _run_threads(checkpointer, retention, ["a", "b", "c"])
+            assert await retention.prune() == 1
+            assert not await _has_checkpoint(graph, "a")
+            assert await _has_checkpoint(graph, "b")
+            assert await _has_checkpoint(graph, "c")
+
+    asyncio.run(run())
+
+
+def test_retention_expires_idle_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        checkpointer_module, "CHECKPOINTER_SQLITE_PATH", str(tmp_path / "checkpoints.sqlite")
+    )
+
+    async def run():
+        async with build_checkpointer("sqlite") as checkpointer:
+            retention = ThreadRetention(checkpointer, ttl_seconds=0.05)
+            graph = await _run_threads(checkpointer, retention, ["old"])
+            await asyncio.sleep(0.1)
+            await retention.touch("new")
+            assert await retention.prune() == 1
+            assert not await _has_checkpoint(graph, "old")
+
+    asyncio.run(run())
+
+
+def test_sqlite_checkpoints_survive_reopening(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        checkpointer_module, "CHECKPOINTER_SQLITE_PATH", str(tmp_path / "checkpoints.sqlite")
+    )
+
+    async def run():
+        async with build_checkpointer("sqlite") as checkpointer:
+            retention = ThreadRetention(checkpointer)
+            await _run_threads(checkpointer, retention, ["thread"])
+        # a second worker process opens the same database file
+        async with build_checkpointer("sqlite") as checkpointer:
+            graph = _build_counter_graph(checkpointer)
+            state = await graph.aget_state({"configurable": {"thread_id": "thread"}})
+            assert state.values == {"count": 1}
+
+    asyncio.run(run())
+
+
+def test_unknown_backend_is_rejected():
+    async def run():
+        with pytest.raises(ValueError):
+            async with build_checkpointer("redis"):
+                pass
+
+    asyncio.run(run())
@@ -0,0 +1,143 @@
+import asyncio
+import importlib
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessageChunk
+
+from ana_flow.config.report_style import ReportStyle
+from ana_flow.server.coalesce import MessageChunkCoalescer
+from ana_flow.server.run_cache import parse_event
+
+# the package exports the FastAPI app under the name of its module
+server = importlib.import_module("ana_flow.server.app")
+
+
+def _chunk(content, message_id="m1", **kwargs):
+    return {"thread_id": "t", "agent": "reporter", "id": message_id, "role": "assistant", "content": content, **kwargs}
+
+
+def test_chunks_of_a_message_are_merged_until_it_finishes():
+    coalescer = MessageChunkCoalescer(window=60, max_bytes=1024)
+    assert coalescer.add("message_chunk", _chunk("Sales ")) == []
+    assert coalescer.add("message_chunk", _chunk("rose ")) == []
+    assert coalescer.add("message_chunk", _chunk("12%", finish_reason="stop")) == [
+        ("message_chunk", _chunk("Sales rose 12%", finish_reason="stop"))
+    ]
+    assert coalescer.flush() == []
+
+
+def test_other_events_are_not_merged_and_keep_their_order():
+    coalescer = MessageChunkCoalescer(window=60, max_bytes=1024)
+    coalescer.add("message_chunk", _chunk("Looking up "))
+    coalescer.add("message_chunk", _chunk("the news", message_id="m2"))
+    tool_calls = {"thread_id": "t", "id": "m1", "tool_calls": [{"name": "search"}]}
+    assert coalescer.add("tool_calls", tool_calls) == [
+        ("message_chunk", _chunk("Looking up ")),
+        ("message_chunk", _chunk("the news", message_id="m2")),
+        ("tool_calls", tool_calls),
+    ]
+
+
+def test_chunks_are_sent_once_the_byte_or_time_window_is_full():
+    coalescer = MessageChunkCoalescer(window=60, max_bytes=6)
+    assert coalescer.add("message_chunk", _chunk("销量")) == [("message_chunk", _chunk("销量"))]
+
+    coalescer = MessageChunkCoalescer(window=0.05, max_bytes=1024)
+    with patch("ana_flow.server.coalesce.time.monotonic", return_value=100.0):
+        coalescer.add("message_chunk", _chunk("Sales "))
+    with patch("ana_flow.server.coalesce.time.monotonic", return_value=100.1):
+        assert coalescer.add("message_chunk", _chunk("rose")) == [("message_chunk", _chunk("Sales "))]
+    assert coalescer.flush() == [("message_chunk", _chunk("rose"))]
+
+
+class FakeGraph:
+    def astream(self, input_, config, stream_mode, subgraphs):
+        async def stream():
+            for token in ["Sales ", "rose ", "12%"]:
+                yield ("reporter:1",), "messages", (AIMessageChunk(content=token, id="m1"), {})
+            yield ("reporter:1",), "messages", (
+                AIMessageChunk(content="", id="m1", response_metadata={"finish_reason": "stop"}),
+                {},
+            )
+
+        return stream()
+
+
+class QuietGraph:
+    """Streams a few tokens, then stays quiet like a node waiting for a tool."""
+
+    def astream(self, input_, config, stream_mode, subgraphs):
+        async def stream():
+            for token in ["Sales ", "rose"]:
+                yield ("reporter:1",), "messages", (AIMessageChunk(content=token, id="m1"), {})
+            await asyncio.sleep(60)
+
+        return stream()
+
+
+def _events(coalesce_tokens):
+    return server._astream_workflow_generator(
+        [{"role": "user", "content": "Forecast the Galaxy E5"}],
+        "t",
+        [],
+        1,
+        3,
+        3,
+        True,
+        None,
+        {},
+        False,
+        ReportStyle.ACADEMIC,
+        False,
+        coalesce_tokens=coalesce_tokens,
+    )
+
+
+def _run(coalesce_tokens):
+    async def main():
+        return [event async for event in _events(coalesce_tokens)]
+
+    with patch.object(server, "graph", FakeGraph()):
+        return asyncio.run(main())
+
+
+def test_clients_opt_in_to_coalesced_tokens():
+    assert len(_run(coalesce_tokens=False)) == 4
+    assert _run(coalesce_tokens=True) == [
+        (
+            "message_chunk",
+            {
+                "thread_id": "t",
+                "agent": "reporter",
+                "id": "m1",
+                "role": "assistant",
+                "content": "Sales rose 12%",
+                "finish_reason": "stop",
+            },
+        )
+    ]
+
+
+def test_held_chunks_are_sent_when_their_window_closes(monkeypatch):
+    monkeypatch.setenv("SSE_COALESCE_WINDOW", "0.05")
+
+    async def main():
+        events = _events(coalesce_tokens=True)
+        started = time.monotonic()
+        event = await asyncio.wait_for(anext(events), 1)
+        elapsed = time.monotonic() - started
+        # the run is closed while it waits for the next item
+        await events.aclose()
+        return event, elapsed
+
+    with patch.object(server, "graph", QuietGraph()):
+        (event_type, data), elapsed = asyncio.run(main())
+    assert (event_type, data["content"]) == ("message_chunk", "Sales rose")
+    assert elapsed < 0.5
+
+
+def test_events_are_written_as_utf8_json():
+    event = server._make_event("message_chunk", _chunk("销量 rose"))
+    assert "销量" in event
+    assert parse_event(event) == ("message_chunk", _chunk("销量 rose"))
@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage
+
+from ana_flow.graph.compaction import (
+    compact_findings,
+    estimate_tokens,
+    format_findings,
+    steps_to_summarize,
+)
+from ana_flow.graph.nodes import research_team_node, set_model_input
+from ana_flow.config.configuration import Configuration
+from ana_flow.prompts.planner_model import Plan, Step, StepType
+
+
+def _step(title, result=None, summary=None, step_type=StepType.RESEARCH, depends_on=None):
+    return Step(
+        need_web_search=False,
+        title=title,
+        description=title,
+        step_type=step_type,
+        depends_on=depends_on,
+        execution_res=result,
+        summary=summary,
+    )
+
+
+def test_estimate_tokens_counts_cjk_characters():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("银河销量") == 4
+
+
+def test_findings_within_budget_stay_verbatim():
+    steps = [_step("a", "x" * 40), _step("b", "y" * 40)]
+    assert compact_findings(steps, max_tokens=100, keep_recent=1) == ["x" * 40, "y" * 40]
+    assert steps_to_summarize(steps, max_tokens=100, keep_recent=1) == []
+
+
+def test_older_findings_use_summaries_and_recent_ones_stay_verbatim():
+    long = "x" * 4000
+    steps = [_step("a", long, summary="short a"), _step("b", long), _step("c", long)]
+    assert steps_to_summarize(steps, max_tokens=1500, keep_recent=1) == [steps[1]]
+    texts = compact_findings(steps, max_tokens=1500, keep_recent=1)
+    assert texts[0] == "short a"
+    assert texts[2] == long
+    # the unsummarized older finding is truncated into what is left of the budget
+    assert sum(estimate_tokens(text) for text in texts) <= 1500 + 10
+    assert texts[1].endswith("(truncated)")
+
+
+def test_format_findings():
+    assert format_findings([], 100, 1) == ""
+    findings = format_findings([_step("prices", "p")], 100, 1)
+    assert "## Existing Finding 1: prices" in findings
+    assert "<finding>\np\n</finding>" in findings
+
+
+def test_set_model_input_only_includes_dependencies():
+    plan = Plan(
+        locale="zh-CN",
+        has_enough_context=False,
+        thought="",
+        title="plan",
+        steps=[
+            _step("load", "forecast table"),
+            _step("prices", "price finding"),
+            _step("analysis", depends_on=[0]),
+        ],
+    )
+    content = set_model_input(plan, "coder", "zh-CN", 2, Configuration())["messages"][0].content
+    assert "forecast table" in content
+    assert "price finding" not in content
+
+
+def test_research_team_summarizes_each_old_finding_once():
+    long = "销" * 3000
+    plan = Plan(
+        locale="zh-CN",
+        has_enough_context=False,
+        thought="",
+        title="plan",
+        steps=[
+            _step("a", long),
+            _step("b", long),
+            _step("c", long),
+            _step("d"),
+            _step("e", step_type=StepType.PREDICTION),
+        ],
+    )
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=AIMessage(content="summary"))
+    config = {
+        "configurable": {"thread_id": "compaction", "max_findings_tokens": 5000, "recent_findings": 1}
+    }
+
+    async def run():
+        with patch("ana_flow.graph.compaction.get_llm_by_type", return_value=llm):
+            command = await research_team_node(
+                {"current_plan": plan, "observations": [], "step_results": {}}, config
+            )
+            new_plan = command.update["current_plan"]
+            assert [step.summary for step in new_plan.steps[:3]] == ["summary", "summary", None]
+            assert llm.ainvoke.await_count == 2
+
+            command = await research_team_node(
+                {
+                    "current_plan": new_plan,
+                    "observations": [],
+                    "step_results": {3: "d finding"},
+                },
+                config,
+            )
+            # the summaries are cached on the plan, nothing new to summarize
+            assert llm.ainvoke.await_count == 3
+            return command
+
+    command = asyncio.run(run())
+    assert [send.arg["current_step_index"] for send in command.goto] == [4]
@@ -0,0 +1,15 @@
+from ana_flow.config.configuration import Configuration
+
+
+def test_request_flag_wins_over_the_environment(monkeypatch):
+    monkeypatch.setenv("BYPASS_STEP_CACHE", "true")
+    config = {"configurable": {"bypass_step_cache": False}}
+    assert Configuration.from_runnable_config(config).bypass_step_cache is False
+    assert Configuration.from_runnable_config({}).bypass_step_cache is True
+
+
+def test_false_flag_in_the_environment_is_false(monkeypatch):
+    monkeypatch.setenv("BYPASS_STEP_CACHE", "false")
+    assert Configuration.from_runnable_config({}).bypass_step_cache is False
+    config = {"configurable": {"bypass_step_cache": True}}
+    assert Configuration.from_runnable_config(config).bypass_step_cache is True
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ana_flow.forecasting import (
+    ForecastModel,
+    close_forecast_executor,
+    forecast_batch,
+    forecast_series,
+    resolve_forecast_period,
+)
+
+
+@pytest.fixture(scope="module")
+def monthly_sales():
+    months = np.arange(48)
+    quantity = (
+        1000
+        + 10 * months
+        + 200 * np.sin(months * 2 * np.pi / 12)
+        + np.random.default_rng(0).normal(0, 30, 48)
+    )
+    return pd.DataFrame(
+        {"quantity": quantity},
+        index=pd.date_range("2021-01-01", periods=48, freq="MS", name="period"),
+    )
+
+
+def test_seasonal_naive_repeats_last_season(monthly_sales):
+    result = forecast_series(monthly_sales, 14, model="seasonal_naive")
+    expected = monthly_sales["quantity"].to_numpy()[-12:]
+    assert np.allclose(result.forecast["mean"].to_numpy()[:12], expected)
+    assert np.allclose(result.forecast["mean"].to_numpy()[12:], expected[:2])
+    # the second season ahead is less certain
+    widths = result.forecast["upper"] - result.forecast["lower"]
+    assert widths.iloc[12] > widths.iloc[0]
+
+
+@pytest.mark.parametrize("model", [ForecastModel.ARIMA, ForecastModel.ETS])
+def test_statistical_models_forecast_future_months(monthly_sales, model):
+    result = forecast_series(monthly_sales, 6, model=model, name="银河E5 440")
+    forecast = result.forecast
+    assert result.model == model
+    assert forecast.index[0] == pd.Timestamp("2025-01-01")
+    assert len(forecast) == 6
+    assert (forecast["lower"] <= forecast["mean"]).all()
+    assert (forecast["mean"] <= forecast["upper"]).all()
+    # the series trends up by about 10 per month from ~1470 at the end of 2024
+    assert 1200 < forecast["mean"].iloc[0] < 1800
+
+
+def test_auto_model_compares_candidates_on_holdout(monthly_sales):
+    result = forecast_series(monthly_sales, 6, name="银河E5 440")
+    assert result.model in (ForecastModel.ARIMA, ForecastModel.ETS)
+    assert set(result.backtest_mae) >= {"arima", "seasonal_naive"}
+    markdown = result.to_markdown()
+    assert "Forecast of 银河E5 440" in markdown
+    assert "2025-01-01" in markdown
+
+
+def test_short_series_fall_back_to_seasonal_naive():
+    result = forecast_series(pd.Series([5.0, 6.0, 7.0]), 3, model="arima")
+    assert result.model == ForecastModel.SEASONAL_NAIVE
+    assert result.forecast["mean"].tolist() == [7.0, 7.0, 7.0]
+
+
+def test_forecast_periods_follow_the_given_frequency():
+    # a series whose index lost its freq, e.g. after a month was dropped
+    index = pd.DatetimeIndex(["2025-01-01", "2025-02-01", "2025-04-01", "2025-05-01"])
+    series = pd.Series([5.0, 6.0, 7.0, 8.0], index=index)
+    result = forecast_series(series, 2, freq="MS")
+    assert result.forecast.index.tolist() == [
+        pd.Timestamp("2025-06-01"),
+        pd.Timestamp("2025-07-01"),
+    ]
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        forecast_series(pd.Series([], dtype=float), 3)
+    with pytest.raises(ValueError):
+        forecast_series(pd.Series([1.0, 2.0]), 0)
+
+
+def test_batch_in_process_pool(monthly_sales):
+    series = {"a": monthly_sales, "b": monthly_sales * 2}
+    try:
+        results = forecast_batch(series, 3, model="seasonal_naive")
+    finally:
+        close_forecast_executor()
+    assert set(results) == {"a", "b"}
+    assert np.allclose(
+        results["b"].forecast["mean"].to_numpy(), 2 * results["a"].forecast["mean"].to_numpy()
+    )
+    serial = forecast_batch(series, 3, model="seasonal_naive", parallel=False)
+    assert serial["a"].forecast.equals(results["a"].forecast)
+
+
+@pytest.mark.parametrize(
+    "text, period",
+    [
+        ("我想预测长城高山 140从2025年9月到12月的销量", ("2025-09", "2025-12")),
+        ("请预测银河E5 500 9月份的销售量", ("2025-09", "2025-09")),
+        ("预测银河E5 11月到2月的销量", ("2025-11", "2026-02")),
+        ("预测银河E5 3-5月的销量", ("2026-03", "2026-05")),
+        ("Forecast the Galaxy E5 for 2025-10", ("2025-10", "2025-10")),
+    ],
+)
+def test_forecast_period_is_read_from_the_task(text, period):
+    # the loaded data ends in August 2025
+    start, end = resolve_forecast_period(text, pd.Timestamp("2025-08-01"))
+    assert (f"{start:%Y-%m}", f"{end:%Y-%m}") == period
+
+
+def test_task_without_months_has_no_forecast_period():
+    assert resolve_forecast_period("预测银河E5 440的销量", pd.Timestamp("2025-08-01")) is None
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+
+from ana_flow.graph.nodes import human_edit_node, human_feedback_node
+from ana_flow.graph.types import State
+
+
+def _plan(title):
+    return {
+        "locale": "zh-CN",
+        "has_enough_context": False,
+        "thought": "",
+        "title": title,
+        "steps": [
+            {
+                "need_web_search": False,
+                "title": "加载数据",
+                "description": "load the sales",
+                "step_type": "loading",
+            }
+        ],
+    }
+
+
+def _review_graph():
+    builder = StateGraph(State)
+    builder.add_node("human_feedback", human_feedback_node)
+    builder.add_node("human_edit", human_edit_node)
+    builder.add_node("planner", lambda state: {})
+    builder.add_node("reporter", lambda state: {})
+    builder.add_node("research_team", lambda state: {})
+    builder.add_conditional_edges(
+        START, lambda state: "human_edit" if state.get("observations") else "human_feedback"
+    )
+    for node in ("planner", "reporter", "research_team"):
+        builder.add_edge(node, END)
+    return builder.compile(checkpointer=MemorySaver())
+
+
+async def _interrupt(graph, thread_id, state):
+    config = {"configurable": {"thread_id": thread_id}}
+    async for event in graph.astream(state, config, stream_mode="updates"):
+        if "__interrupt__" in event:
+            return event["__interrupt__"][0].value
+    raise AssertionError("the run was not interrupted")
+
+
+async def _resume(graph, thread_id, review):
+    config = {"configurable": {"thread_id": thread_id}}
+    await graph.ainvoke(Command(resume=review), config)
+    return (await graph.aget_state(config)).values
+
+
+def test_concurrent_plan_reviews_are_isolated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    graph = _review_graph()
+
+    async def main():
+        reviews = await asyncio.gather(
+            *(
+                _interrupt(graph, title, {"current_plan": json.dumps(_plan(title))})
+                for title in ("E5", "E8")
+            )
+        )
+        edited = {**reviews[1]["payload"], "title": "E8 edited"}
+        accepted, edited_values = await asyncio.gather(
+            _resume(graph, "E5", {"action": "accepted"}),
+            _resume(graph, "E8", {"action": "edit_plan", "payload": edited}),
+        )
+        return reviews, accepted, edited_values
+
+    reviews, accepted, edited = asyncio.run(main())
+    assert [review["type"] for review in reviews] == ["plan_review", "plan_review"]
+    assert [review["payload"]["title"] for review in reviews] == ["E5", "E8"]
+    assert accepted["current_plan"].title == "E5"
+    assert edited["current_plan"].title == "E8 edited"
+    assert accepted["plan_iterations"] == edited["plan_iterations"] == 1
+    # the review does not touch the filesystem
+    assert os.listdir(tmp_path) == []
+
+
+def test_plan_feedback_goes_back_to_the_planner():
+    graph = _review_graph()
+
+    async def main():
+        await _interrupt(graph, "feedback", {"current_plan": json.dumps(_plan("E5"))})
+        return await _resume(graph, "feedback", "[edit_plan] add a pricing step")
+
+    values = asyncio.run(main())
+    assert values["messages"][-1].content == "add a pricing step"
+    assert values["messages"][-1].name == "feedback"
+    assert values["current_plan"] == json.dumps(_plan("E5"))
+
+
+def test_auto_accepted_plan_is_not_reviewed():
+    graph = _review_graph()
+    state = {"current_plan": json.dumps(_plan("E5")), "auto_accepted_plan": True}
+    values = asyncio.run(graph.ainvoke(state, {"configurable": {"thread_id": "auto"}}))
+    assert values["current_plan"].title == "E5"
+
+
+def test_observations_are_edited_in_the_review():
+    graph = _review_graph()
+
+    async def main():
+        review = await _interrupt(graph, "edit", {"observations": ["sales up", "price cut"]})
+        values = await _resume(graph, "edit", {"action": "edit", "payload": ["sales up 5%"]})
+        return review, values
+
+    review, values = asyncio.run(main())
+    assert review == {
+        "type": "observations_review",
+        "message": "Please review the observations.",
+        "payload": ["sales up", "price cut"],
+    }
+    assert values["observations"] == ["sales up 5%"]
@@ -0,0 +1,112 @@
+import asyncio
+import importlib
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from ana_flow.server.admission import AdmissionController
+from ana_flow.server.jobs import JobManager, JobStatus
+from ana_flow.server.run_cache import parse_event
+
+# the package exports the FastAPI app under the name of its module
+server = importlib.import_module("ana_flow.server.app")
+
+
+def _event(index):
+    return server._make_event("message_chunk", {"thread_id": "t", "content": str(index)})
+
+
+async def _events(count, delay=0.0):
+    for index in range(count):
+        await asyncio.sleep(delay)
+        yield _event(index)
+
+
+def _contents(stream_text):
+    events = [event for event in stream_text.split("\n\n") if event]
+    return [parse_event(event.split("\n", 1)[1])[1]["content"] for event in events]
+
+
+def test_job_runs_on_after_the_client_leaves():
+    async def main():
+        manager = JobManager(buffer_size=10)
+        job = manager.start("t", _events(5, delay=0.01))
+        async for _ in job.stream():
+            break
+        await job.task
+        return job, [event async for event in job.stream(last_event_id=3)]
+
+    job, resumed = asyncio.run(main())
+    assert job.status == JobStatus.COMPLETED
+    assert job.last_event_id == 5
+    assert resumed == [f"id: 4\n{_event(3)}", f"id: 5\n{_event(4)}"]
+
+
+def test_ring_buffer_keeps_the_latest_events():
+    async def main():
+        job = JobManager(buffer_size=3).start("t", _events(5))
+        await job.task
+        return [event async for event in job.stream()]
+
+    events = asyncio.run(main())
+    assert [event.split("\n", 1)[0] for event in events] == ["id: 3", "id: 4", "id: 5"]
+
+
+def test_interrupted_and_cancelled_jobs():
+    async def interrupted():
+        yield server._make_event("interrupt", {"thread_id": "t", "content": "plan"})
+
+    async def main():
+        manager = JobManager()
+        job = manager.start("t", interrupted())
+        await job.task
+        slow = manager.start("t", _events(5, delay=1))
+        await asyncio.sleep(0)
+        assert manager.cancel(slow.id)
+        await asyncio.gather(slow.task, return_exceptions=True)
+        return job, slow
+
+    job, slow = asyncio.run(main())
+    assert job.status == JobStatus.INTERRUPTED
+    assert slow.status == JobStatus.CANCELLED
+
+
+def test_job_api_resumes_with_last_event_id():
+    async def workflow(messages, thread_id, *args):
+        for index in range(3):
+            yield "message_chunk", {"thread_id": thread_id, "content": str(index)}
+
+    graph = SimpleNamespace(
+        aget_state=AsyncMock(return_value=SimpleNamespace(values={"final_report": "report"}))
+    )
+
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = (
+                await client.post(
+                    "/api/research/jobs",
+                    json={"messages": [{"role": "user", "content": "E5"}], "thread_id": "job"},
+                )
+            ).json()
+            await server.get_job_manager().get(created["job_id"]).task
+            events = await client.get(
+                f"/api/research/jobs/{created['job_id']}/events", headers={"Last-Event-ID": "1"}
+            )
+            job = (await client.get(f"/api/research/jobs/{created['job_id']}")).json()
+            missing = await client.get("/api/research/jobs/unknown/events")
+        return created, events, job, missing
+
+    with patch.object(server, "get_job_manager", return_value=JobManager()), patch.object(
+        server, "get_admission_controller", return_value=AdmissionController()
+    ), patch.object(server, "get_run_cache", return_value=None), patch.object(
+        server, "_astream_workflow_generator", workflow
+    ), patch.object(server, "graph", graph):
+        created, events, job, missing = asyncio.run(main())
+
+    assert created["thread_id"] == "job"
+    assert _contents(events.text) == ["1", "2"]
+    assert job["status"] == "completed"
+    assert job["final_report"] == "report"
+    assert missing.status_code == 404
@@ -0,0 +1,152 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+from ana_flow.graph.nodes import planner_node
+from ana_flow.graph.types import State
+from ana_flow.utils.json_stream import StreamingJSONParser
+
+PLAN = {
+    "locale": "zh-CN",
+    "has_enough_context": True,
+    "thought": "先看 {历史} 销量",
+    "title": "银河E5 \"9月\" 销量预测",
+    "steps": [
+        {
+            "need_web_search": False,
+            "title": "加载数据",
+            "description": "load [sales] of {E5}",
+            "step_type": "loading",
+        },
+        {
+            "need_web_search": False,
+            "title": "预测",
+            "description": "forecast with \\\"prophet\\\"",
+            "step_type": "prediction",
+        },
+    ],
+}
+
+
+def _chunks(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 10000])
+def test_steps_are_returned_as_they_close(size):
+    text = "```json\n" + json.dumps(PLAN, ensure_ascii=False, indent=2) + "\n```"
+    parser = StreamingJSONParser(items_path=("steps",))
+    steps = []
+    closed_at = []
+    for chunk in _chunks(text, size):
+        steps.extend(parser.feed(chunk))
+        closed_at.append(len(steps))
+    assert steps == PLAN["steps"]
+    assert parser.text() == text
+    # the first step is returned before the document is complete
+    if size < 100:
+        assert closed_at.index(1) < len(closed_at) - 2
+
+
+def test_items_of_other_arrays_are_ignored():
+    parser = StreamingJSONParser(items_path=("steps",))
+    items = parser.feed('{"notes": [{"a": 1}], "steps": [{"b": [1, 2]}, {"c": "]"}]}')
+    assert items == [{"b": [1, 2]}, {"c": "]"}]
+
+
+def test_unfinished_item_is_not_returned():
+    parser = StreamingJSONParser(items_path=("steps",))
+    assert parser.feed('{"steps": [{"title": "a"}, {"title": "b') == [{"title": "a"}]
+
+
+def _planner_graph():
+    builder = StateGraph(State)
+    builder.add_node("planner", planner_node)
+    builder.add_node("reporter", lambda state: {})
+    builder.add_node("human_feedback", lambda state: {})
+    builder.add_edge(START, "planner")
+    builder.add_edge("reporter", END)
+    builder.add_edge("human_feedback", END)
+    return builder.compile()
+
+
+def test_planner_streams_plan_steps():
+    content = json.dumps(PLAN, ensure_ascii=False)
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=content)]))
+
+    async def main():
+        events = []
+        async for mode, data in _planner_graph().astream(
+            {"messages": [{"role": "user", "content": "预测银河E5 9月销量"}]},
+            stream_mode=["custom", "messages"],
+        ):
+            events.append((mode, data))
+        return events
+
+    with patch("ana_flow.graph.nodes.get_llm_by_type", return_value=llm):
+        events = asyncio.run(main())
+
+    modes = [mode for mode, _ in events]
+    plan_steps = [data["plan_step"] for mode, data in events if mode == "custom"]
+    assert plan_steps == [{"index": i, "step": step} for i, step in enumerate(PLAN["steps"])]
+    # the first step is sent while the planner is still streaming its tokens
+    assert "messages" in modes[modes.index("custom") + 1 :]
+
+
+def test_planner_sends_steps_of_a_response_that_was_not_streamed():
+    class CachedLLM:
+        def bind(self, **kwargs):
+            return self
+
+        def with_config(self, **kwargs):
+            return self
+
+        async def ainvoke(self, messages, **kwargs):
+            return AIMessage(content=json.dumps(PLAN))
+
+    async def main():
+        return [
+            data
+            async for data in _planner_graph().astream(
+                {"messages": [{"role": "user", "content": "预测银河E5 9月销量"}]},
+                stream_mode="custom",
+            )
+        ]
+
+    with patch("ana_flow.graph.nodes.get_llm_by_type", return_value=CachedLLM()):
+        events = asyncio.run(main())
+    assert [event["plan_step"]["step"] for event in events] == PLAN["steps"]
+
+
+def test_planner_resets_the_streamed_steps_of_a_repaired_plan():
+    rejected = {**PLAN, "steps": PLAN["steps"] + [{**PLAN["steps"][1], "step_type": "forecasting"}]}
+    llm = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content=json.dumps(rejected, ensure_ascii=False)),
+                AIMessage(content=json.dumps(PLAN, ensure_ascii=False)),
+            ]
+        )
+    )
+
+    async def main():
+        return [
+            data
+            async for data in _planner_graph().astream(
+                {"messages": [{"role": "user", "content": "预测银河E5 9月销量"}]},
+                stream_mode="custom",
+            )
+        ]
+
+    with patch("ana_flow.graph.nodes.get_llm_by_type", return_value=llm):
+        events = asyncio.run(main())
+    reset = events.index({"plan_reset": {}})
+    assert [event["plan_step"]["index"] for event in events[:reset]] == [0, 1, 2]
+    assert events[reset + 1 :] == [
+        {"plan_step": {"index": i, "step": step}} for i, step in enumerate(PLAN["steps"])
+    ]
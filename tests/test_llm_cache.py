@@ -0,0 +1,75 @@
+import asyncio
+from unittest.mock import patch
+
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+import ana_flow.llms.llm as llm_module
+from ana_flow.llms.cache import LLMResponseCache, normalize_prompt
+
+
+def _messages(time_of_day="09:30:12"):
+    return [
+        SystemMessage(content=f"CURRENT_TIME: Sat Oct 18 2026 {time_of_day} +0800"),
+        HumanMessage(content="预测银河E5 440 9月份的销售量"),
+    ]
+
+
+def test_repeated_prompt_is_served_from_the_cache(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite"))
+    llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    assert llm.invoke(_messages()).content == "first"
+    # the time of day does not change the key, the day does
+    assert llm.invoke(_messages("17:02:45")).content == "first"
+    assert asyncio.run(llm.ainvoke(_messages())).content == "first"
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 0, "entries": 1}
+
+    other_model = FakeListChatModel(responses=["other"], cache=cache)
+    assert other_model.invoke(_messages()).content == "other"
+
+
+def test_normalize_prompt_keeps_the_date():
+    assert normalize_prompt("now: Sat Oct 18 2026 09:30:12 +0800.") == "now: Sat Oct 18 2026."
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite"), ttl_seconds=60)
+    llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+    with patch("ana_flow.llms.cache.time.time", return_value=1000.0):
+        llm.invoke(_messages())
+    with patch("ana_flow.llms.cache.time.time", return_value=1100.0):
+        assert llm.invoke(_messages()).content == "second"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite"), max_entries=2)
+    llm = FakeListChatModel(responses=["a", "b", "c"], cache=cache)
+    for i, now in enumerate([1.0, 2.0, 3.0]):
+        with patch("ana_flow.llms.cache.time.time", return_value=now):
+            llm.invoke([HumanMessage(content=f"question {i}")])
+    with patch("ana_flow.llms.cache.time.time", return_value=4.0):
+        cache.evict()
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    with patch("ana_flow.llms.cache.time.time", return_value=5.0):
+        assert llm.invoke([HumanMessage(content="question 2")]).content == "c"
+        misses = cache.stats()["misses"]
+        llm.invoke([HumanMessage(content="question 0")])
+    assert cache.stats()["misses"] == misses + 1
+
+
+def test_only_opted_in_agents_share_the_response_cache(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite"))
+    conf = {
+        "MODEL_PROVIDER": {"provider": "openai"},
+        "BASIC_MODEL": {"model": "gpt-4o-mini", "api_key": "test-key"},
+    }
+    with patch.dict(llm_module._llm_cache, clear=True), patch(
+        "ana_flow.llms.llm.load_yaml_config", return_value=conf
+    ), patch("ana_flow.llms.llm.get_llm_response_cache", return_value=cache):
+        cached = llm_module.get_llm_by_type("basic", cache_responses=True)
+        plain = llm_module.get_llm_by_type("basic")
+        assert cached.cache is cache
+        assert plain.cache is None
+        assert llm_module.get_llm_by_type("basic", cache_responses=True) is cached
@@ -0,0 +1,71 @@
+import asyncio
+from unittest.mock import patch
+
+import ana_flow.llms.http as http
+import ana_flow.llms.llm as llm_module
+
+CONF = {
+    "MODEL_PROVIDER": {"provider": "openai"},
+    "BASIC_MODEL": {"model": "gpt-4o-mini", "api_key": "test-key", "base_url": "https://llm.example.com/v1"},
+    "REASONING_MODEL": {"model": "o3-mini", "api_key": "test-key", "base_url": "https://llm.example.com/v1/"},
+    "VISION_MODEL": {"model": "gpt-4o", "api_key": "test-key"},
+}
+
+
+def _patched():
+    return (
+        patch.dict(llm_module._llm_cache, clear=True),
+        patch.dict(http._clients, clear=True),
+        patch.dict(http._async_clients, clear=True),
+        patch("ana_flow.llms.llm.load_yaml_config", return_value=CONF),
+    )
+
+
+def test_models_of_a_base_url_share_the_http_clients():
+    a, b, c, d = _patched()
+    with a, b, c, d:
+        basic = llm_module.get_llm_by_type("basic")
+        reasoning = llm_module.get_llm_by_type("reasoning")
+        vision = llm_module.get_llm_by_type("vision")
+        assert basic is not reasoning
+        assert basic.http_client is reasoning.http_client
+        assert basic.http_async_client is reasoning.http_async_client
+        assert vision.http_client is not basic.http_client
+        assert llm_module.get_llm_by_type("basic") is basic
+
+
+def test_models_are_cached_per_config_and_event_loop():
+    a, b, c, d = _patched()
+    with a, b, c, d:
+
+        async def get_basic():
+            return llm_module.get_llm_by_type("basic")
+
+        first = asyncio.run(get_basic())
+        second = asyncio.run(get_basic())
+        assert first is not second
+        assert first.http_async_client is not second.http_async_client
+        assert first.http_client is second.http_client
+        # the models and clients of the closed loops are dropped
+        assert len(llm_module._llm_cache) == 1
+        assert len(http._async_clients) == 1
+
+        basic = llm_module.get_llm_by_type("basic")
+        changed = {**CONF, "BASIC_MODEL": {**CONF["BASIC_MODEL"], "temperature": 0}}
+        with patch("ana_flow.llms.llm.load_yaml_config", return_value=changed):
+            assert llm_module.get_llm_by_type("basic").temperature == 0
+        assert llm_module.get_llm_by_type("basic") is basic
+
+
+def test_close_http_clients():
+    a, b, c, d = _patched()
+    with a, b, c, d:
+
+        async def main():
+            llm = llm_module.get_llm_by_type("basic")
+            await http.close_http_clients()
+            return llm
+
+        llm = asyncio.run(main())
+        assert llm.http_client.is_closed and llm.http_async_client.is_closed
+        assert not http._clients and not http._async_clients
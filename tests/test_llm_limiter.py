@@ -0,0 +1,185 @@
+import asyncio
+import json
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from langchain_openai import ChatOpenAI
+
+import ana_flow.llms.limiter as limiter_module
+from ana_flow.graph.nodes import _execute_agent_step
+from ana_flow.llms.limiter import (
+    RateLimitedAsyncTransport,
+    TokenBucket,
+    _retry_after,
+    configure_rate_limit,
+    get_rate_limiter,
+)
+
+BASE_URL = "https://llm.example.com/v1"
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "test-model",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "ok"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    with patch.dict(limiter_module._limiters, clear=True), patch.dict(
+        limiter_module._model_overrides, clear=True
+    ):
+        yield
+
+
+def _client(handler):
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        transport=RateLimitedAsyncTransport(BASE_URL, httpx.MockTransport(handler)),
+    )
+
+
+def test_token_bucket_delays_beyond_the_quota():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_retry_after_header_formats():
+    assert _retry_after(httpx.Response(429, headers={"retry-after": "2"})) == 2.0
+    assert _retry_after(httpx.Response(429, headers={"retry-after-ms": "250"})) == 0.25
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    seconds = _retry_after(
+        httpx.Response(429, headers={"retry-after": format_datetime(retry_at, usegmt=True)})
+    )
+    assert 28 <= seconds <= 30
+    assert _retry_after(httpx.Response(429, headers={"retry-after": "soon"})) is None
+    assert _retry_after(httpx.Response(429)) is None
+
+
+def test_rate_limited_calls_are_retried_after_the_requested_delay():
+    configure_rate_limit(BASE_URL, "test-model", backoff_base=0.01)
+    responses = [
+        httpx.Response(429, headers={"retry-after": "0.05"}),
+        httpx.Response(503),
+        httpx.Response(200, json=COMPLETION),
+    ]
+
+    async def main():
+        async with _client(lambda request: responses.pop(0)) as client:
+            llm = ChatOpenAI(
+                model="test-model",
+                api_key="test-key",
+                base_url=BASE_URL,
+                http_async_client=client,
+                max_retries=0,
+            )
+            return await llm.ainvoke("hi")
+
+    with patch("ana_flow.llms.limiter.asyncio.sleep", new=AsyncMock()) as sleep:
+        assert asyncio.run(main()).content == "ok"
+    assert sleep.await_args_list[0].args[0] >= 0.05
+    stats = get_rate_limiter(BASE_URL, "test-model").stats()
+    assert stats["calls"] == 3 and stats["retries"] == 2 and stats["rate_limited"] == 1
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_last_response_is_returned_when_retries_are_exhausted():
+    configure_rate_limit(BASE_URL, "test-model", max_retries=2, backoff_base=0.01)
+    body = json.dumps({"model": "test-model"})
+
+    async def main():
+        async with _client(lambda request: httpx.Response(429)) as client:
+            return await client.post("/chat/completions", content=body)
+
+    response = asyncio.run(main())
+    assert response.status_code == 429
+    stats = get_rate_limiter(BASE_URL, "test-model").stats()
+    assert stats["calls"] == 3 and stats["failures"] == 1
+
+
+def test_concurrency_is_bounded_per_model():
+    configure_rate_limit(BASE_URL, "test-model", max_concurrency=2)
+    body = json.dumps({"model": "test-model"})
+    active = {"now": 0, "max": 0}
+
+    async def handler(request):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        return httpx.Response(200, json={})
+
+    async def main():
+        async with _client(handler) as client:
+            await asyncio.gather(
+                *(client.post("/chat/completions", content=body) for _ in range(6))
+            )
+
+    asyncio.run(main())
+    assert active["max"] == 2
+    stats = get_rate_limiter(BASE_URL, "test-model").stats()
+    assert stats["calls"] == 6 and stats["in_flight"] == 0
+    # four calls waited for a slot
+    assert stats["queue_wait_seconds_max"] >= 0.09
+
+
+def test_streamed_calls_hold_their_slot_until_closed():
+    body = json.dumps({"model": "test-model"})
+
+    async def chunks():
+        yield b"data: 1\n\n"
+        yield b"data: [DONE]\n\n"
+
+    async def main():
+        limiter = get_rate_limiter(BASE_URL, "test-model")
+        async with _client(lambda request: httpx.Response(200, content=chunks())) as client:
+            async with client.stream("POST", "/chat/completions", content=body) as response:
+                assert limiter.stats()["in_flight"] == 1
+                await response.aread()
+        return limiter.stats()["in_flight"]
+
+    assert asyncio.run(main()) == 0
+
+
+def test_failed_agent_step_is_recorded_instead_of_crashing():
+    agent = MagicMock()
+    agent.astream.side_effect = RuntimeError("429 Too Many Requests")
+    result = asyncio.run(_execute_agent_step({"messages": []}, agent, "researcher"))
+    assert "researcher failed" in result and "429" in result
+
+
+def test_cancelled_request_gives_its_slot_back():
+    body = json.dumps({"model": "test-model"})
+    started = asyncio.Event()
+
+    class HangingTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            started.set()
+            await asyncio.sleep(60)
+
+    async def main():
+        limiter = get_rate_limiter(BASE_URL, "test-model")
+        transport = RateLimitedAsyncTransport(BASE_URL, HangingTransport())
+        async with httpx.AsyncClient(base_url=BASE_URL, transport=transport) as client:
+            request = asyncio.create_task(client.post("/chat/completions", content=body))
+            await started.wait()
+            assert limiter.stats()["in_flight"] == 1
+            request.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await request
+        return limiter.stats()["in_flight"]
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,155 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from ana_flow.tools.mcp_pool import MCPSessionPool
+
+CONNECTION = {"transport": "stdio", "command": "fake", "args": []}
+
+
+class FakeSession:
+    def __init__(self):
+        self.healthy = True
+
+    async def list_tools(self):
+        return SimpleNamespace(tools=[])
+
+    async def send_ping(self):
+        if not self.healthy:
+            raise ConnectionError("server is gone")
+
+
+class FakeFactory:
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+        self.sessions = []
+
+    @asynccontextmanager
+    async def __call__(self, connection):
+        self.opened += 1
+        session = FakeSession()
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            self.closed += 1
+
+
+def _make_pool(factory, **kwargs):
+    defaults = dict(
+        max_sessions_per_server=2,
+        idle_timeout=60,
+        health_check_interval=60,
+        session_factory=factory,
+    )
+    defaults.update(kwargs)
+    return MCPSessionPool(**defaults)
+
+
+def test_session_is_reused_between_leases():
+    factory = FakeFactory()
+
+    async def run():
+        pool = _make_pool(factory)
+        async with pool.session("fake", CONNECTION) as first:
+            pass
+        async with pool.session("fake", CONNECTION) as second:
+            assert second is first
+        await pool.close()
+
+    asyncio.run(run())
+    assert factory.opened == 1
+    assert factory.closed == 1
+
+
+def test_concurrent_sessions_are_capped_per_server():
+    factory = FakeFactory()
+    active = 0
+    peak = 0
+
+    async def use(pool):
+        nonlocal active, peak
+        async with pool.session("fake", CONNECTION):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def run():
+        pool = _make_pool(factory)
+        await asyncio.gather(*(use(pool) for _ in range(6)))
+        assert pool.stats()
+        await pool.close()
+
+    asyncio.run(run())
+    assert peak == 2
+    assert factory.opened == 2
+
+
+def test_idle_sessions_are_evicted():
+    factory = FakeFactory()
+
+    async def run():
+        pool = _make_pool(factory, idle_timeout=0.01)
+        async with pool.session("fake", CONNECTION):
+            pass
+        await asyncio.sleep(0.02)
+        assert await pool.evict_idle() == 1
+        await pool.close()
+
+    asyncio.run(run())
+    assert factory.closed == 1
+
+
+def test_unhealthy_session_is_replaced():
+    factory = FakeFactory()
+
+    async def run():
+        pool = _make_pool(factory, health_check_interval=0.001)
+        async with pool.session("fake", CONNECTION) as first:
+            first.session.healthy = False
+        await asyncio.sleep(0.01)
+        async with pool.session("fake", CONNECTION) as second:
+            assert second is not first
+        await pool.close()
+
+    asyncio.run(run())
+    assert factory.opened == 2
+
+
+def test_closed_pool_rejects_leases():
+    async def run():
+        pool = _make_pool(FakeFactory())
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            async with pool.session("fake", CONNECTION):
+                pass
+
+    asyncio.run(run())
+
+
+def test_session_of_a_cancelled_lease_is_not_reused():
+    factory = FakeFactory()
+
+    async def run():
+        pool = _make_pool(factory)
+        leased = asyncio.Event()
+
+        async def call_tool():
+            async with pool.session("fake", CONNECTION):
+                leased.set()
+                await asyncio.sleep(60)
+
+        task = asyncio.create_task(call_tool())
+        await leased.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.stats()[next(iter(pool.stats()))] == {"idle": 0, "in_use": 0}
+        await pool.close()
+
+    asyncio.run(run())
+    assert factory.closed == 1
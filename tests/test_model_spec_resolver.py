@@ -0,0 +1,111 @@
+import random
+import time
+
+import pytest
+
+from ana_flow.data.resolver import ModelSpecIndex, partial_edit_distance
+
+CATALOG = [
+    ("长城", "高山", "高山 140"),
+    ("长城", "高山", "高山 75"),
+    ("长城", "高山8", "高山8 172"),
+    ("哈弗", "哈弗猛龙", "哈弗猛龙 PHEV 115"),
+    ("哈弗", "哈弗猛龙", "哈弗猛龙 PHEV 81"),
+    ("零跑", "零跑B10", "零跑B10 510"),
+    ("零跑", "零跑B10", "零跑B10 600"),
+    ("银河", "银河E5", "银河E5 440"),
+    ("银河", "银河E5", "银河E5 530"),
+    ("银河", "银河星舰7", "银河星舰7 101"),
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ModelSpecIndex.from_rows(
+        {"car_brand": brand, "model": model, "model_specification": specification}
+        for brand, model, specification in CATALOG
+    )
+
+
+@pytest.mark.parametrize(
+    "phrase, expected",
+    [
+        ("请预测银河E5 440 9月份的销售量", "银河E5 440"),
+        ("我想预测长城高山 140从2025年9月到12月的销量", "高山 140"),
+        ("零跑b10  600", "零跑B10 600"),
+        # homophone typo of the brand
+        ("哈佛猛龙 phev 115 的销量", "哈弗猛龙 PHEV 115"),
+    ],
+)
+def test_resolve_unique(index, phrase, expected):
+    assert index.resolve_unique(phrase) == expected
+    assert index.resolve(phrase)[0].model_specification == expected
+
+
+def test_ambiguous_phrase_returns_ranked_candidates(index):
+    assert index.resolve_unique("银河E5的销量") is None
+    candidates = [m.model_specification for m in index.resolve("银河E5的销量", limit=3)]
+    assert candidates[:2] == ["银河E5 440", "银河E5 530"]
+
+
+def test_phrase_naming_several_models(index):
+    phrase = "对比高山 140和银河E5 440的销量"
+    assert sorted(index.resolve_named(phrase)) == ["银河E5 440", "高山 140"]
+    assert index.resolve_unique(phrase) is None
+    # "高山 140" also contains "高山", only the longest name counts
+    assert index.resolve_named("高山8 172的销量") == ["高山8 172"]
+
+
+def test_misspelled_phrase_is_ranked_first_but_not_unique(index):
+    matches = index.resolve("星舰7 101")
+    assert matches[0].model_specification == "银河星舰7 101"
+    assert matches[0].score < 1.0
+    assert index.resolve_unique("星舰7 101") is None
+
+
+def test_unknown_phrase(index):
+    assert index.resolve("特斯拉Model Y") == []
+    assert index.resolve("") == []
+
+
+def _reference_partial_edit_distance(pattern, text):
+    previous = [0] * (len(text) + 1)
+    for i, pattern_char in enumerate(pattern, 1):
+        current = [i] + [0] * len(text)
+        for j, text_char in enumerate(text, 1):
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (pattern_char != text_char)
+            )
+        previous = current
+    return min(previous)
+
+
+def test_partial_edit_distance_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(500):
+        pattern = "".join(rng.choice("abc") for _ in range(rng.randint(1, 8)))
+        text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 15)))
+        assert partial_edit_distance(pattern, text) == _reference_partial_edit_distance(
+            pattern, text
+        )
+
+
+def test_resolve_is_sub_millisecond_on_large_catalog():
+    rng = random.Random(0)
+    chars = "比亚迪宋汉唐秦元海豹鸥理想问界蔚来小鹏极氪领克吉利星越博奇瑞虎艾泽长安逸动"
+    rows = [
+        {"car_brand": brand, "model": model, "model_specification": specification}
+        for brand, model, specification in CATALOG
+    ]
+    for _ in range(3000):
+        name = "".join(rng.sample(chars, 3))
+        rows.append({"model_specification": f"{name} {rng.randint(50, 700)}"})
+    index = ModelSpecIndex.from_rows(rows)
+
+    phrase = "请预测银河E5 440 9月份的销售量"
+    index.resolve(phrase)
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        index.resolve(phrase)
+    assert (time.perf_counter() - start) / runs < 1e-3
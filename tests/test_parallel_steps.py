@@ -0,0 +1,121 @@
+import asyncio
+from unittest.mock import patch
+
+from langgraph.types import Command
+
+import ana_flow.graph.builder as builder
+from ana_flow.graph.nodes import _ready_steps, research_team_node
+from ana_flow.prompts.planner_model import Plan, Step, StepType
+
+
+def _plan(*steps):
+    return Plan(
+        locale="zh-CN",
+        has_enough_context=False,
+        thought="",
+        title="银河E5 440 销量预测",
+        steps=[
+            Step(
+                need_web_search=step_type == StepType.RESEARCH,
+                title=title,
+                description=title,
+                step_type=step_type,
+                depends_on=depends_on,
+            )
+            for title, step_type, depends_on in steps
+        ],
+    )
+
+
+PLAN_STEPS = [
+    ("load", StepType.LOADING, []),
+    ("prices", StepType.RESEARCH, []),
+    ("policies", StepType.RESEARCH, []),
+    ("analysis", StepType.PROCESSING, [0, 1]),
+    ("prediction", StepType.PREDICTION, None),
+]
+
+
+def test_ready_steps_follow_dependencies():
+    plan = _plan(*PLAN_STEPS)
+    assert _ready_steps(plan) == [0, 1, 2]
+    plan.steps[0].execution_res = "forecast"
+    plan.steps[1].execution_res = "prices"
+    assert _ready_steps(plan) == [2, 3]
+    plan.steps[2].execution_res = "policies"
+    plan.steps[3].execution_res = "analysis"
+    assert _ready_steps(plan) == [4]
+
+
+def test_dependencies_on_later_steps_are_ignored():
+    plan = _plan(("a", StepType.RESEARCH, [1]), ("b", StepType.RESEARCH, [0]))
+    assert _ready_steps(plan) == [0]
+
+
+def test_research_team_caps_fan_out_and_merges_in_step_order():
+    plan = _plan(*PLAN_STEPS)
+    state = {"current_plan": plan, "observations": [], "step_results": {}}
+    command = asyncio.run(
+        research_team_node(state, {"configurable": {"max_parallel_steps": 2}})
+    )
+    assert [(send.node, send.arg["current_step_index"]) for send in command.goto] == [
+        ("loader", 0),
+        ("researcher", 1),
+    ]
+
+    # results arrive in any order and are merged in step order
+    state = {**command.update, "step_results": {1: "prices", 0: "forecast"}}
+    command = asyncio.run(
+        research_team_node(state, {"configurable": {"max_parallel_steps": 2}})
+    )
+    assert command.update["observations"] == ["forecast", "prices"]
+    assert command.update["step_results"] is None
+    assert [send.arg["current_step_index"] for send in command.goto] == [2, 3]
+    assert plan.steps[0].execution_res is None
+
+
+def test_graph_runs_independent_steps_concurrently():
+    running = 0
+    max_running = 0
+
+    def worker(name):
+        async def node(state, config):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            index = state["current_step_index"]
+            return Command(
+                update={"step_results": {index: f"{name} {index}"}}, goto="research_team"
+            )
+
+        return node
+
+    def start(state):
+        return Command(update={"current_plan": _plan(*PLAN_STEPS)}, goto="research_team")
+
+    with patch.object(builder, "coordinator_node", start), patch.object(
+        builder, "researcher_node", worker("researcher")
+    ), patch.object(builder, "loader_node", worker("loader")), patch.object(
+        builder, "coder_node", worker("coder")
+    ), patch.object(builder, "conclusion_node", worker("conclusion")), patch.object(
+        builder, "planner_node", lambda state: Command(goto="reporter")
+    ), patch.object(builder, "reporter_node", lambda state: {"final_report": "done"}):
+        graph = builder.build_graph_with_memory()
+
+    result = asyncio.run(
+        graph.ainvoke(
+            {"messages": [], "observations": []},
+            config={"configurable": {"thread_id": "parallel", "max_parallel_steps": 3}},
+        )
+    )
+    assert max_running == 3
+    assert result["observations"] == [
+        "loader 0",
+        "researcher 1",
+        "researcher 2",
+        "coder 3",
+        "conclusion 4",
+    ]
+    assert all(step.execution_res for step in result["current_plan"].steps)
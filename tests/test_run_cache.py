@@ -0,0 +1,137 @@
+import asyncio
+import importlib
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from ana_flow.prompts.planner_model import Plan, Step, StepType
+from ana_flow.server.run_cache import RunCache, parse_event, replay_run
+
+# the package exports the FastAPI app under the name of its module
+server = importlib.import_module("ana_flow.server.app")
+
+REQUEST = {
+    "messages": [{"role": "user", "content": "预测银河E5 9月销量"}],
+    "auto_accepted_plan": True,
+    "max_step_num": 3,
+}
+
+
+class FakeGraph:
+    def __init__(self):
+        self.states = {}
+
+    async def aget_state(self, config):
+        return SimpleNamespace(values=self.states.get(config["configurable"]["thread_id"], {}))
+
+    async def aupdate_state(self, config, values, as_node=None):
+        self.states[config["configurable"]["thread_id"]] = values
+
+
+def _plan(result):
+    step = Step(
+        need_web_search=False,
+        title="Load sales",
+        description="Load the E5 sales",
+        step_type=StepType.LOADING,
+        execution_res=result,
+    )
+    return Plan(locale="zh-CN", has_enough_context=False, thought="", title="E5", steps=[step])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    run_cache = RunCache(str(tmp_path / "runs.sqlite"))
+    sales_cache = SimpleNamespace(watermark=datetime(2026, 9, 28))
+
+    async def sales_watermark():
+        return sales_cache.watermark
+
+    sales_cache.sales_watermark = sales_watermark
+    graph = FakeGraph()
+    runs = []
+
+    async def workflow(messages, thread_id, *args):
+        runs.append(thread_id)
+        question = messages[-1]["content"]
+        yield "message_chunk", {"thread_id": thread_id, "content": "E5"}
+        if question == "interrupt me":
+            yield "interrupt", {"thread_id": thread_id, "content": "plan"}
+            return
+        yield "message_chunk", {"thread_id": thread_id, "content": "done"}
+        if question != "no report":
+            result = "Failed to load the sales data of the task within 120s." if question == "fail" else "E5"
+            graph.states[thread_id] = {
+                "messages": [AIMessage(content="done")],
+                "current_plan": _plan(result),
+                "final_report": "E5 report",
+            }
+
+    with patch.object(server, "get_run_cache", return_value=run_cache), patch.object(
+        server, "get_sales_source", return_value=sales_cache
+    ), patch.object(server, "graph", graph), patch.object(
+        server, "_astream_workflow_generator", workflow
+    ):
+        yield SimpleNamespace(run_cache=run_cache, sales_cache=sales_cache, graph=graph, runs=runs)
+    run_cache.close()
+
+
+def _chat(request, thread_id):
+    response = TestClient(server.app).post(
+        "/api/chat/stream", json={**request, "thread_id": thread_id}
+    )
+    return [parse_event(event) for event in response.text.split("\n\n") if event]
+
+
+def test_identical_request_is_replayed_on_its_thread(cache):
+    first = _chat(REQUEST, "first")
+    second = _chat(REQUEST, "second")
+    assert cache.runs == ["first"]
+    assert [data["content"] for _, data in second] == [data["content"] for _, data in first]
+    assert {data["thread_id"] for _, data in second} == {"second"}
+    # the replayed thread holds the final state of the run
+    assert cache.graph.states["second"]["final_report"] == "E5 report"
+    assert cache.graph.states["second"]["messages"] == [AIMessage(content="done")]
+
+
+def test_other_settings_run_again(cache):
+    _chat(REQUEST, "first")
+    _chat({**REQUEST, "max_step_num": 5}, "second")
+    _chat({**REQUEST, "bypass_step_cache": True}, "third")
+    assert cache.runs == ["first", "second", "third"]
+
+
+@pytest.mark.parametrize("question", ["interrupt me", "no report", "fail"])
+def test_interrupted_and_incomplete_runs_are_not_recorded(cache, question):
+    request = {**REQUEST, "messages": [{"role": "user", "content": question}]}
+    _chat(request, "first")
+    _chat(request, "second")
+    assert cache.runs == ["first", "second"]
+
+
+def test_new_sales_data_invalidates_runs(cache):
+    _chat(REQUEST, "first")
+    cache.sales_cache.watermark = datetime(2026, 10, 5)
+    _chat(REQUEST, "second")
+    _chat(REQUEST, "third")
+    assert cache.runs == ["first", "second"]
+    assert cache.run_cache.invalidate("2026-10-12T00:00:00") == 1
+
+
+def test_replay_compresses_the_pauses():
+    recorded = [(0.0, "message_chunk", {"thread_id": "a"}), (1.0, "message_chunk", {})]
+
+    async def replay(speedup):
+        started = time.perf_counter()
+        events = [event async for event in replay_run(recorded, "b", speedup)]
+        return events, time.perf_counter() - started
+
+    events, elapsed = asyncio.run(replay(10))
+    assert events == [("message_chunk", {"thread_id": "b"}), ("message_chunk", {})]
+    assert 0.09 < elapsed < 0.5
+    assert asyncio.run(replay(0))[1] < 0.05
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from ana_flow.data.cache import SalesCache, get_sales_source
+from ana_flow.data.sales import SALES_COLUMNS
+
+
+def _row(model_specification, year_code, week, quantity, insert_time, **overrides):
+    row = {column: None for column in SALES_COLUMNS}
+    row.update(
+        {
+            "enterprise_short_name": "吉利",
+            "car_brand": "银河",
+            "model": model_specification.split(" ")[0],
+            "model_specification": model_specification,
+            "year_code": year_code,
+            "week": week,
+            "week_code": f"{year_code}{week}",
+            "quantity": quantity,
+            "insert_time": datetime.fromisoformat(insert_time),
+        }
+    )
+    row.update(overrides)
+    return row
+
+
+class FakeRepository:
+    def __init__(self, rows):
+        self.rows = rows
+        self.watermarks = []
+
+    async def iter_rows_since(self, watermark, batch_size=50000):
+        self.watermarks.append(watermark)
+        rows = [r for r in self.rows if watermark is None or r["insert_time"] > watermark]
+        for start in range(0, len(rows), 2):
+            yield pd.DataFrame(rows[start : start + 2], columns=SALES_COLUMNS)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SalesCache(root=str(tmp_path / "sales_cache"), max_age_seconds=3600)
+
+
+def test_sync_builds_year_partitions(cache):
+    repository = FakeRepository(
+        [
+            _row("银河E5 440", "2024", "WK52", 50, "2025-01-01T00:00:00"),
+            _row("银河E5 440", "2025", "WK1", 100, "2025-01-08T00:00:00"),
+            _row("银河E5 440", "2025", "WK2", 200, "2025-01-15T00:00:00"),
+            _row("高山 140", "2025", "WK1", 10, "2025-01-08T00:00:00"),
+        ]
+    )
+    assert cache.is_stale()
+    assert asyncio.run(cache.sync(repository)) == 4
+
+    assert not cache.is_stale()
+    assert (cache.root / "year_code=2024" / "part-0.parquet").exists()
+    assert (cache.root / "year_code=2025" / "part-0.parquet").exists()
+    assert cache.watermark == datetime(2025, 1, 15)
+    assert cache.state()["rows"] == 4
+    assert cache.read_model_specifications() == ["银河E5 440", "高山 140"]
+    assert cache.read_model_spec_index().resolve_unique("银河 E5 440的销量") == "银河E5 440"
+
+    series = asyncio.run(cache.load_sales_series("银河E5 440", freq="week"))
+    assert series["quantity"].tolist() == [50, 100, 200]
+
+
+def test_models_synced_by_another_process_are_seen(cache):
+    asyncio.run(
+        cache.sync(FakeRepository([_row("银河E5 440", "2025", "WK1", 100, "2025-01-08T00:00:00")]))
+    )
+    assert cache.read_model_specifications() == ["银河E5 440"]
+    assert cache.read_model_spec_index().resolve_named("高山 140的销量") == []
+
+    # the sync command runs in its own process with its own cache object
+    other = SalesCache(root=str(cache.root), max_age_seconds=3600)
+    asyncio.run(
+        other.sync(FakeRepository([_row("高山 140", "2025", "WK2", 10, "2025-01-15T00:00:00")]))
+    )
+    assert cache.read_model_specifications() == ["银河E5 440", "高山 140"]
+    assert cache.read_model_spec_index().resolve_named("高山 140的销量") == ["高山 140"]
+
+
+def test_incremental_sync_uses_watermark_and_replaces_reinserted_rows(cache):
+    repository = FakeRepository(
+        [
+            _row("银河E5 440", "2025", "WK1", 100, "2025-01-08T00:00:00"),
+            _row("银河E5 440", "2025", "WK2", 200, "2025-01-15T00:00:00"),
+        ]
+    )
+    asyncio.run(cache.sync(repository))
+
+    # the source reloaded week 2 with a corrected quantity and added week 3
+    repository.rows += [
+        _row("银河E5 440", "2025", "WK2", 250, "2025-01-22T00:00:00"),
+        _row("银河E5 440", "2025", "WK3", 300, "2025-01-22T00:00:00"),
+    ]
+    assert asyncio.run(cache.sync(repository)) == 2
+    assert repository.watermarks[-1] == datetime(2025, 1, 15)
+
+    weekly = cache.read_weekly_sales("银河E5 440").sort_values("week")
+    assert weekly["quantity"].tolist() == [100, 250, 300]
+
+
+def test_rows_with_different_dimensions_are_kept(cache):
+    repository = FakeRepository(
+        [
+            _row("银河E5 440", "2025", "WK1", 100, "2025-01-08T00:00:00", use_type="非营运"),
+            _row("银河E5 440", "2025", "WK1", 20, "2025-01-09T00:00:00", use_type="营运"),
+        ]
+    )
+    asyncio.run(cache.sync(repository))
+    weekly = cache.read_weekly_sales("银河E5 440")
+    assert weekly["quantity"].tolist() == [120]
+
+
+def test_staleness_follows_max_age(cache):
+    asyncio.run(
+        cache.sync(FakeRepository([_row("高山 140", "2025", "WK1", 10, "2025-01-08T00:00:00")]))
+    )
+    assert not cache.is_stale()
+    assert cache.is_stale(max_age_seconds=-1)
+
+
+def test_full_sync_drops_existing_cache(cache):
+    repository = FakeRepository([_row("高山 140", "2025", "WK1", 10, "2025-01-08T00:00:00")])
+    asyncio.run(cache.sync(repository))
+    repository.rows = [_row("高山 75", "2025", "WK1", 5, "2025-01-08T00:00:00")]
+    asyncio.run(cache.sync(repository, full=True))
+    assert repository.watermarks[-1] is None
+    assert cache.read_model_specifications() == ["高山 75"]
+
+
+def test_the_source_read_tells_its_watermark(cache):
+    repository = FakeRepository([_row("高山 140", "2025", "WK1", 10, "2025-01-08T00:00:00")])
+    with patch("ana_flow.data.cache.get_sales_cache", return_value=cache), patch(
+        "ana_flow.data.cache.get_sales_repository", return_value=repository
+    ):
+        # a stale cache is not read, the database is
+        assert get_sales_source() is repository
+        asyncio.run(cache.sync(repository))
+        assert get_sales_source() is cache
+    assert asyncio.run(cache.sales_watermark()) == datetime(2025, 1, 8)
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from ana_flow.data.sales import SalesRepository, aggregate_sales, week_start
+
+
+@pytest.fixture
+def weekly_rows():
+    return pd.DataFrame(
+        {
+            "year_code": ["2025", "2025", "2025", "2025", "2025"],
+            "week": ["WK1", "WK2", "WK5", "WK6", "WK9"],
+            "quantity": [100, 200, 300, 400, 500],
+        }
+    )
+
+
+def test_week_start_accepts_prefixed_and_plain_weeks():
+    assert week_start("2025", "WK7") == pd.Timestamp("2025-02-10")
+    assert week_start("2025", "7") == pd.Timestamp("2025-02-10")
+    with pytest.raises(ValueError):
+        week_start("2025", "WK")
+
+
+def test_aggregate_weekly_series(weekly_rows):
+    df = aggregate_sales(weekly_rows, freq="week")
+    assert df.index.name == "period"
+    assert list(df.columns) == ["quantity"]
+    # the weeks without sales are zeros, every week from WK1 to WK9 has a row
+    assert df["quantity"].tolist() == [100, 200, 0, 0, 300, 400, 0, 0, 500]
+    assert df.index[0] == pd.Timestamp("2024-12-30")
+    assert df.index.freqstr == "W-MON"
+
+
+def test_aggregate_monthly_series_uses_thursday_of_week(weekly_rows):
+    df = aggregate_sales(weekly_rows, freq="month")
+    # WK1 of 2025 starts on 2024-12-30 but its Thursday is in January
+    assert df.index.tolist() == [
+        pd.Timestamp("2025-01-01"),
+        pd.Timestamp("2025-02-01"),
+    ]
+    assert df["quantity"].tolist() == [100 + 200 + 300, 400 + 500]
+
+
+def test_aggregate_empty_rows():
+    df = aggregate_sales(pd.DataFrame(columns=["year_code", "week", "quantity"]))
+    assert df.empty
+    assert df.index.name == "period"
+
+
+def test_aggregate_rejects_unknown_frequency(weekly_rows):
+    with pytest.raises(ValueError):
+        aggregate_sales(weekly_rows, freq="day")
+
+
+def test_match_model_specification():
+    repository = SalesRepository(conninfo="postgresql://localhost/test")
+    specifications = ["银河E5 440", "银河E5 530", "高山 140"]
+    with patch.object(
+        repository, "list_model_specifications", AsyncMock(return_value=specifications)
+    ):
+        assert asyncio.run(repository.match_model_specification("高山 140")) == "高山 140"
+        assert asyncio.run(repository.match_model_specification("银河E5  530")) == "银河E5 530"
+        assert asyncio.run(repository.match_model_specification("零跑C11")) is None
+
+
+def test_aggregate_drops_the_month_in_progress(weekly_rows):
+    # the data stops at WK6, the week of 2025-02-06, two weeks before the end of February
+    weekly = weekly_rows.iloc[:4]
+    assert aggregate_sales(weekly, freq="month")["quantity"].tolist() == [100 + 200 + 300]
+    assert aggregate_sales(weekly, freq="month", complete_only=False)["quantity"].tolist() == [
+        100 + 200 + 300,
+        400,
+    ]
+
+
+def test_aggregate_fills_a_month_without_sales():
+    weekly = pd.DataFrame(
+        {
+            "year_code": ["2025", "2025", "2025"],
+            "week": ["WK2", "WK10", "WK14"],
+            "quantity": [100, 300, 400],
+        }
+    )
+    df = aggregate_sales(weekly, freq="month", complete_only=False)
+    # February has no sales but keeps its row, the series stays monthly
+    assert df.index.tolist() == [
+        pd.Timestamp("2025-01-01"),
+        pd.Timestamp("2025-02-01"),
+        pd.Timestamp("2025-03-01"),
+        pd.Timestamp("2025-04-01"),
+    ]
+    assert df["quantity"].tolist() == [100, 0, 300, 400]
+    assert df.index.freqstr == "MS"
+
+
+def test_aggregate_skips_rows_without_an_iso_week():
+    weekly = pd.DataFrame(
+        {
+            # 2023 has 52 ISO weeks
+            "year_code": ["2023", "2023", "2024"],
+            "week": ["WK52", "WK53", "WK"],
+            "quantity": [100, 200, 300],
+        }
+    )
+    df = aggregate_sales(weekly, freq="week")
+    assert df.index.tolist() == [pd.Timestamp("2023-12-25")]
+    assert df["quantity"].tolist() == [100]
+    assert aggregate_sales(weekly.iloc[1:], freq="month").empty
+
+
+def test_sales_watermark_is_queried_once_per_ttl(monkeypatch):
+    monkeypatch.setenv("SALES_WATERMARK_TTL", "60")
+    repository = SalesRepository(conninfo="postgresql://localhost/test")
+    cursor = MagicMock(fetchone=AsyncMock(return_value={"insert_time": datetime(2025, 9, 1)}))
+    conn = MagicMock(execute=AsyncMock(return_value=cursor))
+    repository._pool = MagicMock()
+    repository._pool.connection.return_value.__aenter__.return_value = conn
+
+    async def read_twice():
+        return [await repository.sales_watermark() for _ in range(2)]
+
+    with patch.object(repository, "_ensure_open", AsyncMock()):
+        assert asyncio.run(read_twice()) == [datetime(2025, 9, 1)] * 2
+        assert conn.execute.await_count == 1
+        repository._watermark_read_at -= 60
+        asyncio.run(repository.sales_watermark())
+        assert conn.execute.await_count == 2
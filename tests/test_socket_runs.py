@@ -0,0 +1,94 @@
+import asyncio
+import importlib
+from unittest.mock import patch
+
+import ormsgpack
+from fastapi.testclient import TestClient
+
+from ana_flow.server.admission import AdmissionController
+
+# the package exports the FastAPI app under the name of its module
+server = importlib.import_module("ana_flow.server.app")
+
+
+async def workflow(messages, thread_id, resources, max_plan_iterations, max_step_num, *args):
+    interrupt_feedback, interrupt_payload = args[2], args[8]
+    if thread_id == "slow":
+        await asyncio.sleep(60)
+    if interrupt_feedback:
+        # the resumed run keeps the settings of the request that started the thread
+        content = f"{interrupt_feedback} {interrupt_payload} {max_step_num}"
+        yield "message_chunk", {"thread_id": thread_id, "content": content}
+        return
+    yield "message_chunk", {"thread_id": thread_id, "content": "plan"}
+    yield "interrupt", {"thread_id": thread_id, "content": "Please review the plan."}
+
+
+def _chat(thread_id, **request):
+    request = {"messages": [{"role": "user", "content": "E5"}], "thread_id": thread_id, **request}
+    return ormsgpack.packb({"type": "chat", "id": thread_id, "request": request})
+
+
+def _receive_until_end(socket, ends=1):
+    frames = []
+    while ends:
+        frame = ormsgpack.unpackb(socket.receive_bytes())
+        frames.append((frame["event"], frame["data"]))
+        ends -= frame["event"] == "end"
+    return frames
+
+
+def _patched(admission):
+    return (
+        patch.object(server, "get_admission_controller", return_value=admission),
+        patch.object(server, "get_run_cache", return_value=None),
+        patch.object(server, "_astream_workflow_generator", workflow),
+    )
+
+
+def test_threads_are_multiplexed_and_resumed_over_the_socket():
+    admission = AdmissionController()
+    first, second, third = _patched(admission)
+    # the events go from the run to the frames without server-sent event text
+    no_sse = patch.object(server, "_make_event", side_effect=AssertionError("encoded as SSE"))
+    with first, second, third, no_sse, TestClient(server.app).websocket_connect(
+        "/api/chat/ws"
+    ) as socket:
+        socket.send_bytes(_chat("a", max_step_num=5))
+        socket.send_bytes(_chat("b"))
+        frames = _receive_until_end(socket, ends=2)
+        for thread_id in ("a", "b"):
+            assert [
+                event for event, data in frames if data.get("thread_id") == thread_id
+            ] == ["started", "message_chunk", "interrupt", "end"]
+        assert ("started", {"thread_id": "a", "id": "a"}) in frames
+
+        socket.send_bytes(
+            ormsgpack.packb(
+                {"type": "feedback", "thread_id": "a", "action": "edit_plan", "payload": {"steps": []}}
+            )
+        )
+        frames = _receive_until_end(socket)
+    assert ("message_chunk", {"thread_id": "a", "content": "edit_plan {'steps': []} 5"}) in frames
+    assert admission.stats()["running"] == 0
+
+
+def test_bad_frames_get_errors_and_runs_can_be_cancelled():
+    admission = AdmissionController()
+    first, second, third = _patched(admission)
+    with first, second, third, TestClient(server.app).websocket_connect("/api/chat/ws") as socket:
+        socket.send_text("hello")
+        assert ormsgpack.unpackb(socket.receive_bytes())["event"] == "error"
+        socket.send_bytes(ormsgpack.packb({"type": "feedback", "thread_id": "a"}))
+        assert ormsgpack.unpackb(socket.receive_bytes())["event"] == "error"
+
+        socket.send_bytes(_chat("slow"))
+        assert ormsgpack.unpackb(socket.receive_bytes())["event"] == "started"
+        socket.send_bytes(_chat("slow"))
+        assert ormsgpack.unpackb(socket.receive_bytes())["data"]["content"] == "The thread has a run going"
+        socket.send_bytes(ormsgpack.packb({"type": "cancel", "thread_id": "slow"}))
+        assert ormsgpack.unpackb(socket.receive_bytes()) == {
+            "event": "end",
+            "data": {"thread_id": "slow", "cancelled": True},
+        }
+    assert admission.stats()["running"] == 0
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+
+from ana_flow.graph.builder import build_graph_with_memory
+from ana_flow.graph.speculative import get_speculative_tasks
+from ana_flow.prompts.planner_model import Plan
+
+LATENCY = 0.3
+SETTINGS = {"SPECULATIVE_BACKGROUND_INVESTIGATION": "true", "ROUTER_FAST_PATH": "false"}
+
+
+class FakeLLM:
+    def __init__(self, hand_off=True, kind="chat"):
+        self.hand_off = hand_off
+        self.kind = kind
+        self.planner_messages = []
+
+    def bind_tools(self, tools):
+        return FakeLLM(self.hand_off, "coordinator")
+
+    def bind(self, **kwargs):
+        planner = FakeLLM(self.hand_off, "planner")
+        planner.planner_messages = self.planner_messages
+        return planner
+
+    def with_config(self, **kwargs):
+        return self
+
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(LATENCY)
+        if self.kind == "coordinator":
+            tool_calls = [
+                {"name": "handoff_to_planner", "args": {"locale": "zh-CN"}, "id": "call_1"}
+            ]
+            return AIMessage(content="", tool_calls=tool_calls if self.hand_off else [])
+        if self.kind == "planner":
+            self.planner_messages.extend(messages)
+            plan = Plan(
+                locale="zh-CN", has_enough_context=True, thought="", title="", steps=[]
+            )
+            return AIMessage(content=plan.model_dump_json())
+        return AIMessage(content="report")
+
+
+async def _search(query, max_search_results):
+    await asyncio.sleep(LATENCY)
+    return '[{"title": "E5", "content": "sales up"}]'
+
+
+def _run(llm, thread_id):
+    graph = build_graph_with_memory()
+
+    async def main():
+        started = time.perf_counter()
+        await graph.ainvoke(
+            {
+                "messages": [{"role": "user", "content": "银河E5 9月销量"}],
+                "enable_background_investigation": True,
+            },
+            config={"thread_id": thread_id},
+        )
+        elapsed = time.perf_counter() - started
+        state = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+        return elapsed, state.values
+
+    with patch("ana_flow.graph.nodes.get_llm_by_type", return_value=llm), patch(
+        "ana_flow.graph.nodes._investigate_background", side_effect=_search
+    ) as search, patch.dict(os.environ, SETTINGS):
+        elapsed, values = asyncio.run(main())
+    return elapsed, values, search
+
+
+def test_search_overlaps_with_the_coordinator():
+    llm = FakeLLM()
+    elapsed, values, search = _run(llm, "speculative")
+    search.assert_called_once()
+    # coordinator, planner and reporter, the search adds no latency of its own
+    assert elapsed < 4 * LATENCY
+    assert values["background_investigation_results"] == '[{"title": "E5", "content": "sales up"}]'
+    assert any("sales up" in str(message) for message in llm.planner_messages)
+    assert len(get_speculative_tasks()) == 0
+
+
+def test_search_is_discarded_when_the_coordinator_ends_the_run():
+    elapsed, values, search = _run(FakeLLM(hand_off=False), "greeting")
+    search.assert_called_once()
+    assert values.get("background_investigation_results") is None
+    assert not get_speculative_tasks().running("greeting")
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from ana_flow.graph.nodes import coder_node
+from ana_flow.graph.step_memo import StepMemo, step_memo_key, step_ttl
+from ana_flow.prompts.planner_model import Plan, Step, StepType
+
+
+def _step(title="Collect Geely Galaxy E5 market news", **kwargs):
+    return Step(
+        need_web_search=kwargs.pop("need_web_search", True),
+        title=title,
+        description=kwargs.pop("description", "Collect the news of the last 3 months."),
+        step_type=kwargs.pop("step_type", StepType.RESEARCH),
+        **kwargs,
+    )
+
+
+def test_near_identical_steps_share_a_key():
+    key = step_memo_key(_step(), "researcher", "en-US", [], None)
+    same = _step("collect  geely galaxy E5 market news.", description="Collect the news of the last 3 months")
+    assert step_memo_key(same, "researcher", "en-US", [], None) == key
+    assert step_memo_key(_step(), "researcher", "zh-CN", [], None) != key
+    assert step_memo_key(_step("Collect Geely Galaxy E8 market news"), "researcher", "en-US", [], None) != key
+
+
+def test_newer_data_and_other_findings_change_the_key():
+    key = step_memo_key(_step(), "coder", "en-US", [_step(execution_res="up 5%")], None)
+    assert step_memo_key(_step(), "coder", "en-US", [_step(execution_res="down 2%")], None) != key
+    assert (
+        step_memo_key(_step(), "coder", "en-US", [_step(execution_res="up 5%")], datetime(2026, 10, 1))
+        != key
+    )
+
+
+def test_results_expire_after_the_ttl_of_their_step_type(tmp_path, monkeypatch):
+    monkeypatch.setenv("STEP_MEMO_TTL_RESEARCH", "60")
+    assert step_ttl(StepType.RESEARCH) == 60
+    assert step_ttl(StepType.PREDICTION) == 24 * 3600
+    memo = StepMemo(str(tmp_path / "memo.sqlite"))
+    with patch("ana_flow.graph.step_memo.time.time", return_value=1000.0):
+        memo.put("key", "news", step_ttl(StepType.RESEARCH))
+        assert memo.get("key") == "news"
+    with patch("ana_flow.graph.step_memo.time.time", return_value=1061.0):
+        assert memo.get("key") is None
+    assert memo.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    memo.close()
+
+
+def _state():
+    plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="",
+        title="Galaxy E5 sales forecast",
+        steps=[_step(step_type=StepType.PROCESSING, need_web_search=False)],
+    )
+    return {"current_plan": plan, "locale": "en-US", "current_step_index": 0}
+
+
+@pytest.fixture
+def memo(tmp_path):
+    memo = StepMemo(str(tmp_path / "memo.sqlite"))
+    sales_source = SimpleNamespace(watermark=datetime(2026, 9, 28))
+
+    async def sales_watermark():
+        return sales_source.watermark
+
+    sales_source.sales_watermark = sales_watermark
+    with patch("ana_flow.graph.nodes.get_step_memo", return_value=memo), patch(
+        "ana_flow.graph.nodes._sales_source", return_value=sales_source
+    ), patch("ana_flow.graph.nodes.get_llm_by_type"), patch(
+        "ana_flow.graph.nodes.create_react_agent"
+    ) as create_react_agent:
+        yield memo, create_react_agent, sales_source
+    memo.close()
+
+
+def _run_coder(result, configurable=None):
+    execute = AsyncMock(return_value=result)
+    with patch("ana_flow.graph.nodes._execute_agent_step", execute):
+        command = asyncio.run(coder_node(_state(), {"configurable": configurable or {}}))
+    return command.update["step_results"][0], execute
+
+
+def test_step_is_reused_across_threads(memo):
+    _, create_react_agent, _ = memo
+    assert _run_coder("analysis")[0] == "analysis"
+    result, execute = _run_coder("other analysis", {"thread_id": "another"})
+    assert result == "analysis"
+    execute.assert_not_called()
+    assert create_react_agent.call_count == 1
+
+
+def test_bypass_runs_the_step_again(memo):
+    _run_coder("analysis")
+    result, execute = _run_coder("new analysis", {"bypass_step_cache": True})
+    assert result == "new analysis"
+    execute.assert_called_once()
+
+
+def test_failed_steps_are_not_reused(memo):
+    _run_coder("The coder failed to execute this step: timeout")
+    result, execute = _run_coder("analysis")
+    assert result == "analysis"
+    execute.assert_called_once()
+
+
+def test_new_sales_data_of_the_source_read_runs_the_step_again(memo):
+    _, _, sales_source = memo
+    _run_coder("analysis")
+    # e.g. rows inserted into the database while the stale cache is not read
+    sales_source.watermark = datetime(2026, 10, 5)
+    result, execute = _run_coder("new analysis")
+    assert result == "new analysis"
+    execute.assert_called_once()
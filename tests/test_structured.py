@@ -0,0 +1,132 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_deepseek import ChatDeepSeek
+from langchain_openai import ChatOpenAI
+
+from ana_flow.graph.nodes import human_feedback_node
+from ana_flow.llms.structured import (
+    StructuredOutputError,
+    ainvoke_structured,
+    parse_structured,
+    response_text,
+    structured_output_method,
+)
+from ana_flow.prompts.loader_model import LoaderOutput
+from ana_flow.prompts.planner_model import Plan
+
+PLAN = {
+    "locale": "zh-CN",
+    "has_enough_context": False,
+    "thought": "",
+    "title": "银河E5 销量预测",
+    "steps": [
+        {
+            "need_web_search": False,
+            "title": "加载数据",
+            "description": "load the sales",
+            "step_type": "loading",
+        }
+    ],
+}
+
+
+class ScriptedLLM:
+    """Answers with the scripted contents in turn and records the prompts."""
+
+    def __init__(self, *contents):
+        self.contents = list(contents)
+        self.prompts = []
+        self.bound = {}
+
+    def bind(self, **kwargs):
+        self.bound = kwargs
+        return self
+
+    async def ainvoke(self, messages, **kwargs):
+        self.prompts.append(list(messages))
+        return AIMessage(content=self.contents.pop(0))
+
+
+def test_valid_json_is_not_repaired():
+    with patch("ana_flow.llms.structured.repair_json_output") as repair:
+        plan = parse_structured(json.dumps(PLAN), Plan)
+    repair.assert_not_called()
+    assert plan.steps[0].title == "加载数据"
+
+
+def test_code_fence_and_trailing_comma_are_repaired():
+    text = '```json\n{"model_specification": "银河E5 550",}\n```'
+    assert parse_structured(text, LoaderOutput).model_specification == "银河E5 550"
+
+
+def test_validation_errors_name_the_fields():
+    broken = dict(PLAN, steps=[dict(PLAN["steps"][0], step_type="forecast")])
+    with pytest.raises(StructuredOutputError, match="steps.0.step_type") as error:
+        parse_structured(json.dumps(broken), Plan)
+    assert error.value.text == json.dumps(broken)
+
+
+def test_invalid_answer_is_sent_back_to_be_repaired():
+    llm = ScriptedLLM('{"title": "no steps"', json.dumps(PLAN))
+    plan = asyncio.run(ainvoke_structured(llm, Plan, [HumanMessage(content="plan")]))
+    assert plan.title == "银河E5 销量预测"
+    assert llm.bound == {"response_format": {"type": "json_object"}}
+    repair = llm.prompts[1]
+    assert repair[1].content == '{"title": "no steps"'
+    assert "locale" in repair[2].content
+
+
+def test_repairs_are_bounded():
+    llm = ScriptedLLM("not json", "still not json", "never json")
+    with pytest.raises(StructuredOutputError):
+        asyncio.run(ainvoke_structured(llm, Plan, [], max_repairs=1))
+    assert len(llm.prompts) == 2
+
+
+def test_method_follows_the_provider(monkeypatch):
+    monkeypatch.delenv("LLM_STRUCTURED_OUTPUT_METHOD", raising=False)
+    assert structured_output_method(ChatOpenAI(model="gpt-4o", api_key="key")) == "json_schema"
+    compatible = ChatOpenAI(model="doubao", api_key="key", base_url="https://ark.example.com/v3")
+    assert structured_output_method(compatible) == "function_calling"
+    deepseek = ChatDeepSeek(model="deepseek-chat", api_key="key")
+    assert structured_output_method(deepseek) == "function_calling"
+    assert structured_output_method(ScriptedLLM()) == "json_mode"
+    monkeypatch.setenv("LLM_STRUCTURED_OUTPUT_METHOD", "prompt")
+    assert structured_output_method(deepseek) == "prompt"
+
+
+def test_tool_call_arguments_are_the_answer():
+    message = AIMessage(
+        content="",
+        tool_calls=[{"name": "LoaderOutput", "args": {"model_specification": "E5"}, "id": "1"}],
+    )
+    assert json.loads(response_text(message)) == {"model_specification": "E5"}
+
+
+@pytest.mark.parametrize(
+    "review",
+    [
+        {"action": "accepted"},
+        {"action": "edit_plan", "payload": "{broken"},
+        {"action": "edit_plan", "payload": {"title": "edited"}},
+    ],
+)
+def test_broken_plan_edit_keeps_the_planners_plan(review):
+    state = {"current_plan": json.dumps(PLAN, ensure_ascii=False), "plan_iterations": 0}
+    with patch("ana_flow.graph.nodes.interrupt", return_value=review):
+        command = asyncio.run(human_feedback_node(state))
+    assert command.goto == "research_team"
+    assert command.update["current_plan"].title == "银河E5 销量预测"
+    assert command.update["plan_iterations"] == 1
+
+
+def test_invalid_plan_goes_back_to_the_planner():
+    state = {"current_plan": "not a plan", "plan_iterations": 0}
+    with patch("ana_flow.graph.nodes.interrupt") as interrupt:
+        command = asyncio.run(human_feedback_node(state))
+    interrupt.assert_not_called()
+    assert command.goto == "planner"